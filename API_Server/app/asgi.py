@@ -0,0 +1,50 @@
+import asyncio
+import os
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+# Requests in flight per ASGI worker; more wait for a slot before their body is read. An
+# instance serves WEB_CONCURRENCY x ASGI_MAX_REQUESTS at once (each one holds a thread)
+ASGI_MAX_REQUESTS = int(os.getenv('ASGI_MAX_REQUESTS', 64))
+
+
+class FlaskASGI:
+    """
+    Serve a Flask app over ASGI (uvicorn) with asgiref's WsgiToAsgi, so Flask dispatches every
+    request itself. Each request runs on its own thread; Flask hands async views to asgiref's
+    async_to_sync, which schedules them on the server's event loop, so a request waiting on
+    Gemini, OpenWeatherMap or YouTube costs a parked thread and a coroutine, not a worker.
+    Async views keep blocking work (database, SDK calls) off the loop with app.services.async_io.
+
+    A request still holds its thread until it finishes, so a worker serves at most max_requests
+    at once: an instance's capacity is WEB_CONCURRENCY x ASGI_MAX_REQUESTS (128 with the
+    Dockerfile's 2 workers and the default 64). Reaching hundreds of concurrent requests per
+    instance means raising either one, with ASYNC_* pools and DB_MAX_CONNECTIONS to match.
+    """
+
+    def __init__(self, app, max_requests=ASGI_MAX_REQUESTS):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.max_requests = max_requests
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_requests)
+        async with self._slots:
+            # Without a context, asgiref runs the sync code of every request on one shared thread
+            async with ThreadSensitiveContext():
+                await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -1,40 +1,67 @@
 import os
 from dotenv import load_dotenv
 
+from app.services.db_pool import engine_options
+
 load_dotenv()
 
+def get_database_uri():
+    """Construct database URI from environment variables with Cloud SQL support"""
+    db_type = os.getenv('DB_TYPE', 'mysql')
+
+    if db_type.lower() == 'sqlite':
+        return os.getenv('DATABASE_URL', 'sqlite:///agri_assist.db')
+
+    # Check if running on Cloud Run (has Cloud SQL socket)
+    if os.path.exists('/cloudsql'):
+        # Cloud Run with Cloud SQL - use Unix socket
+        instance_connection_name = os.getenv('CLOUD_SQL_CONNECTION_NAME')
+        if instance_connection_name:
+            db_name = os.getenv('DB_NAME_2', 'agri_assist')
+            db_username = os.getenv('DB_USERNAME_2', 'agri_user')
+            db_password = os.getenv('DB_PASSWORD_2', 'password')
+
+            if db_type.lower() == 'postgresql':
+                return f'postgresql+psycopg2://{db_username}:{db_password}@/{db_name}?host=/cloudsql/{instance_connection_name}'
+            elif db_type.lower() == 'mysql':
+                return f'mysql+pymysql://{db_username}:{db_password}@/{db_name}?unix_socket=/cloudsql/{instance_connection_name}'
+
+    # For PostgreSQL/MySQL with TCP connection
+    db_host = os.getenv('DB_HOST', 'localhost')
+    db_port = os.getenv('DB_PORT', '5432' if db_type.lower() == 'postgresql' else '3306')
+    db_name = os.getenv('DB_NAME', 'agri_assist')
+    db_username = os.getenv('DB_USERNAME', 'root')
+    db_password = os.getenv('DB_PASSWORD', 'password')
+
+    if db_type.lower() == 'postgresql':
+        return f'postgresql://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}'
+    elif db_type.lower() == 'mysql':
+        return f'mysql+pymysql://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}'
+    else:
+        # Fallback to SQLite
+        return os.getenv('DATABASE_URL', 'sqlite:///agri_assist.db')
+
 class Config:
     # Flask Configuration
     FLASK_ENV = os.environ.get('FLASK_ENV')
-    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key')
     PORT = os.environ.get('PORT')
 
+    # Blueprints to serve: a profile from app.factory.PROFILES (full, catalog, ai) or a comma separated list
+    APP_PROFILE = os.environ.get('APP_PROFILE', 'full')
+    APP_BLUEPRINTS = os.environ.get('APP_BLUEPRINTS')
+
     # Database Configuration - Cloud SQL optimized
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
-    SQLALCHEMY_TRACK_MODIFICATIONS = True
-    
-    # Cloud SQL specific engine options
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,  # Verify connections before use
-        'pool_recycle': 300,    # Recycle connections every 5 minutes
-        'pool_timeout': 20,     # Wait up to 20 seconds for connection
-        'pool_size': 5,         # Maintain 5 connections
-        'max_overflow': 0,      # No overflow connections for Cloud SQL
-        'connect_args': {
-            'charset': 'utf8mb4',
-            'connect_timeout': 60,
-            'read_timeout': 60,
-            'write_timeout': 60,
-            # Cloud SQL specific options
-            'autocommit': True,
-            'sql_mode': 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'
-        }
-    }
-    
+    SQLALCHEMY_DATABASE_URI = get_database_uri()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pool sized per worker from WEB_CONCURRENCY / SERVER_THREADS / DB_MAX_CONNECTIONS (app/services/db_pool.py)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
     # Prevent automatic table drops - CRITICAL for Cloud SQL
     SQLALCHEMY_CREATE_ALL = True
     SQLALCHEMY_DROP_ALL = False
-    
+
     # Cloud SQL Connection
     CLOUD_SQL_CONNECTION_NAME = os.environ.get('CLOUD_SQL_CONNECTION_NAME')
 
@@ -42,7 +69,7 @@ class Config:
     GOOGLE_CLOUD_PROJECT = os.environ.get('GOOGLE_CLOUD_PROJECT')
     GOOGLE_CLOUD_LOCATION = os.environ.get('GOOGLE_CLOUD_LOCATION', 'us-central1')
     GOOGLE_CLOUD_STAGING_BUCKET = os.environ.get('GOOGLE_CLOUD_STAGING_BUCKET')
-    
+
     # Legacy Google AI support (for backward compatibility)
     GOOGLE_AI_API_KEY = os.environ.get('GOOGLE_AI_API_KEY')
 
@@ -51,4 +78,4 @@ class Config:
 
     # Weather API (optional)
     WEATHER_API_KEY = os.environ.get('WEATHER_API_KEY')
-    WEATHER_BASE_URL = os.environ.get('WEATHER_BASE_URL')
\ No newline at end of file
+    WEATHER_BASE_URL = os.environ.get('WEATHER_BASE_URL')
@@ -0,0 +1,157 @@
+import importlib
+import time
+
+import click
+from agri_common.ai_usage import AI_USAGE_DATABASE_URL, SQLBudgetStore, ai_usage
+from flask import Flask
+from flask_cors import CORS
+
+from app.config import Config
+from app.extensions import db
+from app.services.compression import init_compression
+from app.services.db_pool import init_db_pool
+from app.services.json_provider import FastJSONProvider
+from app.services.structured_logging import init_logging
+
+# Blueprint name -> (route module, URL prefix). Route modules are only imported when selected,
+# so a deployment without plants/crops/farmer never imports the AI service.
+BLUEPRINTS = {
+    'auth': ('app.routes.auth', '/api/auth'),
+    'plants': ('app.routes.plants', '/api/plants'),
+    'crops': ('app.routes.crops', '/api/crops'),
+    'weather': ('app.routes.weather', '/api/weather'),
+    'farmer': ('app.routes.farmer', '/api/farmer'),
+    'fields': ('app.routes.fields', '/api/fields'),
+    'help_farmer': ('app.routes.help_farmer', '/api/farmer_schemes'),
+    'transactions': ('app.routes.transactions', '/api/transactions'),
+    'metrics': ('app.routes.metrics', '/api/metrics'),
+    'search': ('app.routes.search', '/api/search'),
+}
+
+# Deployment profiles: the whole API, the read-only scheme/weather catalog, and the AI-backed
+# plant analysis and recommendation service
+PROFILES = {
+    'full': tuple(BLUEPRINTS),
+    'catalog': ('help_farmer', 'weather', 'search', 'metrics'),
+    'ai': ('auth', 'plants', 'crops', 'farmer', 'fields', 'transactions', 'metrics'),
+}
+
+
+def resolve_blueprints(blueprints=None, config=Config):
+    """
+    Blueprint names to register: an explicit list, a profile name, or else the config's
+    APP_BLUEPRINTS (comma separated) or APP_PROFILE
+    """
+    if blueprints is None:
+        listed = getattr(config, 'APP_BLUEPRINTS', None)
+        blueprints = listed.split(',') if listed else getattr(config, 'APP_PROFILE', 'full')
+    if isinstance(blueprints, str):
+        if blueprints not in PROFILES:
+            raise ValueError(f"Unknown app profile {blueprints!r} (expected one of {', '.join(PROFILES)})")
+        blueprints = PROFILES[blueprints]
+    names = [name.strip() for name in blueprints if name.strip()]
+    unknown = [name for name in names if name not in BLUEPRINTS]
+    if unknown:
+        raise ValueError(f"Unknown blueprints: {', '.join(unknown)}")
+    return names
+
+
+def create_app(config=Config, blueprints=None):
+    """
+    Build the Flask app from a config object (Config or a subclass) with the selected blueprints:
+    a list of names from BLUEPRINTS, a profile name from PROFILES, or None for the config's choice
+    """
+    start = time.perf_counter()
+    names = resolve_blueprints(blueprints, config)
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.json = FastJSONProvider(app)
+    init_logging(app)
+
+    # Initialize extensions
+    db.init_app(app)
+    init_db_pool(app)
+    if not AI_USAGE_DATABASE_URL:
+        # Daily AI budgets live in the app database, shared by every worker and kept across restarts
+        with app.app_context():
+            ai_usage.use_store(SQLBudgetStore(db.engine))
+    init_compression(app)
+    CORS(app)
+
+    # Register every model with SQLAlchemy so create_all covers the whole schema in any profile
+    from app import models  # noqa: F401
+
+    # Setup API documentation
+    from app.swagger_docs import setup_docs_route
+    setup_docs_route(app)
+
+    for name in names:
+        module, url_prefix = BLUEPRINTS[name]
+        app.register_blueprint(importlib.import_module(module).bp, url_prefix=url_prefix)
+    app.config['APP_BLUEPRINTS_REGISTERED'] = names
+
+    register_core_routes(app)
+    register_commands(app)
+
+    print(f"🚀 Created app with {len(names)} blueprints ({', '.join(names)}) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return app
+
+
+def register_core_routes(app):
+    @app.route('/')
+    def index():
+        return {
+            'message': 'Welcome to Agri-Assist Backend API',
+            'version': '1.0.0',
+            'documentation': '/docs/',
+            'endpoints': {
+                name: BLUEPRINTS[name][1] for name in app.config['APP_BLUEPRINTS_REGISTERED']
+            }
+        }
+
+    @app.route('/health')
+    def health_check():
+        """Health check endpoint for Cloud Run"""
+        try:
+            # Test database connection
+            with db.engine.connect() as conn:
+                conn.execute(db.text("SELECT 1"))
+            return {'status': 'healthy', 'service': 'agri-assist-backend', 'database': 'connected'}, 200
+        except Exception as e:
+            return {'status': 'unhealthy', 'service': 'agri-assist-backend', 'database': 'disconnected', 'error': str(e)}, 503
+
+
+def register_commands(app):
+    @app.cli.command('weather-alerts')
+    def weather_alerts_command():
+        """Evaluate weather alerts for every field with coordinates (run from cron / Cloud Scheduler)"""
+        from app.services.weather_alerts import run_weather_alerts
+        print(run_weather_alerts())
+
+    @app.cli.command('weather-retention')
+    def weather_retention_command():
+        """Delete weather samples and rollups past their retention (run from cron / Cloud Scheduler)"""
+        from app.services.weather_store import apply_retention
+        print(f"✅ Deleted {apply_retention()}")
+
+    @app.cli.command('geo-backfill')
+    def geo_backfill_command():
+        """Populate Field.geohash for fields created before the spatial index"""
+        from app.services.geo_index import backfill_geohashes
+        print(f"✅ Updated geohash on {backfill_geohashes()} fields")
+
+    @app.cli.command('build-gazetteer')
+    @click.argument('csv_paths', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+    def build_gazetteer_command(csv_paths):
+        """Compile PIN code CSVs (e.g. the India Post directory) into the offline gazetteer file"""
+        from app.services.pincode_gazetteer import build_gazetteer, PINCODE_GAZETTEER_PATH
+        coverage = build_gazetteer(csv_paths)
+        print(f"✅ Wrote {PINCODE_GAZETTEER_PATH}: {coverage}")
+
+    @app.cli.command('geocode-fields')
+    def geocode_fields_command():
+        """Place fields without coordinates at their PIN code centroid"""
+        from app.services.pincode_gazetteer import backfill_field_coordinates
+        print(f"✅ Updated coordinates on {backfill_field_coordinates()} fields")
@@ -1,5 +1,9 @@
 from app.extensions import db
 from datetime import datetime, date
+from sqlalchemy.dialects import mysql
+
+# Microsecond timestamps on MySQL, so edits within the same second still change a catalog fingerprint
+PreciseDateTime = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -41,14 +45,92 @@ class CropRecommendation(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class WeatherData(db.Model):
+    """Append-only raw weather samples: observations and forecast slots"""
     id = db.Column(db.Integer, primary_key=True)
+    location_key = db.Column(db.String(64), nullable=False)  # City name or snapped grid cell
     location = db.Column(db.String(100), nullable=False)
+    kind = db.Column(db.String(20), nullable=False, default='observation')  # observation | forecast
+    source = db.Column(db.String(30))  # openweathermap, replay
     temperature = db.Column(db.Float)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
     humidity = db.Column(db.Float)
-    rainfall = db.Column(db.Float)
+    rainfall = db.Column(db.Float)  # mm over the last hour (observations) or the 3h slot (forecasts)
     wind_speed = db.Column(db.Float)
+    description = db.Column(db.String(100))
+    forecast_for = db.Column(db.DateTime)  # UTC start of the forecast slot
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_weather_data_location_recorded', 'location_key', 'recorded_at'),
+        db.Index('ix_weather_data_kind_recorded', 'kind', 'recorded_at'),  # Retention deletes
+    )
+
+class WeatherHourly(db.Model):
+    """Hourly rollup of observations per location (UTC hours)"""
+    __tablename__ = 'weather_hourly'
+
+    id = db.Column(db.Integer, primary_key=True)
+    location_key = db.Column(db.String(64), nullable=False)
+    hour = db.Column(db.DateTime, nullable=False)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    temperature_sum = db.Column(db.Float, nullable=False, default=0.0)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
+    humidity_sum = db.Column(db.Float, nullable=False, default=0.0)
+    rainfall = db.Column(db.Float, nullable=False, default=0.0)  # Max 1h accumulation seen in the hour
+    wind_speed_max = db.Column(db.Float)
+
+    __table_args__ = (
+        db.UniqueConstraint('location_key', 'hour', name='uq_weather_hourly_location_hour'),
+        db.Index('ix_weather_hourly_hour', 'hour'),
+    )
+
+    def to_dict(self):
+        return {
+            'hour': self.hour.isoformat(),
+            'samples': self.samples,
+            'temperature_mean': round(self.temperature_sum / self.samples, 1) if self.samples else None,
+            'temperature_min': self.temperature_min,
+            'temperature_max': self.temperature_max,
+            'humidity_mean': round(self.humidity_sum / self.samples, 1) if self.samples else None,
+            'rainfall_mm': round(self.rainfall, 1),
+            'wind_speed_max': self.wind_speed_max
+        }
+
+class WeatherDaily(db.Model):
+    """Daily rollup of observations per location (local dates)"""
+    __tablename__ = 'weather_daily'
+
+    id = db.Column(db.Integer, primary_key=True)
+    location_key = db.Column(db.String(64), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    temperature_sum = db.Column(db.Float, nullable=False, default=0.0)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
+    humidity_sum = db.Column(db.Float, nullable=False, default=0.0)
+    rainfall = db.Column(db.Float, nullable=False, default=0.0)  # Sum of hourly rainfall
+    wind_speed_max = db.Column(db.Float)
+    utc_offset = db.Column(db.Integer)  # Seconds east of UTC of the location's local dates
+
+    __table_args__ = (
+        db.UniqueConstraint('location_key', 'day', name='uq_weather_daily_location_day'),
+        db.Index('ix_weather_daily_day', 'day'),
+    )
+
+    def to_dict(self):
+        return {
+            'date': self.day.isoformat(),
+            'samples': self.samples,
+            'temperature_mean': round(self.temperature_sum / self.samples, 1) if self.samples else None,
+            'temperature_min': self.temperature_min,
+            'temperature_max': self.temperature_max,
+            'humidity_mean': round(self.humidity_sum / self.samples, 1) if self.samples else None,
+            'rainfall_mm': round(self.rainfall, 1),
+            'wind_speed_max': self.wind_speed_max
+        }
+
 class Field(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -64,6 +146,8 @@ class Field(db.Model):
     water_source = db.Column(db.String(50))  # Borewell, canal, river, etc.
     latitude = db.Column(db.Float)  # GPS coordinates
     longitude = db.Column(db.Float)
+    coordinates_source = db.Column(db.String(10))  # gps | pincode (PIN code centroid)
+    geohash = db.Column(db.String(12), index=True)  # Spatial index cell, kept in sync with the coordinates
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -93,6 +177,48 @@ class Crop(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class WeatherAlert(db.Model):
+    """Forecast hazard for a field (and crop) awaiting delivery to the farmer"""
+    __tablename__ = 'weather_alerts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    field_id = db.Column(db.Integer, db.ForeignKey('field.id'), nullable=False)
+    crop_id = db.Column(db.Integer, db.ForeignKey('crop.id'))  # None for fields without an active crop
+    crop_type = db.Column(db.String(100))
+    growth_stage = db.Column(db.String(50))
+    hazard = db.Column(db.String(20), nullable=False)  # frost | heatwave | heavy_rain | high_wind
+    severity = db.Column(db.String(10), nullable=False)  # warning | severe
+    forecast_date = db.Column(db.Date, nullable=False)  # Local date of the hazard
+    value = db.Column(db.Float)  # Forecast value that crossed the threshold
+    threshold = db.Column(db.Float)
+    message = db.Column(db.String(255))
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending | delivered
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_weather_alerts_user_status', 'user_id', 'status'),
+        db.Index('ix_weather_alerts_forecast_date', 'forecast_date'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'field_id': self.field_id,
+            'crop_id': self.crop_id,
+            'crop_type': self.crop_type,
+            'growth_stage': self.growth_stage,
+            'hazard': self.hazard,
+            'severity': self.severity,
+            'forecast_date': self.forecast_date.isoformat(),
+            'value': self.value,
+            'threshold': self.threshold,
+            'message': self.message,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class FarmerScheme(db.Model):
     __tablename__ = 'farmer_schemes'
     
@@ -107,6 +233,8 @@ class FarmerScheme(db.Model):
     official_website = db.Column(db.String(255))
     launch_year = db.Column(db.Integer)
     status = db.Column(db.String(50))
+    # Part of the search index fingerprint, so workers pick up edits made elsewhere
+    updated_at = db.Column(PreciseDateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
         return {
@@ -137,6 +265,7 @@ class FarmerSchemeCrisis(db.Model):
     coverage = db.Column(db.Text)
     relief_benefit = db.Column(db.Text)
     farmer_action = db.Column(db.Text)
+    updated_at = db.Column(PreciseDateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def to_dict(self):
         return {
@@ -1,3 +1,4 @@
+import inspect
 import jwt
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, current_app
@@ -5,7 +6,6 @@ from app.models import User
 from app.extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
-import sys
 
 bp = Blueprint('auth', __name__)
 
@@ -29,20 +29,18 @@ def decode_jwt(token):
 @bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
-    current_app.logger.info(f"🔐 Received registration data: {data}")
-    sys.stdout.flush()  # Force flush stdout
+    current_app.logger.info("🔐 Received registration data fields: %s", sorted(data or {}))
     
-    # Debug database connection information
-    current_app.logger.info(f"💾 Database URI: {current_app.config.get('SQLALCHEMY_DATABASE_URI')}")
-    current_app.logger.info(f"💾 Database engine: {db.engine}")
-    current_app.logger.info(f"💾 Database connection info: {db.engine.url}")
+    # Debug database connection information (SQLAlchemy masks the password in both)
+    current_app.logger.info("💾 Database engine: %s", db.engine)
+    current_app.logger.info("💾 Database connection info: %s", db.engine.url)
     
     # Test database connection
     try:
         with db.engine.connect() as conn:
             current_app.logger.info("✅ Database connection successful")
     except Exception as e:
-        current_app.logger.error(f"❌ Database connection failed: {str(e)}")
+        current_app.logger.error("❌ Database connection failed: %s", e)
         return jsonify({'error': 'Database connection failed'}), 500
     
     required_fields = ['name', 'phone', 'password', 'gender', 'state', 'city', 'age']
@@ -51,15 +49,14 @@ def register():
 
     # Check if phone already exists
     existing_user = User.query.filter_by(phone=data['phone']).first()
-    current_app.logger.info(f"📊 Existing user check for phone {data['phone']}: {existing_user.name if existing_user else 'None'}")
+    current_app.logger.info("📊 Existing user check for phone %s: %s", data['phone'], existing_user.name if existing_user else 'None')
     
     if existing_user:
         return jsonify({'error': 'Phone number already registered'}), 409
 
-    # Generate password hash and debug
+    # Generate password hash
     password_hash = generate_password_hash(data['password'])
-    current_app.logger.info(f"🔐 Generated password hash length: {len(password_hash)}")
-    current_app.logger.info(f"🔐 Password hash: {password_hash[:50]}...")  # Show first 50 chars for debugging
+    current_app.logger.info("🔐 Generated password hash length: %s", len(password_hash))
     
     try:
         current_app.logger.info("💽 Creating User object")
@@ -73,7 +70,7 @@ def register():
             age=data['age'],
             language=data.get('language', 'english')
         )
-        current_app.logger.info(f"💽 User object created: {user.name}, {user.phone}")
+        current_app.logger.info("💽 User object created: %s, %s", user.name, user.phone)
         
         current_app.logger.info("💽 Adding User to database session")
         db.session.add(user)
@@ -81,12 +78,12 @@ def register():
         
         current_app.logger.info("💽 Committing user registration to database")
         db.session.commit()
-        current_app.logger.info(f"✅ User committed to database with ID: {user.id}")
+        current_app.logger.info("✅ User committed to database with ID: %s", user.id)
         
         return jsonify({'message': 'User registered successfully', 'user_id': user.id}), 201
         
     except Exception as e:
-        current_app.logger.error(f"❌ Error during user registration: {str(e)}")
+        current_app.logger.error("❌ Error during user registration: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
@@ -94,28 +91,28 @@ def register():
 @bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
-    current_app.logger.info(f"🔐 Login attempt for phone: {data.get('phone', 'Not provided')}")
+    current_app.logger.info("🔐 Login attempt for phone: %s", data.get('phone', 'Not provided'))
     
     phone = data.get('phone')
     password = data.get('password')
     if not phone or not password:
         return jsonify({'error': 'Phone and password required'}), 400
 
-    current_app.logger.info(f"📊 Querying User table for phone: {phone}")
+    current_app.logger.info("📊 Querying User table for phone: %s", phone)
     user = User.query.filter_by(phone=phone).first()
     
     if not user:
-        current_app.logger.warning(f"⚠️ No user found with phone: {phone}")
+        current_app.logger.warning("⚠️ No user found with phone: %s", phone)
         return jsonify({'error': 'Invalid phone or password'}), 401
     
-    current_app.logger.info(f"🔐 Checking password for user: {user.name}")
+    current_app.logger.info("🔐 Checking password for user: %s", user.name)
     password_valid = check_password_hash(user.password_hash, password)
     
     if not password_valid:
-        current_app.logger.warning(f"⚠️ Invalid password for user: {user.name}")
+        current_app.logger.warning("⚠️ Invalid password for user: %s", user.name)
         return jsonify({'error': 'Invalid phone or password'}), 401
 
-    current_app.logger.info(f"🔐 Generating JWT token for user: {user.name} (ID: {user.id})")
+    current_app.logger.info("🔐 Generating JWT token for user: %s (ID: %s)", user.name, user.id)
     token = generate_jwt(user.id)
     
     return jsonify({
@@ -133,16 +130,31 @@ def login():
         }
     }), 200
 
+def authenticate_request():
+    """Set request.user_id from the Bearer token; returns an error response when it is missing or invalid"""
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return jsonify({'error': 'Missing or invalid token'}), 401
+    token = auth_header.replace('Bearer ', '')
+    payload = decode_jwt(token)
+    if not payload:
+        return jsonify({'error': 'Invalid or expired token'}), 401
+    request.user_id = payload['user_id']
+    return None
+
 def jwt_required(func):
-    def wrapper(*args, **kwargs):
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Missing or invalid token'}), 401
-        token = auth_header.replace('Bearer ', '')
-        payload = decode_jwt(token)
-        if not payload:
-            return jsonify({'error': 'Invalid or expired token'}), 401
-        request.user_id = payload['user_id']
-        return func(*args, **kwargs)
+    # Async views stay coroutine functions so Flask runs them with async_to_sync (on the event loop under app.asgi)
+    if inspect.iscoroutinefunction(func):
+        async def wrapper(*args, **kwargs):
+            error = authenticate_request()
+            if error:
+                return error
+            return await func(*args, **kwargs)
+    else:
+        def wrapper(*args, **kwargs):
+            error = authenticate_request()
+            if error:
+                return error
+            return func(*args, **kwargs)
     wrapper.__name__ = func.__name__
     return wrapper
\ No newline at end of file
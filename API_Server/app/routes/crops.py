@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.models import CropRecommendation, User, Crop, Field
-from app.services.ai_service import get_crop_recommendations
+from app.services.ai_service import get_crop_recommendations, get_basic_crop_recommendations, field_growing_conditions
+from agri_common.ai_usage import AIBudgetExceeded
+from app.services.async_io import run_blocking, run_db, save_model
+from app.services.fuzzy_search import closest, normalize_term
 from app.routes.auth import jwt_required
 from app.extensions import db
 from datetime import datetime, date
@@ -12,40 +15,40 @@ bp = Blueprint('crops', __name__)
 def create_crop():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🌱 Creating crop for user_id: {user_id}")
+        current_app.logger.info("🌱 Creating crop for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 Querying User table for user_id: {user_id}")
+        current_app.logger.info("📊 Querying User table for user_id: %s", user_id)
         user = User.query.get(user_id)
-        current_app.logger.info(f"📊 User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 Received crop data: {data}")
+        current_app.logger.info("📥 Received crop data fields: %s", sorted(data or {}))
         
         required_fields = ['field_id', 'crop_type', 'sowing_date', 'area']
         
         if not all(field in data for field in required_fields):
-            current_app.logger.warning(f"⚠️ Missing required fields in data: {data}")
+            current_app.logger.warning("⚠️ Missing required fields in data: %s", sorted(data or {}))
             return jsonify({'error': 'Missing required fields'}), 400
 
         # Check if field belongs to user
-        current_app.logger.info(f"📊 Querying Field table for field_id: {data['field_id']}, user_id: {user_id}")
+        current_app.logger.info("📊 Querying Field table for field_id: %s, user_id: %s", data['field_id'], user_id)
         field = Field.query.filter_by(id=data['field_id'], user_id=user_id).first()
-        current_app.logger.info(f"📊 Field query result: {field.name if field else 'None'}")
+        current_app.logger.info("📊 Field query result: %s", field.name if field else 'None')
         
         if not field:
-            current_app.logger.warning(f"⚠️ Field {data['field_id']} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Field %s not found or not accessible for user %s", data['field_id'], user_id)
             return jsonify({'error': 'Field not found or not accessible'}), 404
 
         # Parse sowing_date
         try:
             sowing_date = datetime.strptime(data['sowing_date'], '%Y-%m-%d').date()
-            current_app.logger.info(f"📅 Parsed sowing_date: {sowing_date}")
+            current_app.logger.info("📅 Parsed sowing_date: %s", sowing_date)
         except ValueError:
-            current_app.logger.warning(f"⚠️ Invalid sowing_date format: {data['sowing_date']}")
+            current_app.logger.warning("⚠️ Invalid sowing_date format: %s", data['sowing_date'])
             return jsonify({'error': 'Invalid sowing_date format. Use YYYY-MM-DD'}), 400
 
         # Parse expected_harvest_date if provided
@@ -53,9 +56,9 @@ def create_crop():
         if data.get('expected_harvest_date'):
             try:
                 expected_harvest_date = datetime.strptime(data['expected_harvest_date'], '%Y-%m-%d').date()
-                current_app.logger.info(f"📅 Parsed expected_harvest_date: {expected_harvest_date}")
+                current_app.logger.info("📅 Parsed expected_harvest_date: %s", expected_harvest_date)
             except ValueError:
-                current_app.logger.warning(f"⚠️ Invalid expected_harvest_date format: {data['expected_harvest_date']}")
+                current_app.logger.warning("⚠️ Invalid expected_harvest_date format: %s", data['expected_harvest_date'])
                 return jsonify({'error': 'Invalid expected_harvest_date format. Use YYYY-MM-DD'}), 400
 
         current_app.logger.info("💽 Creating Crop object")
@@ -76,7 +79,7 @@ def create_crop():
             expected_yield=data.get('expected_yield'),
             notes=data.get('notes')
         )
-        current_app.logger.info(f"💽 Crop created: field_id={crop.field_id}, type={crop.crop_type}, area={crop.area}")
+        current_app.logger.info("💽 Crop created: field_id=%s, type=%s, area=%s", crop.field_id, crop.crop_type, crop.area)
 
         current_app.logger.info("💽 Adding Crop to database session")
         db.session.add(crop)
@@ -84,7 +87,7 @@ def create_crop():
         
         current_app.logger.info("💽 Committing database transaction")
         db.session.commit()
-        current_app.logger.info(f"✅ Crop committed to database with ID: {crop.id}")
+        current_app.logger.info("✅ Crop committed to database with ID: %s", crop.id)
 
         response_data = {
             'message': 'Crop created successfully',
@@ -94,18 +97,18 @@ def create_crop():
                 'field_id': crop.field_id,
                 'crop_type': crop.crop_type,
                 'variety': crop.variety,
-                'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
+                'sowing_date': crop.sowing_date,
                 'area': crop.area,
                 'growth_stage': crop.growth_stage,
                 'subsidy_eligible': crop.subsidy_eligible,
-                'created_at': crop.created_at.isoformat()
+                'created_at': crop.created_at
             }
         }
-        current_app.logger.info(f"📤 Returning crop creation response")
+        current_app.logger.info("📤 Returning crop creation response")
         return jsonify(response_data), 201
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error creating crop: {str(e)}")
+        current_app.logger.error("❌ Error creating crop: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -116,38 +119,49 @@ def list_crops():
     try:
         user_id = request.user_id
         field_id = request.args.get('field_id', type=int)
-        current_app.logger.info(f"📋 Listing crops for user_id: {user_id}, field_id: {field_id}")
+        crop_type = request.args.get('crop_type', '').strip()
+        current_app.logger.info("📋 Listing crops for user_id: %s, field_id: %s, crop_type: %s", user_id, field_id, crop_type)
         
         if field_id:
             # Check if field belongs to user
-            current_app.logger.info(f"📊 Querying Field table for field_id: {field_id}, user_id: {user_id}")
+            current_app.logger.info("📊 Querying Field table for field_id: %s, user_id: %s", field_id, user_id)
             field = Field.query.filter_by(id=field_id, user_id=user_id).first()
-            current_app.logger.info(f"📊 Field query result: {field.name if field else 'None'}")
+            current_app.logger.info("📊 Field query result: %s", field.name if field else 'None')
             
             if not field:
-                current_app.logger.warning(f"⚠️ Field {field_id} not found or not accessible for user {user_id}")
+                current_app.logger.warning("⚠️ Field %s not found or not accessible for user %s", field_id, user_id)
                 return jsonify({'error': 'Field not found or not accessible'}), 404
                 
-            current_app.logger.info(f"📊 Querying Crop table for field_id: {field_id}")
+            current_app.logger.info("📊 Querying Crop table for field_id: %s", field_id)
             crops = Crop.query.filter_by(field_id=field_id).all()
-            current_app.logger.info(f"📊 Found {len(crops)} crops for field {field_id}")
+            current_app.logger.info("📊 Found %s crops for field %s", len(crops), field_id)
         else:
             # Get all crops for all user's fields
-            current_app.logger.info(f"📊 Querying Field table for user_id: {user_id}")
+            current_app.logger.info("📊 Querying Field table for user_id: %s", user_id)
             user_fields = Field.query.filter_by(user_id=user_id).all()
-            current_app.logger.info(f"📊 Found {len(user_fields)} fields for user")
+            current_app.logger.info("📊 Found %s fields for user", len(user_fields))
             
             field_ids = [field.id for field in user_fields]
-            current_app.logger.info(f"📊 Field IDs: {field_ids}")
+            current_app.logger.info("📊 Field IDs: %s", field_ids)
             
-            current_app.logger.info(f"📊 Querying Crop table for field_ids: {field_ids}")
+            current_app.logger.info("📊 Querying Crop table for field_ids: %s", field_ids)
             crops = Crop.query.filter(Crop.field_id.in_(field_ids)).all()
-            current_app.logger.info(f"📊 Found {len(crops)} total crops for user")
+            current_app.logger.info("📊 Found %s total crops for user", len(crops))
+
+        crop_type_match = None
+        if crop_type:
+            wanted = normalize_term(crop_type)
+            if not any(normalize_term(crop.crop_type) == wanted for crop in crops):
+                # Misspelled filter ("tamato"): use the closest of the user's crop types
+                crop_type_match = closest(crop_type, {crop.crop_type for crop in crops})
+                current_app.logger.info("🔤 Crop type '%s' not found, closest: %s", crop_type, crop_type_match)
+                wanted = normalize_term(crop_type_match) if crop_type_match else None
+            crops = [crop for crop in crops if normalize_term(crop.crop_type) == wanted]
 
         crop_list = []
         for i, crop in enumerate(crops):
-            current_app.logger.info(f"📊 Processing crop {i+1}: ID={crop.id}, type={crop.crop_type}")
-            current_app.logger.info(f"📊 Loading field relationship for crop {crop.id}")
+            current_app.logger.debug("📊 Processing crop %s: ID=%s, type=%s", i+1, crop.id, crop.crop_type)
+            current_app.logger.debug("📊 Loading field relationship for crop %s", crop.id)
             
             crop_data = {
                 'id': crop.id,
@@ -155,8 +169,8 @@ def list_crops():
                 'field_name': crop.field.name,
                 'crop_type': crop.crop_type,
                 'variety': crop.variety,
-                'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
-                'expected_harvest_date': crop.expected_harvest_date.isoformat() if crop.expected_harvest_date else None,
+                'sowing_date': crop.sowing_date,
+                'expected_harvest_date': crop.expected_harvest_date,
                 'area': crop.area,
                 'subsidy_eligible': crop.subsidy_eligible,
                 'seed_quantity': crop.seed_quantity,
@@ -167,19 +181,22 @@ def list_crops():
                 'growth_stage': crop.growth_stage,
                 'expected_yield': crop.expected_yield,
                 'actual_yield': crop.actual_yield,
-                'harvest_date': crop.harvest_date.isoformat() if crop.harvest_date else None,
+                'harvest_date': crop.harvest_date,
                 'market_price': crop.market_price,
                 'notes': crop.notes,
-                'created_at': crop.created_at.isoformat() if crop.created_at else None,
-                'updated_at': crop.updated_at.isoformat() if crop.updated_at else None
+                'created_at': crop.created_at,
+                'updated_at': crop.updated_at
             }
             crop_list.append(crop_data)
 
-        current_app.logger.info(f"📤 Returning {len(crop_list)} crops")
-        return jsonify({'crops': crop_list}), 200
+        current_app.logger.info("📤 Returning %s crops", len(crop_list))
+        response = {'crops': crop_list}
+        if crop_type_match:
+            response['crop_type_match'] = crop_type_match
+        return jsonify(response), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error listing crops: {str(e)}")
+        current_app.logger.error("❌ Error listing crops: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:crop_id>', methods=['GET'])
@@ -187,7 +204,7 @@ def list_crops():
 def get_crop(crop_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"📋 Getting crop details for crop_id: {crop_id}, user_id: {user_id}")
+        current_app.logger.info("📋 Getting crop details for crop_id: %s, user_id: %s", crop_id, user_id)
         
         crop = Crop.query.join(Field).filter(
             Crop.id == crop_id,
@@ -195,7 +212,7 @@ def get_crop(crop_id):
         ).first()
         
         if not crop:
-            current_app.logger.warning(f"⚠️ Crop {crop_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Crop %s not found or not accessible for user %s", crop_id, user_id)
             return jsonify({'error': 'Crop not found or not accessible'}), 404
 
         crop_data = {
@@ -204,8 +221,8 @@ def get_crop(crop_id):
             'field_name': crop.field.name,
             'crop_type': crop.crop_type,
             'variety': crop.variety,
-            'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
-            'expected_harvest_date': crop.expected_harvest_date.isoformat() if crop.expected_harvest_date else None,
+            'sowing_date': crop.sowing_date,
+            'expected_harvest_date': crop.expected_harvest_date,
             'area': crop.area,
             'subsidy_eligible': crop.subsidy_eligible,
             'seed_quantity': crop.seed_quantity,
@@ -216,18 +233,18 @@ def get_crop(crop_id):
             'growth_stage': crop.growth_stage,
             'expected_yield': crop.expected_yield,
             'actual_yield': crop.actual_yield,
-            'harvest_date': crop.harvest_date.isoformat() if crop.harvest_date else None,
+            'harvest_date': crop.harvest_date,
             'market_price': crop.market_price,
             'notes': crop.notes,
-            'created_at': crop.created_at.isoformat() if crop.created_at else None,
-            'updated_at': crop.updated_at.isoformat() if crop.updated_at else None
+            'created_at': crop.created_at,
+            'updated_at': crop.updated_at
         }
 
-        current_app.logger.info(f"📤 Returning crop details")
+        current_app.logger.info("📤 Returning crop details")
         return jsonify({'crop': crop_data}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting crop details: {str(e)}")
+        current_app.logger.error("❌ Error getting crop details: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:crop_id>/update', methods=['PUT'])
@@ -235,7 +252,7 @@ def get_crop(crop_id):
 def update_crop(crop_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"✏️ Updating crop_id: {crop_id} for user_id: {user_id}")
+        current_app.logger.info("✏️ Updating crop_id: %s for user_id: %s", crop_id, user_id)
         
         crop = Crop.query.join(Field).filter(
             Crop.id == crop_id,
@@ -243,11 +260,11 @@ def update_crop(crop_id):
         ).first()
         
         if not crop:
-            current_app.logger.warning(f"⚠️ Crop {crop_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Crop %s not found or not accessible for user %s", crop_id, user_id)
             return jsonify({'error': 'Crop not found or not accessible'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 Received update data: {data}")
+        current_app.logger.info("📥 Received update data fields: %s", sorted(data or {}))
         
         # Update crop attributes
         updateable_fields = [
@@ -258,40 +275,40 @@ def update_crop(crop_id):
         
         for field_name in updateable_fields:
             if field_name in data:
-                current_app.logger.info(f"✏️ Updating {field_name} to {data[field_name]}")
+                current_app.logger.info("✏️ Updating %s to %s", field_name, data[field_name])
                 setattr(crop, field_name, data[field_name])
 
         # Handle date fields separately
         if 'sowing_date' in data:
             try:
                 crop.sowing_date = datetime.strptime(data['sowing_date'], '%Y-%m-%d').date()
-                current_app.logger.info(f"📅 Updated sowing_date: {crop.sowing_date}")
+                current_app.logger.info("📅 Updated sowing_date: %s", crop.sowing_date)
             except ValueError:
-                current_app.logger.warning(f"⚠️ Invalid sowing_date format: {data['sowing_date']}")
+                current_app.logger.warning("⚠️ Invalid sowing_date format: %s", data['sowing_date'])
                 return jsonify({'error': 'Invalid sowing_date format. Use YYYY-MM-DD'}), 400
 
         if 'expected_harvest_date' in data:
             try:
                 crop.expected_harvest_date = datetime.strptime(data['expected_harvest_date'], '%Y-%m-%d').date()
-                current_app.logger.info(f"📅 Updated expected_harvest_date: {crop.expected_harvest_date}")
+                current_app.logger.info("📅 Updated expected_harvest_date: %s", crop.expected_harvest_date)
             except ValueError:
-                current_app.logger.warning(f"⚠️ Invalid expected_harvest_date format: {data['expected_harvest_date']}")
+                current_app.logger.warning("⚠️ Invalid expected_harvest_date format: %s", data['expected_harvest_date'])
                 return jsonify({'error': 'Invalid expected_harvest_date format. Use YYYY-MM-DD'}), 400
 
         if 'harvest_date' in data:
             try:
                 crop.harvest_date = datetime.strptime(data['harvest_date'], '%Y-%m-%d').date()
-                current_app.logger.info(f"📅 Updated harvest_date: {crop.harvest_date}")
+                current_app.logger.info("📅 Updated harvest_date: %s", crop.harvest_date)
             except ValueError:
-                current_app.logger.warning(f"⚠️ Invalid harvest_date format: {data['harvest_date']}")
+                current_app.logger.warning("⚠️ Invalid harvest_date format: %s", data['harvest_date'])
                 return jsonify({'error': 'Invalid harvest_date format. Use YYYY-MM-DD'}), 400
 
         crop.updated_at = datetime.utcnow()
-        current_app.logger.info(f"🕒 Updated crop timestamp: {crop.updated_at}")
+        current_app.logger.info("🕒 Updated crop timestamp: %s", crop.updated_at)
 
         current_app.logger.info("💽 Committing database transaction")
         db.session.commit()
-        current_app.logger.info(f"✅ Crop updated in database with ID: {crop.id}")
+        current_app.logger.info("✅ Crop updated in database with ID: %s", crop.id)
 
         return jsonify({
             'message': 'Crop updated successfully',
@@ -299,12 +316,12 @@ def update_crop(crop_id):
                 'id': crop.id,
                 'crop_type': crop.crop_type,
                 'growth_stage': crop.growth_stage,
-                'updated_at': crop.updated_at.isoformat()
+                'updated_at': crop.updated_at
             }
         }), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error updating crop: {str(e)}")
+        current_app.logger.error("❌ Error updating crop: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -314,7 +331,7 @@ def update_crop(crop_id):
 def delete_crop(crop_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🗑️ Deleting crop_id: {crop_id} for user_id: {user_id}")
+        current_app.logger.info("🗑️ Deleting crop_id: %s for user_id: %s", crop_id, user_id)
         
         crop = Crop.query.join(Field).filter(
             Crop.id == crop_id,
@@ -322,18 +339,18 @@ def delete_crop(crop_id):
         ).first()
         
         if not crop:
-            current_app.logger.warning(f"⚠️ Crop {crop_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Crop %s not found or not accessible for user %s", crop_id, user_id)
             return jsonify({'error': 'Crop not found or not accessible'}), 404
 
         db.session.delete(crop)
-        current_app.logger.info(f"💽 Crop {crop_id} deleted from session")
+        current_app.logger.info("💽 Crop %s deleted from session", crop_id)
         db.session.commit()
-        current_app.logger.info(f"✅ Crop {crop_id} deleted from database")
+        current_app.logger.info("✅ Crop %s deleted from database", crop_id)
 
         return jsonify({'message': 'Crop deleted successfully'}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error deleting crop: {str(e)}")
+        current_app.logger.error("❌ Error deleting crop: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -343,7 +360,7 @@ def delete_crop(crop_id):
 def harvest_crop(crop_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🌾 Recording harvest for crop_id: {crop_id}, user_id: {user_id}")
+        current_app.logger.info("🌾 Recording harvest for crop_id: %s, user_id: %s", crop_id, user_id)
         
         crop = Crop.query.join(Field).filter(
             Crop.id == crop_id,
@@ -351,53 +368,53 @@ def harvest_crop(crop_id):
         ).first()
         
         if not crop:
-            current_app.logger.warning(f"⚠️ Crop {crop_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Crop %s not found or not accessible for user %s", crop_id, user_id)
             return jsonify({'error': 'Crop not found or not accessible'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 Received harvest data: {data}")
+        current_app.logger.info("📥 Received harvest data fields: %s", sorted(data or {}))
         
         # Update harvest information
         if 'harvest_date' in data:
             try:
                 crop.harvest_date = datetime.strptime(data['harvest_date'], '%Y-%m-%d').date()
-                current_app.logger.info(f"📅 Updated harvest_date: {crop.harvest_date}")
+                current_app.logger.info("📅 Updated harvest_date: %s", crop.harvest_date)
             except ValueError:
                 crop.harvest_date = date.today()
-                current_app.logger.info(f"📅 Defaulting harvest_date to today: {crop.harvest_date}")
+                current_app.logger.info("📅 Defaulting harvest_date to today: %s", crop.harvest_date)
         else:
             crop.harvest_date = date.today()
-            current_app.logger.info(f"📅 Defaulting harvest_date to today: {crop.harvest_date}")
+            current_app.logger.info("📅 Defaulting harvest_date to today: %s", crop.harvest_date)
 
         if 'actual_yield' in data:
             crop.actual_yield = data['actual_yield']
-            current_app.logger.info(f"📈 Updated actual_yield: {crop.actual_yield}")
+            current_app.logger.info("📈 Updated actual_yield: %s", crop.actual_yield)
         
         if 'market_price' in data:
             crop.market_price = data['market_price']
-            current_app.logger.info(f"💰 Updated market_price: {crop.market_price}")
+            current_app.logger.info("💰 Updated market_price: %s", crop.market_price)
 
         crop.growth_stage = 'Harvested'
         crop.updated_at = datetime.utcnow()
-        current_app.logger.info(f"🕒 Updated crop timestamp: {crop.updated_at}")
+        current_app.logger.info("🕒 Updated crop timestamp: %s", crop.updated_at)
 
         current_app.logger.info("💽 Committing database transaction")
         db.session.commit()
-        current_app.logger.info(f"✅ Crop harvest recorded in database with ID: {crop.id}")
+        current_app.logger.info("✅ Crop harvest recorded in database with ID: %s", crop.id)
 
         return jsonify({
             'message': 'Crop harvest recorded successfully',
             'crop': {
                 'id': crop.id,
                 'crop_type': crop.crop_type,
-                'harvest_date': crop.harvest_date.isoformat(),
+                'harvest_date': crop.harvest_date,
                 'actual_yield': crop.actual_yield,
                 'market_price': crop.market_price
             }
         }), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error recording crop harvest: {str(e)}")
+        current_app.logger.error("❌ Error recording crop harvest: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -409,53 +426,68 @@ def test_route():
 
 @bp.route('/recommend', methods=['POST'])
 @jwt_required  
-def recommend_crops():
+async def recommend_crops():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🤖 Getting crop recommendations for user_id: {user_id}")
+        current_app.logger.info("🤖 Getting crop recommendations for user_id: %s", user_id)
         
-        user = User.query.get(user_id)
+        user = await run_db(db.session.get, User, user_id)
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
-        current_app.logger.info(f"📥 Received recommendation data: {data}")
-        
-        # Get crop recommendations using AI
-        recommendations = get_crop_recommendations(
-            soil_type=data.get('soil_type'),
+        current_app.logger.info("📥 Received recommendation data fields: %s", sorted(data or {}))
+        
+        # Local suitability engine; AI only when a narrative is requested
+        conditions = {
+            'soil_type': data.get('soil_type'),
+            'soil_ph': data.get('soil_ph'),
+            'irrigation_type': data.get('irrigation_type'),
+            'location': data.get('location'),
+            'weather': None
+        }
+        if data.get('field_id'):
+            field = await run_db(lambda: Field.query.filter_by(id=data['field_id'], user_id=user.id).first())
+            if not field:
+                return jsonify({'error': 'Field not found'}), 404
+            conditions.update(await field_growing_conditions(field))
+
+        recommendations = await run_blocking(
+            'ai', get_crop_recommendations,
             climate_zone=data.get('climate_zone'),
-            location=data.get('location'),
-            season=data.get('season')
+            season=data.get('season'),
+            narrative=bool(data.get('narrative')),
+            **conditions
         )
-        current_app.logger.info(f"📊 AI recommendations: {recommendations}")
+        current_app.logger.info("📊 AI recommendations: %s", recommendations.get('crops', []))
         
         # Save recommendation to database
         crop_rec = CropRecommendation(
             user_id=user.id,
-            soil_type=data.get('soil_type'),
+            soil_type=conditions['soil_type'],
             climate_zone=data.get('climate_zone'),
             recommended_crops=str(recommendations.get('crops', [])),
             season=data.get('season')
         )
         
-        db.session.add(crop_rec)
-        current_app.logger.info("💽 Recommendation added to session")
-        db.session.commit()
-        current_app.logger.info(f"✅ Recommendation committed to database with ID: {crop_rec.id}")
+        recommendation_id = await run_db(save_model, crop_rec)
+        current_app.logger.info("✅ Recommendation committed to database with ID: %s", recommendation_id)
         
         return jsonify({
-            'recommendation_id': crop_rec.id,
+            'recommendation_id': recommendation_id,
             'recommended_crops': recommendations.get('crops'),
+            'detailed_crops': recommendations.get('detailed_crops'),
             'farming_tips': recommendations.get('farming_tips'),
-            'best_practices': recommendations.get('best_practices')
+            'best_practices': recommendations.get('best_practices'),
+            'source': recommendations.get('ai_source')
         }), 200
         
+    except AIBudgetExceeded as e:
+        current_app.logger.warning("⚠️ AI budget exceeded: %s", e)
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting crop recommendations: {str(e)}")
-        db.session.rollback()
-        current_app.logger.info("🔄 Database session rolled back")
+        current_app.logger.error("❌ Error getting crop recommendations: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/suitable', methods=['GET'])
@@ -463,23 +495,31 @@ def get_suitable_crops():
     try:
         location = request.args.get('location')
         season = request.args.get('season', 'current')
+        temperature = request.args.get('temperature', type=float)
+        rainfall = request.args.get('rainfall', type=float)
         
-        current_app.logger.info(f"🌾 Getting suitable crops for location: {location}, season: {season}")
-        suitable_crops = get_crop_recommendations(
+        current_app.logger.info("🌾 Getting suitable crops for location: %s, season: %s", location, season)
+        suitable_crops = get_basic_crop_recommendations(
+            soil_type=request.args.get('soil_type'),
+            climate_zone=request.args.get('climate_zone'),
             location=location,
             season=season,
-            quick_lookup=True
+            soil_ph=request.args.get('soil_ph', type=float),
+            irrigation_type=request.args.get('irrigation_type'),
+            weather={'temperature': temperature, 'rainfall_mm': rainfall},
+            limit=request.args.get('limit', 10, type=int)
         )
         
-        current_app.logger.info(f"📊 Suitable crops: {suitable_crops.get('crops', [])}")
+        current_app.logger.info("📊 Suitable crops: %s", suitable_crops.get('crops', []))
         return jsonify({
             'location': location,
-            'season': season,
-            'suitable_crops': suitable_crops.get('crops', [])
+            'season': suitable_crops.get('season'),
+            'suitable_crops': suitable_crops.get('crops', []),
+            'detailed_crops': suitable_crops.get('detailed_crops', [])
         }), 200
         
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting suitable crops: {str(e)}")
+        current_app.logger.error("❌ Error getting suitable crops: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/analytics', methods=['GET'])
@@ -487,19 +527,19 @@ def get_suitable_crops():
 def get_crop_analytics():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"📊 Getting crop analytics for user_id: {user_id}")
+        current_app.logger.info("📊 Getting crop analytics for user_id: %s", user_id)
         
         # Get all user's fields and crops
-        current_app.logger.info(f"📊 Querying Field table for user_id: {user_id}")
+        current_app.logger.info("📊 Querying Field table for user_id: %s", user_id)
         user_fields = Field.query.filter_by(user_id=user_id).all()
-        current_app.logger.info(f"📊 Found {len(user_fields)} fields for user")
+        current_app.logger.info("📊 Found %s fields for user", len(user_fields))
         
         field_ids = [field.id for field in user_fields]
-        current_app.logger.info(f"📊 Field IDs: {field_ids}")
+        current_app.logger.info("📊 Field IDs: %s", field_ids)
         
-        current_app.logger.info(f"📊 Querying Crop table for field_ids: {field_ids}")
+        current_app.logger.info("📊 Querying Crop table for field_ids: %s", field_ids)
         crops = Crop.query.filter(Crop.field_id.in_(field_ids)).all()
-        current_app.logger.info(f"📊 Found {len(crops)} total crops for analytics")
+        current_app.logger.info("📊 Found %s total crops for analytics", len(crops))
         
         # Calculate analytics
         total_crops = len(crops)
@@ -507,31 +547,31 @@ def get_crop_analytics():
         harvested_crops = [crop for crop in crops if crop.harvest_date is not None]
         active_crops = [crop for crop in crops if crop.growth_stage not in ['Harvested', 'Failed']]
         
-        current_app.logger.info(f"📊 Analytics summary: total_crops={total_crops}, total_area={total_area}")
-        current_app.logger.info(f"📊 Analytics summary: harvested={len(harvested_crops)}, active={len(active_crops)}")
+        current_app.logger.info("📊 Analytics summary: total_crops=%s, total_area=%s", total_crops, total_area)
+        current_app.logger.info("📊 Analytics summary: harvested=%s, active=%s", len(harvested_crops), len(active_crops))
         
         # Crop type distribution
         crop_types = {}
         for crop in crops:
             crop_types[crop.crop_type] = crop_types.get(crop.crop_type, 0) + 1
-        current_app.logger.info(f"📊 Crop type distribution: {crop_types}")
+        current_app.logger.info("📊 Crop type distribution: %s", crop_types)
         
         # Growth stage distribution
         growth_stages = {}
         for crop in active_crops:
             stage = crop.growth_stage or 'Unknown'
             growth_stages[stage] = growth_stages.get(stage, 0) + 1
-        current_app.logger.info(f"📊 Growth stage distribution: {growth_stages}")
+        current_app.logger.info("📊 Growth stage distribution: %s", growth_stages)
         
         # Yield analysis
         total_expected_yield = sum(crop.expected_yield or 0 for crop in crops)
         total_actual_yield = sum(crop.actual_yield or 0 for crop in harvested_crops)
-        current_app.logger.info(f"📊 Yield analysis: expected={total_expected_yield}, actual={total_actual_yield}")
+        current_app.logger.info("📊 Yield analysis: expected=%s, actual=%s", total_expected_yield, total_actual_yield)
         
         # Financial analysis
         total_seed_cost = sum(crop.seed_cost or 0 for crop in crops)
         total_revenue = sum((crop.actual_yield or 0) * (crop.market_price or 0) for crop in harvested_crops)
-        current_app.logger.info(f"📊 Financial analysis: seed_cost={total_seed_cost}, revenue={total_revenue}")
+        current_app.logger.info("📊 Financial analysis: seed_cost=%s, revenue=%s", total_seed_cost, total_revenue)
         
         analytics_data = {
             'summary': {
@@ -558,11 +598,11 @@ def get_crop_analytics():
             }
         }
         
-        current_app.logger.info(f"📤 Returning analytics data")
+        current_app.logger.info("📤 Returning analytics data")
         return jsonify({'analytics': analytics_data}), 200
         
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting crop analytics: {str(e)}")
+        current_app.logger.error("❌ Error getting crop analytics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/seasonal-report', methods=['GET'])
@@ -573,7 +613,7 @@ def get_seasonal_report():
         season = request.args.get('season', 'current')
         year = request.args.get('year', datetime.now().year, type=int)
         
-        current_app.logger.info(f"📅 Generating seasonal report for user_id: {user_id}, season: {season}, year: {year}")
+        current_app.logger.info("📅 Generating seasonal report for user_id: %s, season: %s, year: %s", user_id, season, year)
         
         # Get all user's fields and crops for the specified period
         user_fields = Field.query.filter_by(user_id=user_id).all()
@@ -585,7 +625,7 @@ def get_seasonal_report():
             db.extract('year', Crop.sowing_date) == year
         ).all()
         
-        current_app.logger.info(f"📊 Found {len(crops)} crops for seasonal report")
+        current_app.logger.info("📊 Found %s crops for seasonal report", len(crops))
         
         # Season-specific filtering (basic implementation)
         if season != 'current':
@@ -599,7 +639,7 @@ def get_seasonal_report():
             if season.lower() in season_months:
                 months = season_months[season.lower()]
                 crops = [crop for crop in crops if crop.sowing_date and crop.sowing_date.month in months]
-                current_app.logger.info(f"📊 Filtered crops by season ({season}): {len(crops)} crops")
+                current_app.logger.info("📊 Filtered crops by season (%s): %s crops", season, len(crops))
         
         # Generate report
         seasonal_data = {
@@ -616,7 +656,7 @@ def get_seasonal_report():
                 'variety': crop.variety,
                 'field_name': crop.field.name,
                 'area': crop.area,
-                'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
+                'sowing_date': crop.sowing_date,
                 'growth_stage': crop.growth_stage,
                 'expected_yield': crop.expected_yield,
                 'actual_yield': crop.actual_yield,
@@ -624,9 +664,9 @@ def get_seasonal_report():
             }
             seasonal_data['crop_details'].append(crop_detail)
         
-        current_app.logger.info(f"📤 Returning seasonal report data")
+        current_app.logger.info("📤 Returning seasonal report data")
         return jsonify({'seasonal_report': seasonal_data}), 200
         
     except Exception as e:
-        current_app.logger.error(f"❌ Error generating seasonal report: {str(e)}")
+        current_app.logger.error("❌ Error generating seasonal report: %s", e)
         return jsonify({'error': str(e)}), 500
@@ -139,40 +139,40 @@ class CropTest(Resource):
 def create_crop():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🌱 [Swagger] Creating crop for user_id: {user_id}")
+        current_app.logger.info("🌱 [Swagger] Creating crop for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 [Swagger] Querying User table for user_id: {user_id}")
+        current_app.logger.info("📊 [Swagger] Querying User table for user_id: %s", user_id)
         user = User.query.get(user_id)
-        current_app.logger.info(f"📊 [Swagger] User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 [Swagger] User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ [Swagger] User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ [Swagger] User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 [Swagger] Received crop data: {data}")
+        current_app.logger.info("📥 [Swagger] Received crop data fields: %s", sorted(data or {}))
         
         required_fields = ['field_id', 'crop_type', 'sowing_date', 'area']
         
         if not all(field in data for field in required_fields):
-            current_app.logger.warning(f"⚠️ [Swagger] Missing required fields in data: {data}")
+            current_app.logger.warning("⚠️ [Swagger] Missing required fields in data: %s", sorted(data or {}))
             return jsonify({'error': 'Missing required fields'}), 400
 
         # Check if field belongs to user
-        current_app.logger.info(f"📊 [Swagger] Querying Field table for field_id: {data['field_id']}, user_id: {user_id}")
+        current_app.logger.info("📊 [Swagger] Querying Field table for field_id: %s, user_id: %s", data['field_id'], user_id)
         field = Field.query.filter_by(id=data['field_id'], user_id=user_id).first()
-        current_app.logger.info(f"📊 [Swagger] Field query result: {field.name if field else 'None'}")
+        current_app.logger.info("📊 [Swagger] Field query result: %s", field.name if field else 'None')
         
         if not field:
-            current_app.logger.warning(f"⚠️ [Swagger] Field {data['field_id']} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ [Swagger] Field %s not found or not accessible for user %s", data['field_id'], user_id)
             return jsonify({'error': 'Field not found or not accessible'}), 404
 
         # Parse sowing_date
         try:
             sowing_date = datetime.strptime(data['sowing_date'], '%Y-%m-%d').date()
-            current_app.logger.info(f"📅 [Swagger] Parsed sowing_date: {sowing_date}")
+            current_app.logger.info("📅 [Swagger] Parsed sowing_date: %s", sowing_date)
         except ValueError:
-            current_app.logger.warning(f"⚠️ [Swagger] Invalid sowing_date format: {data['sowing_date']}")
+            current_app.logger.warning("⚠️ [Swagger] Invalid sowing_date format: %s", data['sowing_date'])
             return jsonify({'error': 'Invalid sowing_date format. Use YYYY-MM-DD'}), 400
 
         # Parse expected_harvest_date if provided
@@ -180,9 +180,9 @@ def create_crop():
         if data.get('expected_harvest_date'):
             try:
                 expected_harvest_date = datetime.strptime(data['expected_harvest_date'], '%Y-%m-%d').date()
-                current_app.logger.info(f"📅 [Swagger] Parsed expected_harvest_date: {expected_harvest_date}")
+                current_app.logger.info("📅 [Swagger] Parsed expected_harvest_date: %s", expected_harvest_date)
             except ValueError:
-                current_app.logger.warning(f"⚠️ [Swagger] Invalid expected_harvest_date format: {data['expected_harvest_date']}")
+                current_app.logger.warning("⚠️ [Swagger] Invalid expected_harvest_date format: %s", data['expected_harvest_date'])
                 return jsonify({'error': 'Invalid expected_harvest_date format. Use YYYY-MM-DD'}), 400
 
         current_app.logger.info("💽 [Swagger] Creating Crop object")
@@ -203,7 +203,7 @@ def create_crop():
             expected_yield=data.get('expected_yield'),
             notes=data.get('notes')
         )
-        current_app.logger.info(f"💽 [Swagger] Crop created: field_id={crop.field_id}, type={crop.crop_type}, area={crop.area}")
+        current_app.logger.info("💽 [Swagger] Crop created: field_id=%s, type=%s, area=%s", crop.field_id, crop.crop_type, crop.area)
 
         current_app.logger.info("💽 [Swagger] Adding Crop to database session")
         db.session.add(crop)
@@ -211,7 +211,7 @@ def create_crop():
         
         current_app.logger.info("💽 [Swagger] Committing database transaction")
         db.session.commit()
-        current_app.logger.info(f"✅ [Swagger] Crop committed to database with ID: {crop.id}")
+        current_app.logger.info("✅ [Swagger] Crop committed to database with ID: %s", crop.id)
 
         return jsonify({
             'message': 'Crop created successfully',
@@ -221,16 +221,16 @@ def create_crop():
                 'field_id': crop.field_id,
                 'crop_type': crop.crop_type,
                 'variety': crop.variety,
-                'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
+                'sowing_date': crop.sowing_date,
                 'area': crop.area,
                 'growth_stage': crop.growth_stage,
                 'subsidy_eligible': crop.subsidy_eligible,
-                'created_at': crop.created_at.isoformat()
+                'created_at': crop.created_at
             }
         }), 201
 
     except Exception as e:
-        current_app.logger.error(f"❌ [Swagger] Error creating crop: {str(e)}")
+        current_app.logger.error("❌ [Swagger] Error creating crop: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 [Swagger] Database session rolled back")
         return jsonify({'error': str(e)}), 500
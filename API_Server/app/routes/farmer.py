@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.models import CropRecommendation, User, Field, Crop
-from app.services.ai_service import get_crop_recommendations
+from app.services.ai_service import get_crop_recommendations, field_growing_conditions
+from agri_common.ai_usage import AIBudgetExceeded
+from app.services.async_io import run_blocking, run_db, save_model
 from app.routes.auth import jwt_required
 from app.extensions import db
+from datetime import date
 
 bp = Blueprint('farmer', __name__)
 
@@ -13,21 +16,21 @@ def get_profile():
         # user_id = request.user_id
         # current_app.logger.info(f"👤 Getting profile for user_id: {user_id}")
         
-        current_app.logger.info(f"📊 Querying User table for phone: {phone}")
+        current_app.logger.info("📊 Querying User table for phone: %s", phone)
         user = User.query.filter_by(phone=phone).first()
-        current_app.logger.info(f"📊 User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for phone: {phone}")
+            current_app.logger.warning("⚠️ User not found for phone: %s", phone)
             return jsonify({'error': 'User not found'}), 404
 
-        current_app.logger.info(f"📊 Loading fields relationship for user {user.id}")
+        current_app.logger.info("📊 Loading fields relationship for user %s", user.id)
         fields_count = len(user.fields)
-        current_app.logger.info(f"📊 User has {fields_count} fields")
+        current_app.logger.info("📊 User has %s fields", fields_count)
         
-        current_app.logger.info(f"📊 Calculating total crops for user {user.id}")
+        current_app.logger.info("📊 Calculating total crops for user %s", user.id)
         total_crops = sum(len(field.crops) for field in user.fields)
-        current_app.logger.info(f"📊 User has {total_crops} total crops across all fields")
+        current_app.logger.info("📊 User has %s total crops across all fields", total_crops)
 
         user_data = {
             'id': user.id,
@@ -39,16 +42,16 @@ def get_profile():
             'age': user.age,
             'email': user.email,
             'location': user.location,
-            'created_at': user.created_at.isoformat() if user.created_at else None,
+            'created_at': user.created_at,
             'language': user.language,
             'total_fields': fields_count,
             'total_crops': total_crops
         }
-        current_app.logger.info(f"📤 Returning user profile data")
+        current_app.logger.info("📤 Returning user profile data")
         return jsonify({'user': user_data}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting user profile: {str(e)}")
+        current_app.logger.error("❌ Error getting user profile: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/dashboard', methods=['GET'])
@@ -56,53 +59,53 @@ def get_profile():
 def get_dashboard():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"📊 Getting dashboard for user_id: {user_id}")
+        current_app.logger.info("📊 Getting dashboard for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 Querying User table for user_id: {user_id}")
+        current_app.logger.info("📊 Querying User table for user_id: %s", user_id)
         user = User.query.get(user_id)
-        current_app.logger.info(f"📊 User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
 
         # Get summary statistics
-        current_app.logger.info(f"📊 Loading fields relationship for user {user.id}")
+        current_app.logger.info("📊 Loading fields relationship for user %s", user.id)
         total_fields = len(user.fields)
-        current_app.logger.info(f"📊 User has {total_fields} fields")
+        current_app.logger.info("📊 User has %s fields", total_fields)
         
-        current_app.logger.info(f"📊 Calculating total area for user {user.id}")
+        current_app.logger.info("📊 Calculating total area for user %s", user.id)
         total_area = sum(field.total_area for field in user.fields)
-        current_app.logger.info(f"📊 Total area: {total_area}")
+        current_app.logger.info("📊 Total area: %s", total_area)
         
-        current_app.logger.info(f"📊 Calculating total crops for user {user.id}")
+        current_app.logger.info("📊 Calculating total crops for user %s", user.id)
         total_crops = sum(len(field.crops) for field in user.fields)
-        current_app.logger.info(f"📊 Total crops: {total_crops}")
+        current_app.logger.info("📊 Total crops: %s", total_crops)
         
         # Recent activities
         current_app.logger.info("📊 Building recent crops list")
         recent_crops = []
         for field in user.fields:
-            current_app.logger.info(f"📊 Processing field {field.id} ({field.name}) with {len(field.crops)} crops")
+            current_app.logger.debug("📊 Processing field %s (%s) with %s crops", field.id, field.name, len(field.crops))
             for crop in field.crops:
-                current_app.logger.info(f"📊 Processing crop {crop.id}: {crop.crop_type}")
+                current_app.logger.debug("📊 Processing crop %s: %s", crop.id, crop.crop_type)
                 recent_crops.append({
                     'crop_id': crop.id,
                     'crop_type': crop.crop_type,
                     'field_name': field.name,
                     'growth_stage': crop.growth_stage,
-                    'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
+                    'sowing_date': crop.sowing_date,
                     'area': crop.area
                 })
         
         # Sort by sowing date (most recent first)
-        current_app.logger.info(f"📊 Sorting {len(recent_crops)} crops by sowing date")
-        recent_crops.sort(key=lambda x: x['sowing_date'] or '1900-01-01', reverse=True)
+        current_app.logger.info("📊 Sorting %s crops by sowing date", len(recent_crops))
+        recent_crops.sort(key=lambda x: x['sowing_date'] or date.min, reverse=True)
         recent_crops = recent_crops[:5]  # Limit to 5 most recent
-        current_app.logger.info(f"📊 Limited to {len(recent_crops)} most recent crops")
+        current_app.logger.info("📊 Limited to %s most recent crops", len(recent_crops))
 
         active_crops_count = len([crop for field in user.fields for crop in field.crops if crop.growth_stage != 'Harvested'])
-        current_app.logger.info(f"📊 Active crops count: {active_crops_count}")
+        current_app.logger.info("📊 Active crops count: %s", active_crops_count)
 
         dashboard_data = {
             'user': {
@@ -117,11 +120,11 @@ def get_dashboard():
             },
             'recent_crops': recent_crops
         }
-        current_app.logger.info(f"📤 Returning dashboard data")
+        current_app.logger.info("📤 Returning dashboard data")
         return jsonify({'dashboard': dashboard_data}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting dashboard: {str(e)}")
+        current_app.logger.error("❌ Error getting dashboard: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/update_profile', methods=['PUT'])
@@ -129,17 +132,17 @@ def get_dashboard():
 def update_profile():
     try:
         user_id = request.user_id  # Set by jwt_required decorator
-        current_app.logger.info(f"✏️ Updating profile for user_id: {user_id}")
+        current_app.logger.info("✏️ Updating profile for user_id: %s", user_id)
         
         user = User.query.get(user_id)
-        current_app.logger.info(f"📊 User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 Received profile update data: {data}")
+        current_app.logger.info("📥 Received profile update data fields: %s", sorted(data or {}))
 
         # Update user profile - only allow certain fields to be updated
         updateable_fields = ['name', 'gender', 'state', 'city', 'age', 'email', 'location', 'language']
@@ -151,11 +154,11 @@ def update_profile():
                 new_value = data[key]
                 setattr(user, key, new_value)
                 updated_fields.append(f"{key}: {old_value} -> {new_value}")
-                current_app.logger.info(f"💽 Updated user.{key}: {old_value} -> {new_value}")
+                current_app.logger.info("💽 Updated user.%s: %s -> %s", key, old_value, new_value)
 
         current_app.logger.info("💽 Committing profile updates to database")
         db.session.commit()
-        current_app.logger.info(f"✅ Profile updated successfully. Changed fields: {updated_fields}")
+        current_app.logger.info("✅ Profile updated successfully. Changed fields: %s", updated_fields)
 
         # Return updated user details
         user_data = {
@@ -168,75 +171,88 @@ def update_profile():
             'age': user.age,
             'email': user.email,
             'language': user.language,
-            'created_at': user.created_at.isoformat() if user.created_at else None
+            'created_at': user.created_at
         }
-        current_app.logger.info(f"📤 Returning updated profile data")
+        current_app.logger.info("📤 Returning updated profile data")
         return jsonify({'message': 'Profile updated successfully', 'user': user_data}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error updating profile: {str(e)}")
+        current_app.logger.error("❌ Error updating profile: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/recommend', methods=['POST'])
 @jwt_required
-def recommend_crops():
+async def recommend_crops():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🌾 Getting crop recommendations for user_id: {user_id}")
+        current_app.logger.info("🌾 Getting crop recommendations for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 Querying User table for user_id: {user_id}")
-        user = User.query.get(user_id)
-        current_app.logger.info(f"📊 User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 Querying User table for user_id: %s", user_id)
+        user = await run_db(db.session.get, User, user_id)
+        current_app.logger.info("📊 User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
-        current_app.logger.info(f"📥 Received recommendation request data: {data}")
+        current_app.logger.info("📥 Received recommendation request data fields: %s", sorted(data or {}))
         
-        # Get crop recommendations using AI
-        current_app.logger.info("🤖 Getting AI crop recommendations")
-        recommendations = get_crop_recommendations(
-            soil_type=data.get('soil_type'),
+        # Local suitability engine; AI only when a narrative is requested
+        current_app.logger.info("🤖 Getting crop recommendations")
+        conditions = {
+            'soil_type': data.get('soil_type'),
+            'soil_ph': data.get('soil_ph'),
+            'irrigation_type': data.get('irrigation_type'),
+            'location': data.get('location'),
+            'weather': None
+        }
+        if data.get('field_id'):
+            field = await run_db(lambda: Field.query.filter_by(id=data['field_id'], user_id=user.id).first())
+            if not field:
+                return jsonify({'error': 'Field not found'}), 404
+            conditions.update(await field_growing_conditions(field))
+
+        recommendations = await run_blocking(
+            'ai', get_crop_recommendations,
             climate_zone=data.get('climate_zone'),
-            location=data.get('location'),
-            season=data.get('season')
+            season=data.get('season'),
+            narrative=bool(data.get('narrative')),
+            **conditions
         )
-        current_app.logger.info(f"🤖 AI recommendations received: {recommendations}")
+        current_app.logger.info("🤖 AI recommendations received: %s", recommendations.get('crops', []))
         
         # Save recommendation to database
         current_app.logger.info("💽 Creating CropRecommendation object")
         crop_rec = CropRecommendation(
             user_id=user.id,
-            soil_type=data.get('soil_type'),
+            soil_type=conditions['soil_type'],
             climate_zone=data.get('climate_zone'),
             recommended_crops=str(recommendations.get('crops', [])),
             season=data.get('season')
         )
-        current_app.logger.info(f"💽 CropRecommendation created: user_id={crop_rec.user_id}, soil_type={crop_rec.soil_type}")
+        current_app.logger.info("💽 CropRecommendation created: user_id=%s, soil_type=%s", crop_rec.user_id, crop_rec.soil_type)
         
-        current_app.logger.info("💽 Adding CropRecommendation to database session")
-        db.session.add(crop_rec)
-        current_app.logger.info("💽 CropRecommendation added to session")
-        
-        current_app.logger.info("💽 Committing database transaction")
-        db.session.commit()
-        current_app.logger.info(f"✅ CropRecommendation committed to database with ID: {crop_rec.id}")
+        current_app.logger.info("💽 Committing CropRecommendation to database")
+        recommendation_id = await run_db(save_model, crop_rec)
+        current_app.logger.info("✅ CropRecommendation committed to database with ID: %s", recommendation_id)
         
         response_data = {
-            'recommendation_id': crop_rec.id,
+            'recommendation_id': recommendation_id,
             'recommended_crops': recommendations.get('crops'),
+            'detailed_crops': recommendations.get('detailed_crops'),
             'farming_tips': recommendations.get('farming_tips'),
-            'best_practices': recommendations.get('best_practices')
+            'best_practices': recommendations.get('best_practices'),
+            'source': recommendations.get('ai_source')
         }
-        current_app.logger.info(f"📤 Returning recommendation response")
+        current_app.logger.info("📤 Returning recommendation response")
         return jsonify(response_data), 200
         
+    except AIBudgetExceeded as e:
+        current_app.logger.warning("⚠️ AI budget exceeded: %s", e)
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting crop recommendations: {str(e)}")
-        db.session.rollback()
-        current_app.logger.info("🔄 Database session rolled back")
+        current_app.logger.error("❌ Error getting crop recommendations: %s", e)
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify, current_app
 from app.models import Field, User, Crop
 from app.routes.auth import jwt_required
 from app.extensions import db
+from app.services.geo_index import (update_field_geohash, fields_within_radius, nearest_fields,
+                                    fields_in_bbox, cell_aggregates, GEOHASH_PRECISION)
+from app.services.pincode_gazetteer import geocode_field
 from datetime import datetime
 
 bp = Blueprint('fields', __name__)
@@ -11,23 +14,23 @@ bp = Blueprint('fields', __name__)
 def create_field():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🌾 Creating field for user_id: {user_id}")
+        current_app.logger.info("🌾 Creating field for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 Querying User table for user_id: {user_id}")
+        current_app.logger.info("📊 Querying User table for user_id: %s", user_id)
         user = User.query.get(user_id)
-        current_app.logger.info(f"📊 User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 Received field data: {data}")
+        current_app.logger.info("📥 Received field data fields: %s", sorted(data or {}))
         
         required_fields = ['name', 'address', 'city', 'state', 'pin_code', 'soil_type', 'total_area']
         
         if not all(field in data for field in required_fields):
-            current_app.logger.warning(f"⚠️ Missing required fields in data: {data}")
+            current_app.logger.warning("⚠️ Missing required fields in data: %s", sorted(data or {}))
             return jsonify({'error': 'Missing required fields'}), 400
 
         current_app.logger.info("💽 Creating Field object")
@@ -46,7 +49,10 @@ def create_field():
             latitude=data.get('latitude'),
             longitude=data.get('longitude')
         )
-        current_app.logger.info(f"💽 Field created: name={field.name}, user_id={field.user_id}, area={field.total_area}")
+        if geocode_field(field):
+            current_app.logger.info("📍 Placed field at PIN code %s centroid: (%s, %s)", field.pin_code, field.latitude, field.longitude)
+        update_field_geohash(field)
+        current_app.logger.info("💽 Field created: name=%s, user_id=%s, area=%s", field.name, field.user_id, field.total_area)
 
         current_app.logger.info("💽 Adding Field to database session")
         db.session.add(field)
@@ -54,7 +60,7 @@ def create_field():
         
         current_app.logger.info("💽 Committing database transaction")
         db.session.commit()
-        current_app.logger.info(f"✅ Field committed to database with ID: {field.id}")
+        current_app.logger.info("✅ Field committed to database with ID: %s", field.id)
 
         response_data = {
             'message': 'Field created successfully',
@@ -68,14 +74,17 @@ def create_field():
                 'pin_code': field.pin_code,
                 'soil_type': field.soil_type,
                 'total_area': field.total_area,
-                'created_at': field.created_at.isoformat()
+                'latitude': field.latitude,
+                'longitude': field.longitude,
+                'coordinates_source': field.coordinates_source,
+                'created_at': field.created_at
             }
         }
-        current_app.logger.info(f"📤 Returning field creation response: {response_data}")
+        current_app.logger.info("📤 Returning field creation response: %s", response_data)
         return jsonify(response_data), 201
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error creating field: {str(e)}")
+        current_app.logger.error("❌ Error creating field: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -85,18 +94,18 @@ def create_field():
 def list_fields():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"📋 Listing fields for user_id: {user_id}")
+        current_app.logger.info("📋 Listing fields for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 Querying Field table for user_id: {user_id}")
+        current_app.logger.info("📊 Querying Field table for user_id: %s", user_id)
         fields = Field.query.filter_by(user_id=user_id).all()
-        current_app.logger.info(f"📊 Found {len(fields)} fields for user")
+        current_app.logger.info("📊 Found %s fields for user", len(fields))
 
         field_list = []
         for i, field in enumerate(fields):
-            current_app.logger.info(f"📊 Processing field {i+1}: ID={field.id}, name={field.name}")
-            current_app.logger.info(f"📊 Checking crops for field {field.id}")
+            current_app.logger.debug("📊 Processing field %s: ID=%s, name=%s", i+1, field.id, field.name)
+            current_app.logger.debug("📊 Checking crops for field %s", field.id)
             crop_count = len(field.crops)
-            current_app.logger.info(f"📊 Field {field.id} has {crop_count} crops")
+            current_app.logger.debug("📊 Field %s has %s crops", field.id, crop_count)
             
             field_data = {
                 'id': field.id,
@@ -112,17 +121,18 @@ def list_fields():
                 'water_source': field.water_source,
                 'latitude': field.latitude,
                 'longitude': field.longitude,
-                'created_at': field.created_at.isoformat() if field.created_at else None,
-                'updated_at': field.updated_at.isoformat() if field.updated_at else None,
+                'coordinates_source': field.coordinates_source,
+                'created_at': field.created_at,
+                'updated_at': field.updated_at,
                 'crop_count': crop_count
             }
             field_list.append(field_data)
 
-        current_app.logger.info(f"📤 Returning {len(field_list)} fields")
+        current_app.logger.info("📤 Returning %s fields", len(field_list))
         return jsonify({'fields': field_list}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error listing fields: {str(e)}")
+        current_app.logger.error("❌ Error listing fields: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:field_id>', methods=['GET'])
@@ -130,14 +140,14 @@ def list_fields():
 def get_field(field_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🌾 Getting field {field_id} for user_id: {user_id}")
+        current_app.logger.info("🌾 Getting field %s for user_id: %s", field_id, user_id)
         
-        current_app.logger.info(f"📊 Querying Field table for field_id: {field_id}, user_id: {user_id}")
+        current_app.logger.info("📊 Querying Field table for field_id: %s, user_id: %s", field_id, user_id)
         field = Field.query.filter_by(id=field_id, user_id=user_id).first()
-        current_app.logger.info(f"📊 Field query result: {field.name if field else 'None'}")
+        current_app.logger.info("📊 Field query result: %s", field.name if field else 'None')
         
         if not field:
-            current_app.logger.warning(f"⚠️ Field {field_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Field %s not found or not accessible for user %s", field_id, user_id)
             return jsonify({'error': 'Field not found'}), 404
 
         field_data = {
@@ -154,34 +164,35 @@ def get_field(field_id):
             'water_source': field.water_source,
             'latitude': field.latitude,
             'longitude': field.longitude,
-            'created_at': field.created_at.isoformat() if field.created_at else None,
-            'updated_at': field.updated_at.isoformat() if field.updated_at else None,
+            'coordinates_source': field.coordinates_source,
+            'created_at': field.created_at,
+            'updated_at': field.updated_at,
             'crops': []
         }
 
         # Add crop information
-        current_app.logger.info(f"📊 Loading crops for field {field.id}")
+        current_app.logger.info("📊 Loading crops for field %s", field.id)
         crops_count = len(field.crops)
-        current_app.logger.info(f"📊 Found {crops_count} crops for field {field.id}")
+        current_app.logger.info("📊 Found %s crops for field %s", crops_count, field.id)
         
         for i, crop in enumerate(field.crops):
-            current_app.logger.info(f"📊 Processing crop {i+1}: ID={crop.id}, type={crop.crop_type}")
+            current_app.logger.debug("📊 Processing crop %s: ID=%s, type=%s", i+1, crop.id, crop.crop_type)
             crop_data = {
                 'id': crop.id,
                 'crop_type': crop.crop_type,
                 'variety': crop.variety,
-                'sowing_date': crop.sowing_date.isoformat() if crop.sowing_date else None,
+                'sowing_date': crop.sowing_date,
                 'area': crop.area,
                 'growth_stage': crop.growth_stage,
                 'subsidy_eligible': crop.subsidy_eligible
             }
             field_data['crops'].append(crop_data)
 
-        current_app.logger.info(f"📤 Returning field data with {len(field_data['crops'])} crops")
+        current_app.logger.info("📤 Returning field data with %s crops", len(field_data['crops']))
         return jsonify({'field': field_data}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting field: {str(e)}")
+        current_app.logger.error("❌ Error getting field: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:field_id>/update', methods=['PUT'])
@@ -189,18 +200,18 @@ def get_field(field_id):
 def update_field(field_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"✏️ Updating field {field_id} for user_id: {user_id}")
+        current_app.logger.info("✏️ Updating field %s for user_id: %s", field_id, user_id)
         
-        current_app.logger.info(f"📊 Querying Field table for field_id: {field_id}, user_id: {user_id}")
+        current_app.logger.info("📊 Querying Field table for field_id: %s, user_id: %s", field_id, user_id)
         field = Field.query.filter_by(id=field_id, user_id=user_id).first()
-        current_app.logger.info(f"📊 Field query result: {field.name if field else 'None'}")
+        current_app.logger.info("📊 Field query result: %s", field.name if field else 'None')
         
         if not field:
-            current_app.logger.warning(f"⚠️ Field {field_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Field %s not found or not accessible for user %s", field_id, user_id)
             return jsonify({'error': 'Field not found'}), 404
 
         data = request.get_json()
-        current_app.logger.info(f"📥 Received update data: {data}")
+        current_app.logger.info("📥 Received update data fields: %s", sorted(data or {}))
         
         # Update field attributes
         updateable_fields = [
@@ -216,14 +227,26 @@ def update_field(field_id):
                 new_value = data[field_name]
                 setattr(field, field_name, new_value)
                 updated_fields.append(f"{field_name}: {old_value} -> {new_value}")
-                current_app.logger.info(f"💽 Updated field.{field_name}: {old_value} -> {new_value}")
+                current_app.logger.info("💽 Updated field.%s: %s -> %s", field_name, old_value, new_value)
+
+        if 'latitude' in data or 'longitude' in data:
+            field.coordinates_source = None
+        elif 'pin_code' in data and field.coordinates_source == 'pincode':
+            # Coordinates came from the old PIN code; place the field at the new one
+            field.latitude = field.longitude = None
+
+        if 'latitude' in data or 'longitude' in data or 'pin_code' in data:
+            if geocode_field(field):
+                current_app.logger.info("📍 Placed field at PIN code %s centroid: (%s, %s)", field.pin_code, field.latitude, field.longitude)
+            update_field_geohash(field)
+            current_app.logger.info("💽 Updated field.geohash: %s", field.geohash)
 
         field.updated_at = datetime.utcnow()
-        current_app.logger.info(f"💽 Set updated_at to: {field.updated_at}")
+        current_app.logger.info("💽 Set updated_at to: %s", field.updated_at)
         
         current_app.logger.info("💽 Committing field updates to database")
         db.session.commit()
-        current_app.logger.info(f"✅ Field {field.id} updated successfully. Changed fields: {updated_fields}")
+        current_app.logger.info("✅ Field %s updated successfully. Changed fields: %s", field.id, updated_fields)
 
         response_data = {
             'message': 'Field updated successfully',
@@ -231,14 +254,14 @@ def update_field(field_id):
                 'id': field.id,
                 'name': field.name,
                 'address': field.address,
-                'updated_at': field.updated_at.isoformat()
+                'updated_at': field.updated_at
             }
         }
-        current_app.logger.info(f"📤 Returning update response: {response_data}")
+        current_app.logger.info("📤 Returning update response: %s", response_data)
         return jsonify(response_data), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error updating field: {str(e)}")
+        current_app.logger.error("❌ Error updating field: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -248,29 +271,149 @@ def update_field(field_id):
 def delete_field(field_id):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🗑️ Deleting field {field_id} for user_id: {user_id}")
+        current_app.logger.info("🗑️ Deleting field %s for user_id: %s", field_id, user_id)
         
-        current_app.logger.info(f"📊 Querying Field table for field_id: {field_id}, user_id: {user_id}")
+        current_app.logger.info("📊 Querying Field table for field_id: %s, user_id: %s", field_id, user_id)
         field = Field.query.filter_by(id=field_id, user_id=user_id).first()
-        current_app.logger.info(f"📊 Field query result: {field.name if field else 'None'}")
+        current_app.logger.info("📊 Field query result: %s", field.name if field else 'None')
         
         if not field:
-            current_app.logger.warning(f"⚠️ Field {field_id} not found or not accessible for user {user_id}")
+            current_app.logger.warning("⚠️ Field %s not found or not accessible for user %s", field_id, user_id)
             return jsonify({'error': 'Field not found'}), 404
 
         field_name = field.name
-        current_app.logger.info(f"🗑️ Deleting field '{field_name}' (ID: {field.id})")
+        current_app.logger.info("🗑️ Deleting field '%s' (ID: %s)", field_name, field.id)
         db.session.delete(field)
         current_app.logger.info("💽 Field marked for deletion")
         
         current_app.logger.info("💽 Committing field deletion to database")
         db.session.commit()
-        current_app.logger.info(f"✅ Field '{field_name}' (ID: {field_id}) deleted successfully")
+        current_app.logger.info("✅ Field '%s' (ID: %s) deleted successfully", field_name, field_id)
 
         return jsonify({'message': 'Field deleted successfully'}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error deleting field: {str(e)}")
+        current_app.logger.error("❌ Error deleting field: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
+
+# Other users' fields are shared only at this geohash precision (~1.2 km x 0.6 km)
+SHARED_CELL_PRECISION = 6
+
+def _request_bbox():
+    """(min_lat, min_lon, max_lat, max_lon) from the query string, or None when absent"""
+    keys = ['min_lat', 'min_lon', 'max_lat', 'max_lon']
+    values = [request.args.get(key, type=float) for key in keys]
+    if all(value is None for value in values):
+        return None
+    if any(value is None for value in values):
+        raise ValueError(f"Bounding box requires {', '.join(keys)}")
+    if values[0] > values[2] or values[1] > values[3]:
+        raise ValueError('Bounding box minimums must not exceed maximums')
+    return tuple(values)
+
+def _nearby_response(rows, user_id):
+    """Nearby fields with their active crops; other users' fields are reduced to a coarse cell"""
+    crops = {}
+    if rows:
+        for field_id, crop_type in db.session.query(Crop.field_id, Crop.crop_type).filter(
+                Crop.field_id.in_([row['field_id'] for row in rows]), Crop.harvest_date.is_(None)):
+            crops.setdefault(field_id, []).append(crop_type)
+
+    results = []
+    for row in rows:
+        own = row['user_id'] == user_id
+        item = {
+            'field_id': row['field_id'],
+            'own': own,
+            'cell': row['geohash'] if own else row['geohash'][:SHARED_CELL_PRECISION],
+            'crops': crops.get(row['field_id'], [])
+        }
+        if 'distance_km' in row:
+            item['distance_km'] = row['distance_km']
+        if own:
+            item['latitude'], item['longitude'] = row['latitude'], row['longitude']
+        results.append(item)
+    return results
+
+@bp.route('/nearby', methods=['GET'])
+@jwt_required
+def nearby_fields():
+    """Fields near a point or one of the user's fields: within radius_km, or the nearest `limit`"""
+    try:
+        user_id = request.user_id
+        field_id = request.args.get('field_id', type=int)
+        latitude = request.args.get('latitude', type=float)
+        longitude = request.args.get('longitude', type=float)
+        radius_km = request.args.get('radius_km', type=float)
+        
+        if field_id:
+            field = Field.query.filter_by(id=field_id, user_id=user_id).first()
+            if not field:
+                return jsonify({'error': 'Field not found'}), 404
+            if field.latitude is None or field.longitude is None:
+                return jsonify({'error': 'Field has no coordinates'}), 400
+            latitude, longitude = field.latitude, field.longitude
+        elif latitude is None or longitude is None:
+            return jsonify({'error': 'field_id or latitude and longitude required'}), 400
+        
+        if radius_km:
+            limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+            rows = fields_within_radius(latitude, longitude, radius_km, limit=limit, exclude_id=field_id)
+        else:
+            limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+            rows = nearest_fields(latitude, longitude, limit, exclude_id=field_id)
+        current_app.logger.info("📍 Found %s fields near (%s, %s)", len(rows), latitude, longitude)
+        
+        return jsonify({
+            'latitude': latitude,
+            'longitude': longitude,
+            'radius_km': radius_km,
+            'fields': _nearby_response(rows, user_id)
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error("❌ Error finding nearby fields: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/within', methods=['GET'])
+@jwt_required
+def fields_within():
+    """Fields inside a bounding box"""
+    try:
+        bbox = _request_bbox()
+        if not bbox:
+            return jsonify({'error': 'min_lat, min_lon, max_lat and max_lon required'}), 400
+        limit = max(1, min(request.args.get('limit', 500, type=int), 5000))
+        
+        rows = fields_in_bbox(*bbox, limit=limit)
+        
+        return jsonify({'bbox': list(bbox), 'fields': _nearby_response(rows, request.user_id)}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error("❌ Error listing fields in bounding box: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/cells', methods=['GET'])
+@jwt_required
+def field_cells():
+    """Field count, area and active crops per geohash cell, optionally within a bounding box"""
+    try:
+        precision = request.args.get('precision', 5, type=int)
+        if not 1 <= precision <= GEOHASH_PRECISION:
+            return jsonify({'error': f'precision must be between 1 and {GEOHASH_PRECISION}'}), 400
+        # Cells finer than the shared precision would expose individual fields
+        precision = min(precision, SHARED_CELL_PRECISION)
+        
+        cells = cell_aggregates(precision, _request_bbox())
+        
+        return jsonify({'precision': precision, 'cells': cells}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error("❌ Error aggregating field cells: %s", e)
+        return jsonify({'error': str(e)}), 500
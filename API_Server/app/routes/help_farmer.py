@@ -1,51 +1,45 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import db
 from app.models import FarmerScheme, User
 from sqlalchemy.exc import SQLAlchemyError
 from app.routes.auth import jwt_required
+from app.services.replay_provider import replay_provider, get_provider_mode
+from agri_common.http_client import http_client
+from app.services.scheme_search import scheme_search, crisis_search
+from app.services.crisis_matching import crisis_matcher
+from app.services.scheme_facets import scheme_facets
+from app.services.semantic_search import scheme_semantic, crisis_semantic
+from app.services.async_io import run_blocking, run_db
+import asyncio
 import logging
 import os
-import requests
 
 # Create blueprint
 bp = Blueprint('help_farmers', __name__)
 logger = logging.getLogger(__name__)
 
+TUTORIAL_PROVIDER = get_provider_mode('TUTORIAL_PROVIDER', 'youtube')  # youtube | replay
+
 @bp.route('/schemes', methods=['GET'])
 def get_all_schemes():
-    """Get all farmer schemes with optional filtering"""
+    """Get all farmer schemes with optional filtering, plus live facet counts for the filters"""
     try:
         # Get query parameters for filtering
-        state_central = request.args.get('state_central')
-        scheme_category = request.args.get('category')
-        status = request.args.get('status')
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        # Build query with filters
-        query = FarmerScheme.query
-        
-        if state_central:
-            query = query.filter(FarmerScheme.state_central.ilike(f'%{state_central}%'))
-        
-        if scheme_category:
-            query = query.filter(FarmerScheme.scheme_category.ilike(f'%{scheme_category}%'))
-        
-        if status:
-            query = query.filter(FarmerScheme.status.ilike(f'%{status}%'))
-        
-        # # Execute query with pagination
-        # schemes = query.order_by(FarmerScheme.created_at.desc())\
-        schemes = query.offset(offset)\
-                        .limit(limit)\
-                        .all()
+        filters = {
+            'state_central': request.args.get('state_central'),
+            'category': request.args.get('category'),
+            'status': request.args.get('status'),
+            'launch_period': request.args.get('launch_period'),
+        }
+        limit = max(1, request.args.get('limit', 50, type=int))
+        offset = max(0, request.args.get('offset', 0, type=int))
         
-        # Get total count for pagination
-        total_count = query.count()
+        # Filters and counts are bitset operations over the in-memory catalog
+        total_count, schemes, facets = scheme_facets.index().listing(filters, limit, offset)
         
         return jsonify({
             'success': True,
-            'data': [scheme.to_dict() for scheme in schemes],
+            'data': schemes,
+            'facets': facets,
             'pagination': {
                 'total': total_count,
                 'limit': limit,
@@ -55,14 +49,14 @@ def get_all_schemes():
         }), 200
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching schemes: {str(e)}")
+        logger.error("Database error fetching schemes: %s", e)
         return jsonify({
             'success': False,
             'message': 'Database error occurred',
             'error': str(e)
         }), 500
     except Exception as e:
-        logger.error(f"Unexpected error fetching schemes: {str(e)}")
+        logger.error("Unexpected error fetching schemes: %s", e)
         return jsonify({
             'success': False,
             'message': 'An unexpected error occurred',
@@ -87,7 +81,7 @@ def get_scheme_by_id(scheme_id):
         }), 200
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching scheme {scheme_id}: {str(e)}")
+        logger.error("Database error fetching scheme %s: %s", scheme_id, e)
         return jsonify({
             'success': False,
             'message': 'Database error occurred',
@@ -142,9 +136,11 @@ def get_scheme_by_id(scheme_id):
 
 @bp.route('/schemes/search', methods=['GET'])
 def search_schemes():
-    """Search farmer schemes by name or objective"""
+    """Search farmer schemes in English or any tutorial language, ranked by relevance (BM25) with highlighted matches"""
     try:
         search_term = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        offset = max(0, request.args.get('offset', 0, type=int))
         
         if not search_term:
             return jsonify({
@@ -152,125 +148,124 @@ def search_schemes():
                 'message': 'Search term is required'
             }), 400
         
-        schemes = FarmerScheme.query.filter(
-            db.or_(
-                FarmerScheme.scheme_name.ilike(f'%{search_term}%'),
-                FarmerScheme.objective.ilike(f'%{search_term}%'),
-                FarmerScheme.target_beneficiaries.ilike(f'%{search_term}%')
-            )
-        ).order_by(FarmerScheme.scheme_name).all()
+        # Misspelled words ("insurence", "tamato") are replaced by the closest catalog word
+        corrected_term = scheme_search.correct(search_term)
+        total_count, results = scheme_search.search(corrected_term or search_term, limit, offset)
         
         return jsonify({
             'success': True,
-            'data': [scheme.to_dict() for scheme in schemes],
+            'data': [
+                {**scheme, 'score': round(score, 4), 'highlights': highlights}
+                for scheme, score, highlights in results
+            ],
             'search_term': search_term,
-            'count': len(schemes)
+            'corrected_term': corrected_term,
+            'expanded_terms': scheme_search.expanded_terms(corrected_term or search_term),
+            'count': len(results),
+            'pagination': {
+                'total': total_count,
+                'limit': limit,
+                'offset': offset,
+                'has_next': (offset + limit) < total_count
+            }
         }), 200
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error searching schemes: {str(e)}")
+        logger.error("Database error searching schemes: %s", e)
         return jsonify({
             'success': False,
             'message': 'Database error occurred',
             'error': str(e)
         }), 500
 
-# @bp.route('/schemes/categories', methods=['GET'])
-# def get_scheme_categories():
-#     """Get all unique scheme categories"""
-#     try:
-#         categories = db.session.query(FarmerScheme.scheme_category)\
-#                               .filter(FarmerScheme.scheme_category.isnot(None))\
-#                               .distinct()\
-#                               .all()
+@bp.route('/schemes/semantic', methods=['GET'])
+def semantic_search_schemes():
+    """Schemes for a farmer's situation in their own words ("worms ate my cotton, need money for seeds"), by embedding similarity"""
+    try:
+        search_term = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
         
-#         category_list = [cat[0] for cat in categories if cat[0]]
+        if not search_term:
+            return jsonify({
+                'success': False,
+                'message': 'Search term is required'
+            }), 400
         
-#         return jsonify({
-#             'success': True,
-#             'data': sorted(category_list),
-#             'count': len(category_list)
-#         }), 200
+        corrected_term, results, expanded_terms = scheme_semantic.search(search_term, limit)
         
-#     except SQLAlchemyError as e:
-#         logger.error(f"Database error fetching categories: {str(e)}")
-#         return jsonify({
-#             'success': False,
-#             'message': 'Database error occurred',
-#             'error': str(e)
-#         }), 500
-
-# @bp.route('/schemes/states', methods=['GET'])
-# def get_scheme_states():
-#     """Get all unique states/central schemes"""
-#     try:
-#         states = db.session.query(FarmerScheme.state_central)\
-#                           .filter(FarmerScheme.state_central.isnot(None))\
-#                           .distinct()\
-#                           .all()
+        return jsonify({
+            'success': True,
+            'data': [{**scheme, 'similarity': round(similarity, 4)} for scheme, similarity in results],
+            'search_term': search_term,
+            'corrected_term': corrected_term,
+            'expanded_terms': expanded_terms,
+            'count': len(results)
+        }), 200
         
-#         state_list = [state[0] for state in states if state[0]]
+    except SQLAlchemyError as e:
+        logger.error("Database error in scheme semantic search: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
+
+@bp.route('/schemes/categories', methods=['GET'])
+def get_scheme_categories():
+    """Get all unique scheme categories (from the in-memory facet index)"""
+    try:
+        category_list = sorted(scheme_facets.index().values['category'])
         
-#         return jsonify({
-#             'success': True,
-#             'data': sorted(state_list),
-#             'count': len(state_list)
-#         }), 200
+        return jsonify({
+            'success': True,
+            'data': category_list,
+            'count': len(category_list)
+        }), 200
         
-#     except SQLAlchemyError as e:
-#         logger.error(f"Database error fetching states: {str(e)}")
-#         return jsonify({
-#             'success': False,
-#             'message': 'Database error occurred',
-#             'error': str(e)
-#         }), 500
+    except SQLAlchemyError as e:
+        logger.error("Database error fetching categories: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
 
-# @bp.route('/schemes/stats', methods=['GET'])
-# def get_scheme_statistics():
-#     """Get statistics about farmer schemes"""
-#     try:
-#         total_schemes = FarmerScheme.query.count()
-        
-#         # Count by category
-#         category_stats = db.session.query(
-#             FarmerScheme.scheme_category,
-#             db.func.count(FarmerScheme.id).label('count')
-#         ).group_by(FarmerScheme.scheme_category)\
-#          .all()
-        
-#         # Count by state/central
-#         state_stats = db.session.query(
-#             FarmerScheme.state_central,
-#             db.func.count(FarmerScheme.id).label('count')
-#         ).group_by(FarmerScheme.state_central)\
-#          .order_by(db.func.count(FarmerScheme.id).desc())\
-#          .limit(10)\
-#          .all()
+@bp.route('/schemes/states', methods=['GET'])
+def get_scheme_states():
+    """Get all unique states/central schemes (from the in-memory facet index)"""
+    try:
+        state_list = sorted(scheme_facets.index().values['state_central'])
         
-#         return jsonify({
-#             'success': True,
-#             'data': {
-#                 'total_schemes': total_schemes,
-#                 'by_category': [{'category': c[0], 'count': c[1]} for c in category_stats if c[0]],
-#                 'top_states': [{'state_central': s[0], 'count': s[1]} for s in state_stats if s[0]]
-#             }
-#         }), 200
+        return jsonify({
+            'success': True,
+            'data': state_list,
+            'count': len(state_list)
+        }), 200
         
-#     except SQLAlchemyError as e:
-#         logger.error(f"Database error fetching statistics: {str(e)}")
-#         return jsonify({
-#             'success': False,
-#             'message': 'Database error occurred',
-#             'error': str(e)
-#         }), 500
+    except SQLAlchemyError as e:
+        logger.error("Database error fetching states: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
+
+@bp.route('/schemes/stats', methods=['GET'])
+def get_scheme_statistics():
+    """Get statistics about farmer schemes (bitset popcounts, no GROUP BY)"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': scheme_facets.index().stats()
+        }), 200
         
-#     except SQLAlchemyError as e:
-#         logger.error(f"Database error fetching statistics: {str(e)}")
-#         return jsonify({
-#             'success': False,
-#             'message': 'Database error occurred',
-#             'error': str(e)
-#         }), 500
+    except SQLAlchemyError as e:
+        logger.error("Database error fetching statistics: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
 
 
 #####################################################
@@ -311,14 +306,14 @@ def get_all_crisis_schemes():
         }), 200
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error fetching crisis schemes: {str(e)}")
+        logger.error("Database error fetching crisis schemes: %s", e)
         return jsonify({
             'success': False,
             'message': 'Database error occurred',
             'error': str(e)
         }), 500
     except Exception as e:
-        logger.error(f"Unexpected error fetching crisis schemes: {str(e)}")
+        logger.error("Unexpected error fetching crisis schemes: %s", e)
         return jsonify({
             'success': False,
             'message': 'An unexpected error occurred',
@@ -327,11 +322,96 @@ def get_all_crisis_schemes():
 
 @bp.route('/crisis/schemes/search', methods=['GET'])
 def search_crisis_schemes():
-    """Search farmer crisis schemes by name or purpose"""
+    """Search farmer crisis schemes in English or any tutorial language ("baadh", "बाढ़", "ಪ್ರವಾಹ" find flood relief)"""
     try:
-        from app.models import FarmerSchemeCrisis
+        search_term = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        offset = max(0, request.args.get('offset', 0, type=int))
+        
+        if not search_term:
+            return jsonify({
+                'success': False,
+                'message': 'Search term is required'
+            }), 400
+        
+        # Misspelled words ("insurence", "tamato") are replaced by the closest catalog word
+        corrected_term = crisis_search.correct(search_term)
+        total_count, results = crisis_search.search(corrected_term or search_term, limit, offset)
+        
+        return jsonify({
+            'success': True,
+            'data': [
+                {**scheme, 'score': round(score, 4), 'highlights': highlights}
+                for scheme, score, highlights in results
+            ],
+            'search_term': search_term,
+            'corrected_term': corrected_term,
+            'expanded_terms': crisis_search.expanded_terms(corrected_term or search_term),
+            'count': len(results),
+            'pagination': {
+                'total': total_count,
+                'limit': limit,
+                'offset': offset,
+                'has_next': (offset + limit) < total_count
+            }
+        }), 200
         
+    except SQLAlchemyError as e:
+        logger.error("Database error searching crisis schemes: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
+
+@bp.route('/crisis/schemes/match', methods=['GET'])
+def match_crisis_schemes():
+    """Crisis schemes for the hazard a farmer describes ("flood", "tiddi", "ओलावृष्टि"), ranked by how directly they cover it"""
+    try:
+        keyword = request.args.get('keyword', '').strip()
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        
+        if not keyword:
+            return jsonify({
+                'success': False,
+                'message': 'Keyword is required'
+            }), 400
+        
+        hazards, total_count, results = crisis_matcher.match(keyword, limit)
+        if hazards:
+            data = [
+                {**scheme, 'score': round(score, 4), 'hazards': covered}
+                for scheme, score, covered in results
+            ]
+        else:
+            # Not a known hazard ("bank loan waiver"): fall back to ranked text search
+            total_count, results = crisis_search.search(crisis_search.correct(keyword) or keyword, limit)
+            data = [{**scheme, 'score': round(score, 4), 'hazards': []} for scheme, score, _ in results]
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'keyword': keyword,
+            'hazards': hazards,
+            'match_type': 'hazard' if hazards else 'text',
+            'count': len(data),
+            'total': total_count
+        }), 200
+        
+    except SQLAlchemyError as e:
+        logger.error("Database error matching crisis schemes: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
+
+@bp.route('/crisis/schemes/semantic', methods=['GET'])
+def semantic_search_crisis_schemes():
+    """Crisis schemes for a farmer's situation in their own words, by embedding similarity"""
+    try:
         search_term = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
         
         if not search_term:
             return jsonify({
@@ -339,23 +419,19 @@ def search_crisis_schemes():
                 'message': 'Search term is required'
             }), 400
         
-        schemes = FarmerSchemeCrisis.query.filter(
-            db.or_(
-                FarmerSchemeCrisis.scheme_name.ilike(f'%{search_term}%'),
-                FarmerSchemeCrisis.purpose.ilike(f'%{search_term}%'),
-                FarmerSchemeCrisis.coverage.ilike(f'%{search_term}%')
-            )
-        ).all()
+        corrected_term, results, expanded_terms = crisis_semantic.search(search_term, limit)
         
         return jsonify({
             'success': True,
-            'data': [scheme.to_dict() for scheme in schemes],
+            'data': [{**scheme, 'similarity': round(similarity, 4)} for scheme, similarity in results],
             'search_term': search_term,
-            'count': len(schemes)
+            'corrected_term': corrected_term,
+            'expanded_terms': expanded_terms,
+            'count': len(results)
         }), 200
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error searching crisis schemes: {str(e)}")
+        logger.error("Database error in crisis scheme semantic search: %s", e)
         return jsonify({
             'success': False,
             'message': 'Database error occurred',
@@ -367,7 +443,7 @@ def search_crisis_schemes():
 #####################################################
 
 @bp.route('/tutorials', methods=['GET'])
-def get_tutorials():
+async def get_tutorials():
     """
     Get tutorials based on topic
     """
@@ -381,7 +457,7 @@ def get_tutorials():
         }), 400
 
     # Get the user from user id
-    user = User.query.get(phone)
+    user = await run_db(lambda: User.query.get(phone))
 
     if not user:
         return jsonify({
@@ -390,7 +466,7 @@ def get_tutorials():
         }), 404
     
     # Fetch tutorials from the database or external API
-    tutorials = fetch_tutorials(topic, user.language)
+    tutorials = await run_blocking('http', fetch_tutorials, topic, user.language)
 
     return jsonify({
         'success': True,
@@ -405,7 +481,7 @@ def fetch_tutorials(topic, language='english', max_results=100):
         # Get YouTube API key from environment variables
         youtube_api_key = os.getenv('YOUTUBE_API_KEY')
         
-        if not youtube_api_key:
+        if not youtube_api_key and TUTORIAL_PROVIDER != 'replay':
             logger.error("YouTube API key not found in environment variables")
             return []
 
@@ -448,11 +524,13 @@ def fetch_tutorials(topic, language='english', max_results=100):
             'order': 'relevance'
         }
 
-        response = requests.get(youtube_search_url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        data = response.json()
+        if TUTORIAL_PROVIDER == 'replay':
+            data = replay_provider.respond('youtube_search', search_query, {'topic': topic, 'language': language})
+        else:
+            response = http_client.get(youtube_search_url, params=params)
+            response.raise_for_status()
+            
+            data = response.json()
         
         # Parse and format the response
         tutorials = []
@@ -474,11 +552,11 @@ def fetch_tutorials(topic, language='english', max_results=100):
                 }
                 tutorials.append(tutorial)
 
-        logger.info(f"Successfully fetched {len(tutorials)} tutorials for topic: {topic}, language: {language}")
+        logger.info("Successfully fetched %s tutorials for topic: %s, language: %s", len(tutorials), topic, language)
         return tutorials
 
     except Exception as e:
-        logger.error(f"Error in fetch_tutorials: {str(e)}")
+        logger.error("Error in fetch_tutorials: %s", e)
         return None
 
 @bp.route('/tutorials/categories', methods=['GET'])
@@ -517,7 +595,7 @@ def get_tutorial_categories():
     }), 200
 
 @bp.route('/tutorials/popular', methods=['GET'])
-def get_popular_tutorials():
+async def get_popular_tutorials():
     """Get popular farming tutorial topics"""
     try:
         language = request.args.get('language', 'english').strip().lower()
@@ -533,12 +611,12 @@ def get_popular_tutorials():
             'seed treatment techniques'
         ]
         
-        # Fetch tutorials for each popular topic (limit to 3 per topic)
-        all_tutorials = []
-        for topic in popular_topics[:4]:  # Limit to 4 topics to avoid API quota issues
-            tutorials = fetch_tutorials(topic, language, 3)
-            if tutorials:
-                all_tutorials.extend(tutorials)
+        # Fetch tutorials for each popular topic concurrently (limit to 3 per topic)
+        results = await asyncio.gather(*(
+            run_blocking('http', fetch_tutorials, topic, language, 3)
+            for topic in popular_topics[:4]  # Limit to 4 topics to avoid API quota issues
+        ))
+        all_tutorials = [tutorial for tutorials in results if tutorials for tutorial in tutorials]
         
         return jsonify({
             'success': True,
@@ -548,7 +626,7 @@ def get_popular_tutorials():
         }), 200
         
     except Exception as e:
-        logger.error(f"Error fetching popular tutorials: {str(e)}")
+        logger.error("Error fetching popular tutorials: %s", e)
         return jsonify({
             'success': False,
             'message': 'An error occurred while fetching popular tutorials',
@@ -0,0 +1,52 @@
+import hmac
+import os
+
+from flask import Blueprint, request, jsonify
+from app.services.provider_router import ai_router
+from agri_common.ai_usage import ai_usage
+from agri_common.http_client import http_client
+from app.services.db_pool import pool_stats
+from app.services import structured_logging
+from app.extensions import db
+
+bp = Blueprint('metrics', __name__)
+
+# Shared secret for monitoring (X-Metrics-Token); the metrics are disabled when unset, since they
+# include user IDs, client IPs and upstream error messages
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+@bp.before_request
+def require_metrics_token():
+    token = request.headers.get('X-Metrics-Token', '')
+    if not METRICS_TOKEN or not hmac.compare_digest(token, METRICS_TOKEN):
+        return jsonify({'error': 'Forbidden'}), 403
+
+@bp.route('/providers', methods=['GET'])
+def provider_status():
+    """Circuit breaker state, error rate and p95 latency for each AI provider"""
+    return jsonify(ai_router.snapshot()), 200
+
+@bp.route('/ai', methods=['GET'])
+def ai_usage_summary():
+    """Recent AI calls, rolling aggregates per route/provider/model and today's budget usage"""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({
+        'recent': ai_usage.recent(limit),
+        'aggregate': ai_usage.aggregate(),
+        'daily': ai_usage.daily()
+    }), 200
+
+@bp.route('/http', methods=['GET'])
+def http_status():
+    """Outbound HTTP per-host request counts, retries, connection reuse and DNS/connect/TLS/TTFB latency"""
+    return jsonify(http_client.snapshot()), 200
+
+@bp.route('/db', methods=['GET'])
+def db_pool_status():
+    """Database pool size, connections in use, checkout wait percentiles, timeouts and liveness checks"""
+    return jsonify(pool_stats.snapshot(db.engine.pool)), 200
+
+@bp.route('/logging', methods=['GET'])
+def logging_status():
+    """Log level, per-route sample rates, records written / sampled out / dropped and queue depth"""
+    return jsonify(structured_logging.log_stats.snapshot(structured_logging.log_handler)), 200
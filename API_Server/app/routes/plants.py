@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.models import PlantAnalysis, User
 from app.services.ai_service import analyze_plant_image, convert_image_to_blob
+from agri_common.ai_usage import AIBudgetExceeded
+from app.services.async_io import run_blocking, run_db, save_model
 from app.routes.auth import jwt_required
 from app.extensions import db
 
@@ -8,17 +10,17 @@ bp = Blueprint('plants', __name__)
 
 @bp.route('/analyze', methods=['POST'])
 @jwt_required
-def analyze_plant():
+async def analyze_plant():
     try:
         user_id = request.user_id  # Set by jwt_required decorator
-        current_app.logger.info(f"🔍 [Vertex AI] Starting plant analysis for user_id: {user_id}")
+        current_app.logger.info("🔍 [Vertex AI] Starting plant analysis for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 [Vertex AI] Querying User table for user_id: {user_id}")
-        user = User.query.get(user_id)
-        current_app.logger.info(f"📊 [Vertex AI] User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 [Vertex AI] Querying User table for user_id: %s", user_id)
+        user = await run_db(db.session.get, User, user_id)
+        current_app.logger.info("📊 [Vertex AI] User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ [Vertex AI] User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ [Vertex AI] User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
         
         # Get image from request
@@ -27,16 +29,17 @@ def analyze_plant():
             return jsonify({'error': 'No image provided'}), 400
         
         image_file = request.files['image']
-        current_app.logger.info(f"📸 [Vertex AI] Processing image file: {image_file.filename}")
+        current_app.logger.info("📸 [Vertex AI] Processing image file: %s", image_file.filename)
     
         # Analyze with Vertex AI
         current_app.logger.info("🤖 [Vertex AI] Starting AI image analysis")
-        analysis_result = analyze_plant_image(image_file)
-        current_app.logger.info(f"🤖 [Vertex AI] AI analysis completed: {analysis_result}")
+        analysis_result = await run_blocking('ai', analyze_plant_image, image_file)
+        current_app.logger.info("🤖 [Vertex AI] AI analysis completed: disease=%s, confidence=%s", analysis_result.get('disease'), analysis_result.get('confidence'))
         
         # Convert to blob for database storage
-        image_blob = convert_image_to_blob(image_file)
-        current_app.logger.info(f"💾 [Vertex AI] Image converted to blob, size: {len(image_blob) if image_blob else 0} bytes")
+        # PIL decode, resize and JPEG encode, kept off the event loop
+        image_blob = await run_blocking('ai', convert_image_to_blob, image_file)
+        current_app.logger.info("💾 [Vertex AI] Image converted to blob, size: %s bytes", len(image_blob) if image_blob else 0)
         
         # Save analysis to database
         current_app.logger.info("💽 [Vertex AI] Creating PlantAnalysis object")
@@ -47,18 +50,14 @@ def analyze_plant():
             confidence_score=analysis_result.get('confidence'),
             recommendations=analysis_result.get('recommendations')
         )
-        current_app.logger.info(f"💽 [Vertex AI] PlantAnalysis created: user_id={analysis.user_id}, disease={analysis.disease_detected}")
-        
-        current_app.logger.info("💽 [Vertex AI] Adding PlantAnalysis to database session")
-        db.session.add(analysis)
-        current_app.logger.info("💽 [Vertex AI] PlantAnalysis added to session")
+        current_app.logger.info("💽 [Vertex AI] PlantAnalysis created: user_id=%s, disease=%s", analysis.user_id, analysis.disease_detected)
         
-        current_app.logger.info("💽 [Vertex AI] Committing database transaction")
-        db.session.commit()
-        current_app.logger.info(f"✅ [Vertex AI] PlantAnalysis committed to database with ID: {analysis.id}")
+        current_app.logger.info("💽 [Vertex AI] Committing PlantAnalysis to database")
+        analysis_id = await run_db(save_model, analysis)
+        current_app.logger.info("✅ [Vertex AI] PlantAnalysis committed to database with ID: %s", analysis_id)
         
         response_data = {
-            'analysis_id': analysis.id,
+            'analysis_id': analysis_id,
             'disease': analysis_result.get('disease'),
             'confidence': analysis_result.get('confidence'),
             'recommendations': analysis_result.get('recommendations'),
@@ -67,13 +66,14 @@ def analyze_plant():
             'affected_parts': analysis_result.get('affected_parts'),
             'ai_source': 'vertex_ai'
         }
-        current_app.logger.info(f"📤 [Vertex AI] Returning response: {response_data}")
+        current_app.logger.info("📤 [Vertex AI] Returning analysis %s", analysis_id)
         return jsonify(response_data), 200
         
+    except AIBudgetExceeded as e:
+        current_app.logger.warning("⚠️ [Vertex AI] AI budget exceeded: %s", e)
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
-        current_app.logger.error(f"❌ [Vertex AI] Error during plant analysis: {str(e)}")
-        db.session.rollback()
-        current_app.logger.info("🔄 [Vertex AI] Database session rolled back")
+        current_app.logger.error("❌ [Vertex AI] Error during plant analysis: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/history', methods=['GET'])
@@ -81,43 +81,43 @@ def analyze_plant():
 def get_analysis_history():
     try:
         user_id = request.user_id  # Set by jwt_required decorator
-        current_app.logger.info(f"📜 [Vertex AI] Getting analysis history for user_id: {user_id}")
+        current_app.logger.info("📜 [Vertex AI] Getting analysis history for user_id: %s", user_id)
         
-        current_app.logger.info(f"📊 [Vertex AI] Querying User table for user_id: {user_id}")
+        current_app.logger.info("📊 [Vertex AI] Querying User table for user_id: %s", user_id)
         user = User.query.get(user_id)
-        current_app.logger.info(f"📊 [Vertex AI] User query result: {user.name if user else 'None'}")
+        current_app.logger.info("📊 [Vertex AI] User query result: %s", user.name if user else 'None')
         
         if not user:
-            current_app.logger.warning(f"⚠️ [Vertex AI] User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ [Vertex AI] User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
         
         # Get user's analysis history
-        current_app.logger.info(f"📊 [Vertex AI] Querying PlantAnalysis for user_id: {user.id}")
+        current_app.logger.info("📊 [Vertex AI] Querying PlantAnalysis for user_id: %s", user.id)
         analyses = PlantAnalysis.query.filter_by(user_id=user.id).order_by(PlantAnalysis.created_at.desc()).all()
-        current_app.logger.info(f"📊 [Vertex AI] Found {len(analyses)} plant analyses for user")
+        current_app.logger.info("📊 [Vertex AI] Found %s plant analyses for user", len(analyses))
         
         history = []
         for i, analysis in enumerate(analyses):
-            current_app.logger.info(f"📊 [Vertex AI] Processing analysis {i+1}: ID={analysis.id}, disease={analysis.disease_detected}")
+            current_app.logger.debug("📊 [Vertex AI] Processing analysis %s: ID=%s, disease=%s", i+1, analysis.id, analysis.disease_detected)
             history.append({
                 'id': analysis.id,
                 'disease_detected': analysis.disease_detected,
                 'confidence_score': analysis.confidence_score,
                 'recommendations': analysis.recommendations,
-                'created_at': analysis.created_at.isoformat(),
+                'created_at': analysis.created_at,
                 'ai_source': 'vertex_ai'
             })
         
-        current_app.logger.info(f"📤 [Vertex AI] Returning {len(history)} analysis records")
+        current_app.logger.info("📤 [Vertex AI] Returning %s analysis records", len(history))
         return jsonify({'history': history}), 200
         
     except Exception as e:
-        current_app.logger.error(f"❌ [Vertex AI] Error getting analysis history: {str(e)}")
+        current_app.logger.error("❌ [Vertex AI] Error getting analysis history: %s", e)
         return jsonify({'error': str(e)}), 500
         
-        current_app.logger.info(f"📤 Returning {len(history)} analysis records")
+        current_app.logger.info("📤 Returning %s analysis records", len(history))
         return jsonify({'history': history}), 200
         
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting analysis history: {str(e)}")
+        current_app.logger.error("❌ Error getting analysis history: %s", e)
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from app.services.fuzzy_search import suggestions, SUGGEST_KINDS
+import logging
+
+bp = Blueprint('search', __name__)
+logger = logging.getLogger(__name__)
+
+@bp.route('/suggest', methods=['GET'])
+def suggest():
+    """Autocomplete for crop types, varieties and scheme names, tolerant of misspellings ("tamato", "PM Kisaan")"""
+    try:
+        query = request.args.get('q', '').strip()
+        kinds = [kind for kind in request.args.get('kind', '').split(',') if kind]
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+
+        if not query:
+            return jsonify({
+                'success': False,
+                'message': 'Search term is required'
+            }), 400
+        unknown = [kind for kind in kinds if kind not in SUGGEST_KINDS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown kind {', '.join(unknown)}; expected {', '.join(SUGGEST_KINDS)}"
+            }), 400
+
+        results = suggestions.suggest(query, kinds, limit)
+        return jsonify({
+            'success': True,
+            'data': results,
+            'search_term': query,
+            'count': len(results)
+        }), 200
+
+    except SQLAlchemyError as e:
+        logger.error("Database error building suggestions: %s", e)
+        return jsonify({
+            'success': False,
+            'message': 'Database error occurred',
+            'error': str(e)
+        }), 500
@@ -35,13 +35,13 @@ def get_farmer_cibil_score(phone_number):
 def check_cibil_score(phone_number):
     try:
         user_id = request.user_id
-        current_app.logger.info(f"🏦 Checking CIBIL score for phone: {phone_number}, requested by user: {user_id}")
+        current_app.logger.info("🏦 Checking CIBIL score for phone: %s, requested by user: %s", phone_number, user_id)
         
         # Get CIBIL information
         cibil_info = get_farmer_cibil_score(phone_number)
         
         if not cibil_info:
-            current_app.logger.warning(f"⚠️ No CIBIL data found for phone: {phone_number}")
+            current_app.logger.warning("⚠️ No CIBIL data found for phone: %s", phone_number)
             return jsonify({'error': 'CIBIL data not found for this phone number'}), 404
         
         # Return comprehensive CIBIL information
@@ -57,11 +57,11 @@ def check_cibil_score(phone_number):
             'recent_debit_history': cibil_info.get('debit_history', [])[-3:]    # Last 3 entries
         }
         
-        current_app.logger.info(f"📤 Returning CIBIL information for {cibil_info.get('name')}")
+        current_app.logger.info("📤 Returning CIBIL information for %s", cibil_info.get('name'))
         return jsonify(response_data), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error checking CIBIL score: {str(e)}")
+        current_app.logger.error("❌ Error checking CIBIL score: %s", e)
         return jsonify({'error': str(e)}), 500
 
 ############################################################
@@ -73,22 +73,22 @@ def check_cibil_score(phone_number):
 def add_new_transaction():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"💰 Adding new transaction for user_id: {user_id}")
+        current_app.logger.info("💰 Adding new transaction for user_id: %s", user_id)
 
         # Get the data from post request
         data = request.get_json()
-        current_app.logger.info(f"📥 Received transaction data: {data}")
+        current_app.logger.info("📥 Received transaction data fields: %s", sorted(data or {}))
 
         # Mandatory Fields validation
         required_fields = ['phoneNumberB', 'transaction_type', 'transaction_amount']
         if not all(field in data for field in required_fields):
-            current_app.logger.warning(f"⚠️ Missing required fields in data: {data}")
+            current_app.logger.warning("⚠️ Missing required fields in data: %s", sorted(data or {}))
             return jsonify({'error': 'Missing required fields: phoneNumberB, transaction_type, transaction_amount'}), 400
 
         # Validate user exists
         user = User.query.get(user_id)
         if not user:
-            current_app.logger.warning(f"⚠️ User not found for user_id: {user_id}")
+            current_app.logger.warning("⚠️ User not found for user_id: %s", user_id)
             return jsonify({'error': 'User not found'}), 404
 
         # Create transaction log entry
@@ -100,14 +100,14 @@ def add_new_transaction():
             transaction_amount=float(data['transaction_amount']),
             details=data.get('details', '')
         )
-        current_app.logger.info(f"💽 Transaction created: userIdA={transaction.userIdA}, amount={transaction.transaction_amount}")
+        current_app.logger.info("💽 Transaction created: userIdA=%s, amount=%s", transaction.userIdA, transaction.transaction_amount)
 
         current_app.logger.info("💽 Adding Transaction to database session")
         db.session.add(transaction)
         
         current_app.logger.info("💽 Committing database transaction")
         db.session.commit()
-        current_app.logger.info(f"✅ Transaction committed to database with ID: {transaction.id}")
+        current_app.logger.info("✅ Transaction committed to database with ID: %s", transaction.id)
 
         # Get CIBIL score for the recipient
         cibil_info = get_farmer_cibil_score(data['phoneNumberB'])
@@ -118,11 +118,11 @@ def add_new_transaction():
             'transaction': transaction.to_dict(),
             'recipient_cibil_info': cibil_info.get('cibil_score') if cibil_info else None
         }
-        current_app.logger.info(f"📤 Returning transaction response")
+        current_app.logger.info("📤 Returning transaction response")
         return jsonify(response_data), 201
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error adding transaction: {str(e)}")
+        current_app.logger.error("❌ Error adding transaction: %s", e)
         db.session.rollback()
         current_app.logger.info("🔄 Database session rolled back")
         return jsonify({'error': str(e)}), 500
@@ -132,22 +132,22 @@ def add_new_transaction():
 def get_transaction_history():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"📜 Getting transaction history for user_id: {user_id}")
+        current_app.logger.info("📜 Getting transaction history for user_id: %s", user_id)
         
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        current_app.logger.info(f"📊 Querying TransactionLog for user_id: {user_id}")
+        current_app.logger.info("📊 Querying TransactionLog for user_id: %s", user_id)
         transactions = TransactionLog.query.filter_by(userIdA=user_id)\
                                          .order_by(TransactionLog.timestamp.desc())\
                                          .paginate(page=page, per_page=per_page, error_out=False)
         
-        current_app.logger.info(f"📊 Found {len(transactions.items)} transactions for user")
+        current_app.logger.info("📊 Found %s transactions for user", len(transactions.items))
         
         transaction_list = []
         for transaction in transactions.items:
-            current_app.logger.info(f"📊 Processing transaction {transaction.id}")
+            current_app.logger.debug("📊 Processing transaction %s", transaction.id)
             transaction_data = transaction.to_dict()
             
             # Add CIBIL info for recipient
@@ -169,11 +169,11 @@ def get_transaction_history():
                 'has_prev': transactions.has_prev
             }
         }
-        current_app.logger.info(f"📤 Returning {len(transaction_list)} transactions")
+        current_app.logger.info("📤 Returning %s transactions", len(transaction_list))
         return jsonify(response_data), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting transaction history: {str(e)}")
+        current_app.logger.error("❌ Error getting transaction history: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/analytics', methods=['GET'])
@@ -181,11 +181,11 @@ def get_transaction_history():
 def get_transaction_analytics():
     try:
         user_id = request.user_id
-        current_app.logger.info(f"📊 Getting transaction analytics for user_id: {user_id}")
+        current_app.logger.info("📊 Getting transaction analytics for user_id: %s", user_id)
         
         # Get all transactions for the user
         transactions = TransactionLog.query.filter_by(userIdA=user_id).all()
-        current_app.logger.info(f"📊 Found {len(transactions)} total transactions")
+        current_app.logger.info("📊 Found %s total transactions", len(transactions))
         
         # Calculate analytics
         total_transactions = len(transactions)
@@ -216,9 +216,9 @@ def get_transaction_analytics():
             'monthly_breakdown': dict(monthly_data)
         }
         
-        current_app.logger.info(f"📤 Returning transaction analytics")
+        current_app.logger.info("📤 Returning transaction analytics")
         return jsonify({'analytics': analytics_data}), 200
 
     except Exception as e:
-        current_app.logger.error(f"❌ Error getting transaction analytics: {str(e)}")
+        current_app.logger.error("❌ Error getting transaction analytics: %s", e)
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,16 +1,30 @@
+import hmac
+import os
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from app.services.weather_service import get_current_weather, get_weather_forecast
+from app.extensions import db
+from app.models import Field, WeatherAlert
+from app.routes.auth import jwt_required
+from app.services.async_io import run_db
+from app.services.weather_service import (get_current_weather_async, get_weather_forecast_async,
+                                          get_weather_overview_async, get_field_forecasts_async, location_key,
+                                          location_query, field_location_keys, WEATHER_GRID_DEGREES)
+from app.services.weather_store import daily_history, hourly_history
+from app.services.weather_alerts import run_weather_alerts, WEATHER_ALERT_DAYS
 
 bp = Blueprint('weather', __name__)
 
+# Shared secret for the scheduler calling /alerts/run; the endpoint is disabled when unset
+WEATHER_ALERTS_RUN_TOKEN = os.getenv('WEATHER_ALERTS_RUN_TOKEN')
+
 @bp.route('/current', methods=['GET'])
-def current_weather():
+async def current_weather():
     try:
         location = request.args.get('location')
         if not location:
             return jsonify({'error': 'Location parameter required'}), 400
         
-        weather_data = get_current_weather(location)
+        weather_data = await get_current_weather_async(location)
         
         # Just return the weather data - no database operations
         return jsonify(weather_data), 200
@@ -19,7 +33,7 @@ def current_weather():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/forecast', methods=['GET'])
-def weather_forecast():
+async def weather_forecast():
     try:
         location = request.args.get('location')
         days = request.args.get('days', 7, type=int)
@@ -27,7 +41,7 @@ def weather_forecast():
         if not location:
             return jsonify({'error': 'Location parameter required'}), 400
         
-        forecast_data = get_weather_forecast(location, days)
+        forecast_data = await get_weather_forecast_async(location, days)
         
         return jsonify({
             'location': location,
@@ -41,7 +55,7 @@ def weather_forecast():
         if not location:
             return jsonify({'error': 'Location parameter required'}), 400
         
-        forecast_data = get_weather_forecast(location, days)
+        forecast_data = await get_weather_forecast_async(location, days)
         
         return jsonify({
             'location': location,
@@ -51,3 +65,145 @@ def weather_forecast():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@bp.route('/overview', methods=['GET'])
+async def weather_overview():
+    """Current weather and forecast in one call; both upstream requests run concurrently"""
+    try:
+        location = request.args.get('location')
+        days = request.args.get('days', 7, type=int)
+
+        if not location:
+            return jsonify({'error': 'Location parameter required'}), 400
+
+        return jsonify(await get_weather_overview_async(location, days)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/fields', methods=['GET'])
+@jwt_required
+async def field_forecasts():
+    """Forecasts for all of the user's fields; nearby fields share one upstream request"""
+    try:
+        days = request.args.get('days', 7, type=int)
+        fields = await run_db(lambda: Field.query.filter_by(user_id=request.user_id).all())
+
+        results, upstream_requests = await get_field_forecasts_async(fields, days)
+
+        return jsonify({
+            'forecast_days': days,
+            'grid_degrees': WEATHER_GRID_DEGREES,
+            'upstream_requests': upstream_requests,
+            'fields': [
+                {
+                    'field_id': result['field'].id,
+                    'name': result['field'].name,
+                    'latitude': result['field'].latitude,
+                    'longitude': result['field'].longitude,
+                    'grid_cell': result['grid_cell'],
+                    'forecast': result['forecast']
+                }
+                for result in results
+            ]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/history', methods=['GET'])
+def weather_history():
+    """Recorded weather for a location over the last `days` days, from the daily rollup"""
+    try:
+        location = request.args.get('location')
+        days = request.args.get('days', 30, type=int)
+        
+        if not location:
+            return jsonify({'error': 'Location parameter required'}), 400
+        
+        history = daily_history(location_key(location_query(location)), days)
+        if request.args.get('hours', type=int):
+            history['hourly'] = hourly_history(history['location_key'], request.args.get('hours', type=int))
+        
+        return jsonify({'location': location, **history}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/fields/<int:field_id>/history', methods=['GET'])
+@jwt_required
+def field_weather_history(field_id):
+    """Recorded weather for one of the user's fields, e.g. rainfall over the last 30 days"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        field = Field.query.filter_by(id=field_id, user_id=request.user_id).first()
+        if not field:
+            return jsonify({'error': 'Field not found'}), 404
+        
+        # Prefer the field's grid cell, fall back to its city when the cell has no observations
+        history = None
+        for key in field_location_keys(field):
+            history = daily_history(key, days)
+            if history['days_with_data']:
+                break
+        
+        return jsonify({'field_id': field.id, 'name': field.name, **history}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/alerts', methods=['GET'])
+@jwt_required
+def weather_alerts():
+    """Weather alerts for the user's fields, soonest first"""
+    try:
+        query = WeatherAlert.query.filter_by(user_id=request.user_id)
+        status = request.args.get('status')
+        if status:
+            query = query.filter_by(status=status)
+        field_id = request.args.get('field_id', type=int)
+        if field_id:
+            query = query.filter_by(field_id=field_id)
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        
+        alerts = query.order_by(WeatherAlert.forecast_date, WeatherAlert.id).limit(limit).all()
+        
+        return jsonify({'alerts': [alert.to_dict() for alert in alerts]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/alerts/<int:alert_id>/ack', methods=['POST'])
+@jwt_required
+def acknowledge_weather_alert(alert_id):
+    """Mark one of the user's alerts as delivered"""
+    try:
+        alert = WeatherAlert.query.filter_by(id=alert_id, user_id=request.user_id).first()
+        if not alert:
+            return jsonify({'error': 'Alert not found'}), 404
+        
+        if alert.status != 'delivered':
+            alert.status = 'delivered'
+            alert.delivered_at = datetime.utcnow()
+            db.session.commit()
+        
+        return jsonify(alert.to_dict()), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/alerts/run', methods=['POST'])
+def run_alerts():
+    """Evaluate weather alerts for all fields; called by the scheduler with X-Alerts-Token"""
+    try:
+        token = request.headers.get('X-Alerts-Token', '')
+        if not WEATHER_ALERTS_RUN_TOKEN or not hmac.compare_digest(token, WEATHER_ALERTS_RUN_TOKEN):
+            return jsonify({'error': 'Forbidden'}), 403
+        
+        days = request.args.get('days', WEATHER_ALERT_DAYS, type=int)
+        return jsonify(run_weather_alerts(days)), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,54 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.extensions import db
+from app.services.db_pool import pool_sizes
+
+# Threads per pool for blocking SDK / HTTP calls awaited by async views
+ASYNC_AI_WORKERS = int(os.getenv('ASYNC_AI_WORKERS', 64))
+ASYNC_HTTP_WORKERS = int(os.getenv('ASYNC_HTTP_WORKERS', 64))
+# Database work gets one thread per connection the worker may open, so it queues here rather
+# than timing out on the connection pool
+ASYNC_DB_WORKERS = int(os.getenv('ASYNC_DB_WORKERS', sum(pool_sizes())))
+
+_executors = {
+    'ai': ThreadPoolExecutor(max_workers=ASYNC_AI_WORKERS, thread_name_prefix='async-ai'),
+    'http': ThreadPoolExecutor(max_workers=ASYNC_HTTP_WORKERS, thread_name_prefix='async-http'),
+    'db': ThreadPoolExecutor(max_workers=ASYNC_DB_WORKERS, thread_name_prefix='async-db'),
+}
+
+
+async def run_blocking(pool, func, *args, **kwargs):
+    """
+    Await a blocking call (AI SDK, pooled HTTP client, database) on one of the bounded pools
+    ('ai', 'http' or 'db') without blocking the event loop. The call sees the caller's context
+    variables, so Flask's request and app context stay available to it.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executors[pool], functools.partial(context.run, func, *args, **kwargs))
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Await database work from an async view on the 'db' pool. The request's session is removed
+    afterwards, so its connection is back in the pool before the view awaits anything else
+    (an AI call must not hold a connection for its duration). Returned model instances are
+    detached: read their loaded attributes, or return plain values.
+    """
+    def call():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            db.session.remove()
+    return await run_blocking('db', call)
+
+
+def save_model(instance):
+    """Add and commit a new model instance and return its id, e.g. await run_db(save_model, analysis)"""
+    db.session.add(instance)
+    db.session.commit()
+    return instance.id
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from app.services.multilingual import synonyms
+from app.services.scheme_search import crisis_search, CRISIS_SEARCH_FIELDS
+from app.services.text_analysis import STOPWORDS, analyze, tokenize
+
+CRISIS_HAZARDS_PATH = os.getenv(
+    'CRISIS_HAZARDS_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'crisis_hazards.json')
+)
+
+
+def phrase_counts(terms, max_words):
+    """Occurrences of every run of up to max_words consecutive terms"""
+    counts = Counter()
+    for n in range(1, max_words + 1):
+        counts.update(tuple(terms[i:i + n]) for i in range(len(terms) - n + 1))
+    return counts
+
+
+class HazardTaxonomy:
+    """
+    Crisis hazards (flood, drought, pest attack, ...) with their English keyword phrases and
+    synonym concepts. Phrases are kept as analyzed term tuples so "heavy rainfall" in a scheme
+    matches "heavy rains" in a query. General calamity phrases ("natural calamities") mark
+    schemes that cover every natural hazard.
+    """
+
+    def __init__(self, taxonomy):
+        hazards = taxonomy['hazards']
+        self.names = list(hazards)
+        self.labels = [hazards[name]['label'] for name in self.names]
+        self.natural = np.array([hazards[name].get('natural', False) for name in self.names])
+        self.phrases = [{tuple(analyze(keyword)) for keyword in hazards[name]['keywords']} - {()}
+                        for name in self.names]
+        self.general = {tuple(analyze(keyword)) for keyword in taxonomy['general_keywords']} - {()}
+        self.general_weight = taxonomy['general_weight']
+        self.max_words = max(len(phrase) for phrases in self.phrases + [self.general] for phrase in phrases)
+        self.by_concept = {}
+        for i, name in enumerate(self.names):
+            for concept in hazards[name].get('concepts', []):
+                self.by_concept.setdefault(concept, []).append(i)
+
+    @classmethod
+    def from_file(cls, path=CRISIS_HAZARDS_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def mentions(self, text):
+        """(phrase occurrences per hazard, general calamity phrase occurrences) in a text"""
+        counts = phrase_counts(analyze(text), self.max_words) if text else Counter()
+        return ([sum(counts[phrase] for phrase in phrases) for phrases in self.phrases],
+                sum(counts[phrase] for phrase in self.general))
+
+    def resolve(self, keyword):
+        """Indices of the hazards a farmer's words describe, in any supported language"""
+        counts = phrase_counts(analyze(keyword), self.max_words)
+        found = {i for i, phrases in enumerate(self.phrases) if any(phrase in counts for phrase in phrases)}
+        for token in tokenize(keyword):
+            if token not in STOPWORDS:
+                for concept in synonyms.concepts(token):
+                    found.update(self.by_concept.get(concept, ()))
+        return sorted(found)
+
+
+class HazardIndex:
+    """
+    Hazard x scheme weight matrix for one snapshot of the crisis catalog. A scheme's weight for a
+    hazard saturates with its boosted mentions of that hazard; schemes naming general calamities
+    get general_weight for every natural hazard they don't name directly.
+    """
+
+    def __init__(self, taxonomy, rows, fields=CRISIS_SEARCH_FIELDS):
+        self.taxonomy = taxonomy
+        self.rows = rows
+        direct = np.zeros((len(taxonomy.names), len(rows)), dtype=np.float32)
+        general = np.zeros(len(rows), dtype=np.float32)
+        for j, row in enumerate(rows):
+            for field, boost in fields.items():
+                counts, general_count = taxonomy.mentions(row.get(field))
+                direct[:, j] += boost * np.array(counts, dtype=np.float32)
+                general[j] += boost * general_count
+        self.direct = direct > 0
+        self.weights = np.maximum(
+            direct / (direct + 1),
+            taxonomy.general_weight * (general / (general + 1))[None, :] * taxonomy.natural[:, None]
+        )
+
+    def match(self, hazards, limit=10):
+        """(total matches, [(row, score, names of the hazards it covers directly)]) best first"""
+        scores = self.weights[hazards].sum(axis=0)
+        matched = np.flatnonzero(scores)
+        top = matched[np.lexsort((matched, -scores[matched]))][:limit]
+        return len(matched), [
+            (self.rows[j], float(scores[j]), [self.taxonomy.names[h] for h in hazards if self.direct[h, j]])
+            for j in top
+        ]
+
+
+class CrisisMatcher:
+    """The HazardIndex over the crisis catalog, rebuilt whenever the crisis search index is"""
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self._index = None
+        self._source = None
+        self._lock = threading.Lock()
+
+    def index(self):
+        """Up-to-date index (requires an app context)"""
+        source = crisis_search.index()
+        if source is not self._source:
+            with self._lock:
+                if source is not self._source:
+                    start = time.perf_counter()
+                    self._index = HazardIndex(self.taxonomy, source.rows)
+                    self._source = source
+                    print(f"🌪️ Mapped {len(source.rows)} crisis schemes to {len(self.taxonomy.names)} hazards "
+                          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self._index
+
+    def match(self, keyword, limit=10):
+        """([{'hazard', 'label'}] the keyword describes, total matches, [(row, score, hazards)])"""
+        hazards = self.taxonomy.resolve(keyword)
+        if not hazards:
+            corrected = crisis_search.correct(keyword)  # "fload" -> "flood"
+            hazards = self.taxonomy.resolve(corrected) if corrected else []
+        if not hazards:
+            return [], 0, []
+        total, results = self.index().match(hazards, limit)
+        described = [{'hazard': self.taxonomy.names[h], 'label': self.taxonomy.labels[h]} for h in hazards]
+        return described, total, results
+
+
+crisis_matcher = CrisisMatcher(HazardTaxonomy.from_file())
@@ -0,0 +1,218 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+CROP_KNOWLEDGE_PATH = os.getenv(
+    'CROP_KNOWLEDGE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'crop_knowledge.json')
+)
+
+SOILS = ['alluvial', 'black', 'red', 'laterite', 'sandy', 'loam', 'clay', 'silt']
+SEASONS = ['kharif', 'rabi', 'zaid']
+WATER_NEEDS = {'low': 0, 'medium': 1, 'high': 2}
+
+# Free-text soil names -> canonical soils (checked in order, first match wins)
+SOIL_ALIASES = [
+    ('sandy loam', ['sandy', 'loam']),
+    ('clay loam', ['clay', 'loam']),
+    ('silt loam', ['silt', 'loam']),
+    ('regur', ['black']),
+    ('cotton', ['black']),
+    ('desert', ['sandy']),
+    ('arid', ['sandy']),
+    ('forest', ['loam', 'laterite']),
+    ('mountain', ['loam']),
+    ('peat', ['clay']),
+    ('marsh', ['clay']),
+]
+
+# Water the irrigation system can add over a crop's season (mm)
+IRRIGATION_WATER_MM = {
+    'rainfed': 0, 'none': 0,
+    'drip': 600, 'sprinkler': 500,
+    'furrow': 800, 'flood': 1000, 'canal': 1000, 'borewell': 800, 'well': 700
+}
+DEFAULT_IRRIGATION_MM = 400  # irrigation type unknown
+
+# Typical growing-season mean temperature (C) and rainfall (mm) when no weather is supplied
+SEASON_CLIMATE = {'kharif': (28.0, 800.0), 'rabi': (18.0, 150.0), 'zaid': (32.0, 80.0)}
+
+# Climate zone adjustments: (temperature offset C, rainfall multiplier)
+CLIMATE_ZONES = {
+    'tropical': (2.0, 1.3), 'humid': (0.0, 1.6), 'coastal': (1.0, 1.5),
+    'subtropical': (0.0, 1.0), 'semi-arid': (2.0, 0.6), 'arid': (3.0, 0.3),
+    'temperate': (-6.0, 0.8), 'hill': (-8.0, 1.2), 'highland': (-8.0, 1.2)
+}
+
+# Component weights and how far outside a crop's range the score decays to 0
+WEIGHTS = {'soil': 0.25, 'ph': 0.2, 'temperature': 0.3, 'water': 0.25}
+PH_TOLERANCE = 1.0
+TEMPERATURE_TOLERANCE = 6.0
+EDGE_SCORE = 0.8  # range score at the edge of a crop's optimal range
+OFF_SEASON_FACTOR = 0.25
+SOIL_MISMATCH_SCORE = 0.3
+
+
+def current_season(today=None):
+    """Indian cropping season for a date: kharif (Jun-Oct), rabi (Nov-Mar), zaid (Apr-May)"""
+    month = (today or datetime.now()).month
+    if 6 <= month <= 10:
+        return 'kharif'
+    if month >= 11 or month <= 3:
+        return 'rabi'
+    return 'zaid'
+
+
+def normalize_season(season):
+    season = (season or 'current').strip().lower()
+    for name in SEASONS:
+        if name in season:
+            return name
+    if 'summer' in season:
+        return 'zaid'
+    if 'winter' in season:
+        return 'rabi'
+    if 'monsoon' in season or 'rain' in season:
+        return 'kharif'
+    return current_season()
+
+
+def normalize_soil(soil_type):
+    """Canonical soil names for a free-text soil type; empty when unknown"""
+    soil = (soil_type or '').strip().lower()
+    if not soil:
+        return []
+    for alias, soils in SOIL_ALIASES:
+        if alias in soil:
+            return soils
+    return [name for name in SOILS if name in soil]
+
+
+def weather_from_forecast(forecast):
+    """Growing conditions from a weather forecast: mean temperature over the forecast days"""
+    temperatures = [
+        (day['temperature_max'] + day['temperature_min']) / 2
+        for day in forecast or []
+        if day.get('temperature_max') is not None and day.get('temperature_min') is not None
+    ]
+    return {'temperature': float(np.mean(temperatures))} if temperatures else {}
+
+
+class CropSuitabilityEngine:
+    """
+    Scores every crop in the knowledge table against field conditions in one vectorized pass.
+    Each component (soil, pH, temperature, water) scores 0-1, unknown inputs drop out of the
+    weighted mean, and off-season crops are scaled down by OFF_SEASON_FACTOR.
+    """
+
+    def __init__(self, crops):
+        self.crops = crops
+        self.names = [crop['name'] for crop in crops]
+        self.ph = np.array([crop['ph'] for crop in crops], dtype=float)
+        self.temperature = np.array([crop['temperature_c'] for crop in crops], dtype=float)
+        self.water = np.array([crop['water_mm'] for crop in crops], dtype=float)
+        self.water_need = np.array([WATER_NEEDS[crop['water_need']] for crop in crops])
+        self.soil_matrix = np.array([[soil in crop['soils'] for soil in SOILS] for crop in crops])
+        self.season_matrix = np.array([[season in crop['seasons'] for season in SEASONS] for crop in crops])
+
+    @classmethod
+    def from_file(cls, path=CROP_KNOWLEDGE_PATH):
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def score(self, soil_type=None, soil_ph=None, irrigation_type=None, season=None,
+              climate_zone=None, weather=None):
+        """Return (season, total scores, component scores) for all crops"""
+        season = normalize_season(season)
+        temperature, rainfall = SEASON_CLIMATE[season]
+        zone = CLIMATE_ZONES.get((climate_zone or '').strip().lower())
+        if zone:
+            temperature, rainfall = temperature + zone[0], rainfall * zone[1]
+        weather = weather or {}
+        if weather.get('temperature') is not None:
+            temperature = float(weather['temperature'])
+        if weather.get('rainfall_mm') is not None:
+            rainfall = float(weather['rainfall_mm'])
+
+        components = {
+            'temperature': _range_score(temperature, self.temperature, TEMPERATURE_TOLERANCE),
+            'water': self._water_score(rainfall, irrigation_type),
+        }
+        soils = normalize_soil(soil_type)
+        if soils:
+            matches = self.soil_matrix[:, [SOILS.index(soil) for soil in soils]].any(axis=1)
+            components['soil'] = np.where(matches, 1.0, SOIL_MISMATCH_SCORE)
+        if soil_ph is not None:
+            components['ph'] = _range_score(float(soil_ph), self.ph, PH_TOLERANCE)
+
+        total = sum(WEIGHTS[name] * values for name, values in components.items())
+        total = total / sum(WEIGHTS[name] for name in components)
+        in_season = self.season_matrix[:, SEASONS.index(season)]
+        total = np.where(in_season, total, total * OFF_SEASON_FACTOR)
+        return season, total, components
+
+    def _water_score(self, rainfall, irrigation_type):
+        irrigation = (irrigation_type or '').strip().lower()
+        irrigation_mm = next((mm for name, mm in IRRIGATION_WATER_MM.items() if name in irrigation), None)
+        supply = rainfall + (DEFAULT_IRRIGATION_MM if irrigation_mm is None else irrigation_mm)
+        shortfall = np.clip(supply / self.water[:, 0], 0.0, 1.0)
+        # Rain (not irrigation) far beyond a crop's range waterlogs it
+        excess = np.clip((rainfall - self.water[:, 1]) / self.water[:, 1], 0.0, 1.0)
+        score = shortfall * (1.0 - 0.5 * excess)
+        if irrigation_mm == 0:
+            # Rainfed fields favour low water-need crops
+            score = score * np.where(self.water_need == 2, 0.7, 1.0)
+        return score
+
+    def recommend(self, limit=5, **conditions):
+        """Top crops for the given conditions with their component scores and a short reason"""
+        season, total, components = self.score(**conditions)
+        top = np.argsort(-total, kind='stable')[:limit]
+        results = []
+        for i in top:
+            crop = self.crops[i]
+            factors = {name: round(float(values[i]), 2) for name, values in components.items()}
+            results.append({
+                'name': crop['name'],
+                'category': crop['category'],
+                'score': round(float(total[i]) * 100, 1),
+                'seasons': crop['seasons'],
+                'water_need': crop['water_need'],
+                'duration_days': crop['duration_days'],
+                'factors': factors,
+                'reason': _reason(crop, season, factors)
+            })
+        return {'season': season, 'crops': results}
+
+
+def _range_score(value, ranges, tolerance):
+    """1 at the middle of [lo, hi], EDGE_SCORE at its ends, decaying linearly to 0 at tolerance outside"""
+    middle = ranges.mean(axis=1)
+    half_width = np.maximum((ranges[:, 1] - ranges[:, 0]) / 2, 1e-9)
+    inside = 1.0 - (1.0 - EDGE_SCORE) * np.abs(value - middle) / half_width
+    outside = np.maximum(ranges[:, 0] - value, value - ranges[:, 1]) / tolerance
+    return np.where(outside <= 0, inside, EDGE_SCORE * (1.0 - np.clip(outside, 0.0, 1.0)))
+
+
+def _reason(crop, season, factors):
+    notes = []
+    if len(crop['seasons']) == len(SEASONS):
+        notes.append('grown year-round')
+    elif season in crop['seasons']:
+        notes.append(f"{season} crop")
+    else:
+        notes.append(f"usually grown in {'/'.join(crop['seasons'])}")
+    if factors.get('soil') == 1.0:
+        notes.append(f"suited to {', '.join(crop['soils'])} soils")
+    if 'ph' in factors:
+        notes.append(f"pH {crop['ph'][0]}-{crop['ph'][1]}" + (' fits' if factors['ph'] >= EDGE_SCORE else ' is a stretch'))
+    if factors['temperature'] < EDGE_SCORE:
+        notes.append(f"prefers {crop['temperature_c'][0]}-{crop['temperature_c'][1]}°C")
+    if factors['water'] < 1.0:
+        notes.append(f"needs {crop['water_mm'][0]}-{crop['water_mm'][1]} mm water")
+    return '; '.join(notes)
+
+
+crop_engine = CropSuitabilityEngine.from_file()
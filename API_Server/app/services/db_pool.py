@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+from collections import deque
+
+from flask import g, has_app_context, jsonify
+from sqlalchemy import exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.extensions import db
+
+# Connection budget of one instance across all of its worker processes
+# (e.g. Cloud SQL max_connections divided by the maximum number of instances)
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 20))
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))  # worker processes; gunicorn and uvicorn read it too
+SERVER_THREADS = int(os.getenv('SERVER_THREADS', 1))  # concurrent request threads per worker
+DB_POOL_SIZE = os.getenv('DB_POOL_SIZE')  # overrides the derived pool size
+DB_MAX_OVERFLOW = os.getenv('DB_MAX_OVERFLOW')  # overrides the derived overflow
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))  # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 300))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'false').lower() == 'true'
+DB_LIVENESS_INTERVAL = float(os.getenv('DB_LIVENESS_INTERVAL', 30))  # seconds between idle connection probes, 0 disables
+DB_BUSY_RETRY_AFTER = int(os.getenv('DB_BUSY_RETRY_AFTER', 2))  # Retry-After seconds on pool exhaustion
+DB_POOL_METRICS_WINDOW = int(os.getenv('DB_POOL_METRICS_WINDOW', 1000))
+
+# Set on the liveness thread so its probes stay out of the checkout metrics
+_local = threading.local()
+
+
+def pool_sizes(workers=WEB_CONCURRENCY, threads=SERVER_THREADS, max_connections=DB_MAX_CONNECTIONS):
+    """
+    (pool_size, max_overflow) for one worker process: a kept connection per request thread, and
+    overflow up to the worker's share of the instance's connection budget
+    """
+    share = max(1, max_connections // max(1, workers))
+    pool_size = min(max(1, threads), share)
+    max_overflow = share - pool_size
+    if DB_POOL_SIZE:
+        pool_size = int(DB_POOL_SIZE)
+    if DB_MAX_OVERFLOW:
+        max_overflow = int(DB_MAX_OVERFLOW)
+    return pool_size, max_overflow
+
+
+def engine_options(database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI, sized for the worker model"""
+    if database_uri.startswith('sqlite') and (database_uri.rstrip('/') == 'sqlite:' or ':memory:' in database_uri):
+        # In-memory SQLite keeps SQLAlchemy's single-connection pool
+        return {}
+
+    pool_size, max_overflow = pool_sizes()
+    options = {
+        'poolclass': MonitoredQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,           # Recycle connections before Cloud SQL drops idle ones
+        'pool_pre_ping': DB_POOL_PRE_PING,         # Off: idle connections are probed by the liveness thread
+    }
+    if database_uri.startswith('mysql'):
+        options['connect_args'] = {
+            'charset': 'utf8mb4',
+            'connect_timeout': 60,
+            'read_timeout': 60,
+            'write_timeout': 60,
+        }
+    elif database_uri.startswith('postgresql'):
+        options['connect_args'] = {'connect_timeout': 60}
+    return options
+
+
+class PoolStats:
+    """Checkout wait times, timeouts, peak connections in use and liveness probe results"""
+
+    def __init__(self, window=DB_POOL_METRICS_WINDOW):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        self.waits = deque(maxlen=window)
+        self.liveness_checks = 0
+        self.liveness_failures = 0
+        self.liveness_last_ok = None
+        self.liveness_last_error = None
+        self._lock = threading.Lock()
+
+    def record_checkout(self, seconds, in_use):
+        with self._lock:
+            self.checkouts += 1
+            self.waits.append(seconds)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self, seconds):
+        with self._lock:
+            self.timeouts += 1
+            self.waits.append(seconds)
+
+    def record_liveness(self, error=None):
+        with self._lock:
+            self.liveness_checks += 1
+            if error is None:
+                self.liveness_last_ok = time.time()
+            else:
+                self.liveness_failures += 1
+                self.liveness_last_error = str(error)
+
+    def snapshot(self, pool):
+        with self._lock:
+            waits = sorted(self.waits)
+            snapshot = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'peak_in_use': self.peak_in_use,
+                'liveness': {
+                    'interval_seconds': DB_LIVENESS_INTERVAL,
+                    'checks': self.liveness_checks,
+                    'failures': self.liveness_failures,
+                    'last_ok': self.liveness_last_ok,
+                    'last_error': self.liveness_last_error,
+                },
+            }
+        for name, quantile in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            snapshot[f'checkout_wait_{name}_ms'] = (
+                round(waits[min(len(waits) - 1, int(len(waits) * quantile))] * 1000, 2) if waits else None)
+        snapshot['checkout_wait_max_ms'] = round(waits[-1] * 1000, 2) if waits else None
+        if isinstance(pool, QueuePool):
+            snapshot.update({
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'timeout_seconds': pool.timeout(),
+                'in_use': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow_in_use': max(0, pool.overflow()),
+            })
+        snapshot.update({
+            'pool': type(pool).__name__,
+            'pre_ping': DB_POOL_PRE_PING,
+            'workers': WEB_CONCURRENCY,
+            'threads_per_worker': SERVER_THREADS,
+            'max_connections': DB_MAX_CONNECTIONS,
+        })
+        return snapshot
+
+
+pool_stats = PoolStats()
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waited and which ones timed out"""
+
+    def connect(self):
+        if getattr(_local, 'probing', False):
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.record_timeout(time.perf_counter() - start)
+            # Lets the after_request hook turn the route's error into a retryable 503
+            if has_app_context():
+                g.db_pool_timeout = True
+            raise
+        pool_stats.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+class LivenessCheck:
+    """
+    Background probe replacing per-checkout pre-ping: every DB_LIVENESS_INTERVAL seconds one
+    idle connection runs SELECT 1; when it fails the pool is disposed so requests get fresh
+    connections. One thread per worker process, started on the worker's first request.
+    """
+
+    def __init__(self, interval=DB_LIVENESS_INTERVAL):
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self, engine):
+        if not self.interval or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, args=(engine,), name='db-liveness', daemon=True).start()
+
+    def _run(self, engine):
+        _local.probing = True
+        while True:
+            time.sleep(self.interval)
+            self.check(engine)
+
+    def check(self, engine):
+        """Probe one idle connection; returns False when the database did not answer"""
+        pool = engine.pool
+        if isinstance(pool, QueuePool) and not pool.checkedin():
+            # Every connection is in use, so requests are exercising them already
+            return True
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            pool_stats.record_liveness(e)
+            print(f"⚠️ Database liveness check failed, resetting connection pool: {e}")
+            engine.dispose()
+            return False
+        pool_stats.record_liveness()
+        return True
+
+
+liveness_check = LivenessCheck()
+
+
+def init_db_pool(app):
+    """Start the liveness check in each worker and answer pool exhaustion with 503 + Retry-After"""
+
+    @app.before_request
+    def start_liveness_check():
+        liveness_check.ensure_started(db.engine)
+
+    @app.after_request
+    def pool_timeout_response(response):
+        if g.pop('db_pool_timeout', False) and response.status_code >= 500:
+            response = jsonify({'error': 'Database busy, please retry', 'retry_after': DB_BUSY_RETRY_AFTER})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(DB_BUSY_RETRY_AFTER)
+        return response
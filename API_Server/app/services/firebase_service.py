@@ -1,17 +1,25 @@
-import firebase_admin
-from firebase_admin import credentials, auth
 import os
 
-# Initialize Firebase Admin SDK
-cred_path = os.getenv('FIREBASE_CREDENTIALS_PATH')
-if cred_path and os.path.exists(cred_path):
-    cred = credentials.Certificate(cred_path)
-    firebase_admin.initialize_app(cred)
+from app.services.lazy_sdk import LazySDK
+
+def load_firebase_auth():
+    """Import firebase_admin and initialize it from FIREBASE_CREDENTIALS_PATH; returns its auth module"""
+    import firebase_admin
+    from firebase_admin import credentials, auth
+
+    cred_path = os.getenv('FIREBASE_CREDENTIALS_PATH')
+    if cred_path and os.path.exists(cred_path):
+        cred = credentials.Certificate(cred_path)
+        firebase_admin.initialize_app(cred)
+    return auth
+
+# Initialize Firebase Admin SDK on the first token check instead of at import
+firebase_auth = LazySDK('Firebase Admin SDK', load_firebase_auth)
 
 def verify_firebase_token(id_token):
     """Verify Firebase ID token and return decoded token"""
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        decoded_token = firebase_auth.get().verify_id_token(id_token)
         return decoded_token
     except Exception as e:
         print(f"Firebase token verification failed: {e}")
@@ -20,7 +28,7 @@ def verify_firebase_token(id_token):
 def get_user_info(uid):
     """Get user information from Firebase"""
     try:
-        user = auth.get_user(uid)
+        user = firebase_auth.get().get_user(uid)
         return {
             'uid': user.uid,
             'email': user.email,
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+LOCAL_NOON = 12 * 3600
+
+
+def slot_time(item):
+    """UTC epoch seconds of a forecast slot ('dt', or the UTC 'dt_txt' timestamp)"""
+    if item.get('dt') is not None:
+        return int(item['dt'])
+    return int(datetime.strptime(item['dt_txt'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp())
+
+
+def aggregate_daily(payloads, days=None):
+    """
+    Aggregate 3-hourly OpenWeatherMap forecast payloads into local-date daily summaries.
+    All slots of all payloads are binned in one vectorized pass by (payload, local date), using
+    each payload's city.timezone offset. Per day: true min/max temperature, summed rain + snow,
+    max wind, mean humidity and the description of the slot nearest local noon.
+    Returns one list of days per payload (at most `days` each).
+    """
+    location, times, offsets = [], [], []
+    temp_max, temp_min, precipitation, wind, humidity, descriptions = [], [], [], [], [], []
+    for index, payload in enumerate(payloads):
+        offset = int((payload.get('city') or {}).get('timezone') or 0)
+        for item in payload.get('list', []):
+            main = item.get('main', {})
+            location.append(index)
+            times.append(slot_time(item))
+            offsets.append(offset)
+            temp_max.append(main.get('temp_max', main.get('temp', np.nan)))
+            temp_min.append(main.get('temp_min', main.get('temp', np.nan)))
+            precipitation.append((item.get('rain') or {}).get('3h', 0.0) + (item.get('snow') or {}).get('3h', 0.0))
+            wind.append((item.get('wind') or {}).get('speed', np.nan))
+            humidity.append(main.get('humidity', np.nan))
+            descriptions.append((item.get('weather') or [{}])[0].get('description'))
+
+    results = [[] for _ in payloads]
+    if not times:
+        return results
+
+    location = np.array(location)
+    local = np.array(times, dtype=np.int64) + np.array(offsets, dtype=np.int64)
+    local_day = local // SECONDS_PER_DAY
+    noon_distance = np.abs(local % SECONDS_PER_DAY - LOCAL_NOON)
+
+    # Sort slots by (location, local day, distance from noon) so each group starts with its noon slot
+    order = np.lexsort((noon_distance, local_day, location))
+    location, local_day = location[order], local_day[order]
+    temp_max = np.array(temp_max, dtype=float)[order]
+    temp_min = np.array(temp_min, dtype=float)[order]
+    precipitation = np.array(precipitation, dtype=float)[order]
+    wind = np.array(wind, dtype=float)[order]
+    humidity = np.array(humidity, dtype=float)[order]
+
+    boundary = np.ones(len(order), dtype=bool)
+    boundary[1:] = (location[1:] != location[:-1]) | (local_day[1:] != local_day[:-1])
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(order)))
+
+    day_max = np.fmax.reduceat(temp_max, starts)
+    day_min = np.fmin.reduceat(temp_min, starts)
+    day_precipitation = np.add.reduceat(precipitation, starts)
+    day_wind = np.fmax.reduceat(wind, starts)
+    humidity_known = ~np.isnan(humidity)
+    humidity_count = np.add.reduceat(humidity_known.astype(int), starts)
+    day_humidity = np.add.reduceat(np.where(humidity_known, humidity, 0.0), starts) / np.maximum(humidity_count, 1)
+
+    dates = local_day[starts].astype('datetime64[D]').astype(str)
+
+    for group, start in enumerate(starts):
+        daily = results[location[start]]
+        if days is not None and len(daily) >= days:
+            continue
+        daily.append({
+            'date': str(dates[group]),
+            'temperature_max': _value(day_max[group]),
+            'temperature_min': _value(day_min[group]),
+            'humidity': _value(day_humidity[group]) if humidity_count[group] else None,
+            'precipitation_mm': _value(day_precipitation[group]),
+            'wind_speed_max': _value(day_wind[group]),
+            'description': descriptions[order[start]],
+            'slots': int(counts[group])
+        })
+    return results
+
+
+def _value(number):
+    return None if np.isnan(number) else round(float(number), 1)
@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import Crop, FarmerScheme
+from app.services.crop_engine import crop_engine
+from app.services.text_analysis import tokenize
+
+SUGGEST_KINDS = ('crop', 'variety', 'scheme')
+# Trigram similarity below which a misspelling is not corrected (pg_trgm's default threshold)
+FUZZY_MIN_SIMILARITY = float(os.getenv('FUZZY_MIN_SIMILARITY', 0.3))
+# Share of the typed trigrams a suggestion must contain
+SUGGEST_MIN_SCORE = float(os.getenv('SUGGEST_MIN_SCORE', 0.4))
+# How often the crop and scheme tables are checked for new names
+SUGGEST_INDEX_CHECK_SECONDS = int(os.getenv('SUGGEST_INDEX_CHECK_SECONDS', 60))
+
+
+def normalize_term(text):
+    return ' '.join(tokenize(text))
+
+
+def trigrams(text, partial=False):
+    """
+    Trigrams of each normalized word padded as in pg_trgm ('  t', ' to', 'tom', ..., 'to ').
+    Partial input (still being typed) has no end padding on its last word, so 'tom' is a
+    clean prefix of 'tomato'.
+    """
+    words = tokenize(text)
+    grams = set()
+    for n, word in enumerate(words):
+        padded = '  ' + word + ('' if partial and n == len(words) - 1 else ' ')
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Trigram (Jaccard) similarity of two strings, 0-1"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+def closest(text, candidates, min_similarity=FUZZY_MIN_SIMILARITY):
+    """Most similar of a few candidate strings, or None when none is similar enough"""
+    scored = [(similarity(text, candidate), candidate) for candidate in candidates]
+    score, best = max(scored, key=lambda item: item[0], default=(0.0, None))
+    return best if score >= min_similarity else None
+
+
+class TrigramIndex:
+    """
+    Trigram posting lists over a vocabulary, stored as one CSR array (term ids grouped by
+    trigram). A lookup counts shared trigrams for every term with one bincount over the
+    query's posting lists, then ranks only the terms that share any.
+    """
+
+    def __init__(self, terms):
+        self.size = len(terms)
+        self.gram_ids = {}
+        self.lengths = np.zeros(self.size, dtype=np.int32)
+        grams, ids = [], []
+        for i, term in enumerate(terms):
+            term_grams = trigrams(term)
+            self.lengths[i] = len(term_grams)
+            for gram in term_grams:
+                grams.append(self.gram_ids.setdefault(gram, len(self.gram_ids)))
+                ids.append(i)
+        grams = np.array(grams, dtype=np.int32)
+        order = np.argsort(grams, kind='stable')
+        self.term_ids = np.array(ids, dtype=np.int32)[order]
+        self.offsets = np.searchsorted(grams[order], np.arange(len(self.gram_ids) + 1))
+
+    def __len__(self):
+        return self.size
+
+    def search(self, text, limit=10, min_score=FUZZY_MIN_SIMILARITY, partial=False, mask=None, popularity=None):
+        """
+        [(term id, score, similarity)] best first. The similarity is Jaccard over trigrams; the
+        score is the same, or for partial input the share of the query's trigrams in the term
+        (any completion of what was typed scores 1), ties going to the closer term, then to
+        the more popular one (popularity: 0-1 per term).
+        """
+        grams = trigrams(text, partial)
+        query = [self.gram_ids[gram] for gram in grams if gram in self.gram_ids]
+        query_length = len(grams)
+        if not query:
+            return []
+        shared = np.bincount(
+            np.concatenate([self.term_ids[self.offsets[gram]:self.offsets[gram + 1]] for gram in query]),
+            minlength=self.size
+        )
+        if mask is not None:
+            shared[~mask] = 0
+        candidates = np.flatnonzero(shared)
+        common = shared[candidates].astype(np.float32)
+        jaccard = common / (query_length + self.lengths[candidates] - common)
+        score = common / query_length if partial else jaccard
+        keep = score >= min_score
+        candidates, score, jaccard = candidates[keep], score[keep], jaccard[keep]
+        rank = score + jaccard * 1e-3
+        if popularity is not None:
+            rank += popularity[candidates] * 1e-6
+        if len(candidates) > limit:
+            top = np.argpartition(-rank, limit - 1)[:limit]
+            candidates, score, jaccard, rank = candidates[top], score[top], jaccard[top], rank[top]
+        order = np.lexsort((candidates, -rank))
+        return [(int(candidates[i]), float(score[i]), float(jaccard[i])) for i in order]
+
+
+class SuggestionIndex:
+    """Distinct names by kind with their usage counts, searchable by trigram similarity"""
+
+    def __init__(self, entries):
+        # entries: (kind, normalized name) -> Counter of the spellings in use
+        keys = sorted(entries)
+        self.kinds = np.array([SUGGEST_KINDS.index(kind) for kind, _ in keys], dtype=np.int8)
+        self.names = [entries[key].most_common(1)[0][0] for key in keys]
+        self.counts = [sum(entries[key].values()) for key in keys]
+        self.popularity = np.log1p(np.array(self.counts, dtype=np.float32))
+        self.popularity /= max(float(self.popularity.max(initial=0)), 1.0)
+        self.trigrams = TrigramIndex([name for _, name in keys])
+
+    def __len__(self):
+        return len(self.names)
+
+    def _mask(self, kinds):
+        return np.isin(self.kinds, [SUGGEST_KINDS.index(kind) for kind in kinds]) if kinds else None
+
+    def suggest(self, query, kinds=None, limit=10):
+        """Completions and near spellings of partially typed text, most likely first"""
+        matches = self.trigrams.search(query, limit, SUGGEST_MIN_SCORE, partial=True, mask=self._mask(kinds),
+                                       popularity=self.popularity)
+        return [{
+            'text': self.names[i],
+            'kind': SUGGEST_KINDS[self.kinds[i]],
+            'count': self.counts[i],
+            'score': round(score, 3)
+        } for i, score, _ in matches]
+
+    def best_match(self, text, kinds=None):
+        """Closest known name to a complete (possibly misspelled) name, or None"""
+        matches = self.trigrams.search(text, 1, FUZZY_MIN_SIMILARITY, mask=self._mask(kinds), popularity=self.popularity)
+        return self.names[matches[0][0]] if matches else None
+
+
+class Suggestions:
+    """
+    The current SuggestionIndex over crop types, varieties and scheme names (plus the crops of
+    the knowledge table), rebuilt when the crop or scheme tables' row count, highest id or
+    latest updated_at changes (checked every SUGGEST_INDEX_CHECK_SECONDS). Crops are written far more often
+    than searched for, so writes don't trigger immediate rebuilds.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._fingerprint = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _tables_fingerprint(self):
+        return (
+            tuple(db.session.query(func.count(Crop.id), func.max(Crop.id), func.max(Crop.updated_at)).one()),
+            tuple(db.session.query(func.count(FarmerScheme.id), func.max(FarmerScheme.id),
+                                   func.max(FarmerScheme.updated_at)).one()),
+        )
+
+    def index(self):
+        """Up-to-date index (requires an app context)"""
+        if self._index is not None and time.monotonic() - self._checked < SUGGEST_INDEX_CHECK_SECONDS:
+            return self._index
+        with self._lock:
+            if self._index is None or time.monotonic() - self._checked >= SUGGEST_INDEX_CHECK_SECONDS:
+                fingerprint = self._tables_fingerprint()
+                if self._index is None or fingerprint != self._fingerprint:
+                    self.rebuild(fingerprint)
+                self._checked = time.monotonic()
+        return self._index
+
+    def rebuild(self, fingerprint=None):
+        """Load the distinct names in use and swap in a fresh index"""
+        start = time.perf_counter()
+        entries = {}
+
+        def add(kind, name, count=1):
+            key = (kind, normalize_term(name))
+            if key[1]:
+                entries.setdefault(key, Counter())[name.strip()] += count
+
+        for name in crop_engine.names:
+            add('crop', name, 0)
+        for kind, column in (('crop', Crop.crop_type), ('variety', Crop.variety),
+                             ('scheme', FarmerScheme.scheme_name)):
+            for name, count in db.session.query(column, func.count()).filter(column.isnot(None)).group_by(column):
+                add(kind, name, count)
+
+        self._index = SuggestionIndex(entries)
+        self._fingerprint = fingerprint or self._tables_fingerprint()
+        self._checked = time.monotonic()
+        print(f"🔤 Indexed {len(self._index)} names ({len(self._index.trigrams.gram_ids)} trigrams) "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self._index
+
+    def suggest(self, query, kinds=None, limit=10):
+        return self.index().suggest(query, kinds, limit)
+
+    def best_match(self, text, kinds=None):
+        return self.index().best_match(text, kinds)
+
+
+suggestions = Suggestions()
@@ -0,0 +1,260 @@
+import math
+import os
+
+import numpy as np
+from sqlalchemy import bindparam, func, or_, update
+
+from app.extensions import db
+from app.models import Field, Crop
+
+GEOHASH_PRECISION = 9  # stored precision, ~4.8 m x 4.8 m cells
+GEO_MAX_QUERY_CELLS = int(os.getenv('GEO_MAX_QUERY_CELLS', 32))  # prefixes OR'd into one query
+GEO_MAX_RADIUS_KM = float(os.getenv('GEO_MAX_RADIUS_KM', 200))
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: i for i, char in enumerate(BASE32)}
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash of a coordinate; fields sharing a prefix share the cell of that length"""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            middle = (lon_lo + lon_hi) / 2
+            value = value * 2 + (longitude >= middle)
+            lon_lo, lon_hi = (middle, lon_hi) if longitude >= middle else (lon_lo, middle)
+        else:
+            middle = (lat_lo + lat_hi) / 2
+            value = value * 2 + (latitude >= middle)
+            lat_lo, lat_hi = (middle, lat_hi) if latitude >= middle else (lat_lo, middle)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def decode_bounds(geohash):
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell"""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                middle = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (middle, lon_hi) if bit else (lon_lo, middle)
+            else:
+                middle = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (middle, lat_hi) if bit else (lat_lo, middle)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision):
+    """(latitude, longitude) extent in degrees of a cell at a precision"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(min_lat, min_lon, max_lat, max_lon, max_cells=GEO_MAX_QUERY_CELLS):
+    """Finest geohash cells (at most max_cells) that together cover a bounding box"""
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lon_size = cell_size(precision)
+        lat_first = math.floor((min_lat + 90) / lat_size)
+        lat_last = min(math.floor((max_lat + 90) / lat_size), int(round(180 / lat_size)) - 1)
+        lon_first = math.floor((min_lon + 180) / lon_size)
+        lon_last = min(math.floor((max_lon + 180) / lon_size), int(round(360 / lon_size)) - 1)
+        count = (lat_last - lat_first + 1) * (lon_last - lon_first + 1)
+        if count <= max_cells or precision == 1:
+            return [
+                encode(-90 + (i + 0.5) * lat_size, -180 + (j + 0.5) * lon_size, precision)
+                for i in range(lat_first, lat_last + 1)
+                for j in range(lon_first, lon_last + 1)
+            ]
+
+
+def radius_bounds(latitude, longitude, radius_km):
+    """Bounding box enclosing a circle"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return latitude - lat_delta, longitude - lon_delta, latitude + lat_delta, longitude + lon_delta
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances from one point to arrays of points"""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def prefix_successor(prefix):
+    """Smallest geohash after every geohash starting with prefix (None past the last cell)"""
+    prefix = prefix.rstrip(BASE32[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[_DECODE[prefix[-1]] + 1]
+
+
+def _in_cells(cells):
+    """Prefix test as index range scans; ranges bounded by geohash characters only, so any collation works"""
+    ranges = []
+    for cell in cells:
+        upper = prefix_successor(cell)
+        ranges.append(Field.geohash >= cell if upper is None else (Field.geohash >= cell) & (Field.geohash < upper))
+    return or_(*ranges)
+
+
+def update_field_geohash(field):
+    """Keep Field.geohash in sync with its coordinates"""
+    if field.latitude is None or field.longitude is None:
+        field.geohash = None
+    else:
+        field.geohash = encode(float(field.latitude), float(field.longitude))
+
+
+def _rows_in_box(min_lat, min_lon, max_lat, max_lon, exclude_id=None, limit=None):
+    query = db.session.query(Field.id, Field.user_id, Field.latitude, Field.longitude, Field.geohash).filter(
+        _in_cells(covering_cells(min_lat, min_lon, max_lat, max_lon)),
+        Field.latitude.between(min_lat, max_lat),
+        Field.longitude.between(min_lon, max_lon)
+    )
+    if exclude_id is not None:
+        query = query.filter(Field.id != exclude_id)
+    if limit:
+        # Geohash order follows the index, so the database stops after `limit` rows
+        query = query.order_by(Field.geohash, Field.id).limit(limit)
+    return query.all()
+
+
+def _with_distances(rows, latitude, longitude):
+    if not rows:
+        return []
+    distances = haversine_km(latitude, longitude,
+                             np.array([row.latitude for row in rows], dtype=float),
+                             np.array([row.longitude for row in rows], dtype=float))
+    return [
+        {'field_id': row.id, 'user_id': row.user_id, 'latitude': row.latitude, 'longitude': row.longitude,
+         'geohash': row.geohash, 'distance_km': round(float(distance), 3)}
+        for row, distance in zip(rows, distances.tolist())
+    ]
+
+
+def fields_in_bbox(min_lat, min_lon, max_lat, max_lon, limit=None):
+    """Fields inside a bounding box, answered from the geohash index"""
+    rows = _rows_in_box(min_lat, min_lon, max_lat, max_lon, limit=limit)
+    return [
+        {'field_id': row.id, 'user_id': row.user_id, 'latitude': row.latitude, 'longitude': row.longitude,
+         'geohash': row.geohash}
+        for row in rows
+    ]
+
+
+def fields_within_radius(latitude, longitude, radius_km, limit=None, exclude_id=None):
+    """Fields within radius_km of a point, nearest first"""
+    radius_km = min(radius_km, GEO_MAX_RADIUS_KM)
+    rows = _rows_in_box(*radius_bounds(latitude, longitude, radius_km), exclude_id=exclude_id)
+    results = [row for row in _with_distances(rows, latitude, longitude) if row['distance_km'] <= radius_km]
+    results.sort(key=lambda row: row['distance_km'])
+    return results[:limit] if limit else results
+
+
+def nearest_fields(latitude, longitude, count=10, max_radius_km=GEO_MAX_RADIUS_KM, exclude_id=None):
+    """
+    The `count` fields nearest a point within max_radius_km. Searches the point's cell and its
+    neighbours at successively coarser precisions until enough fields are found closer than the
+    searched block's inner radius, so dense areas need only a small, indexed scan.
+    """
+    max_radius_km = min(max_radius_km, GEO_MAX_RADIUS_KM)
+    for precision in range(7, 0, -1):
+        lat_size, lon_size = cell_size(precision)
+        # Any point within one cell size of the query point lies in its 3x3 cell block
+        inner_km = min(lat_size * KM_PER_DEGREE,
+                       lon_size * KM_PER_DEGREE * math.cos(math.radians(latitude)))
+        if inner_km >= max_radius_km:
+            break
+        cells = list(dict.fromkeys(
+            encode(min(max(latitude + dy * lat_size, -89.999), 89.999),
+                   (longitude + dx * lon_size + 180) % 360 - 180, precision)
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+        ))
+        query = db.session.query(Field.id, Field.user_id, Field.latitude, Field.longitude, Field.geohash).filter(
+            _in_cells(cells)
+        )
+        if exclude_id is not None:
+            query = query.filter(Field.id != exclude_id)
+        candidates = [row for row in _with_distances(query.all(), latitude, longitude)
+                      if row['distance_km'] <= inner_km]
+        if len(candidates) >= count:
+            candidates.sort(key=lambda row: row['distance_km'])
+            return candidates[:count]
+    return fields_within_radius(latitude, longitude, max_radius_km, limit=count, exclude_id=exclude_id)
+
+
+def cell_aggregates(precision=5, bbox=None):
+    """
+    Field count, area and active crops per geohash cell of the given precision,
+    optionally restricted to a (min_lat, min_lon, max_lat, max_lon) bounding box.
+    """
+    cell = func.substr(Field.geohash, 1, precision)
+    filters = [Field.geohash.isnot(None)]
+    if bbox:
+        filters += [_in_cells(covering_cells(*bbox)), Field.latitude.between(bbox[0], bbox[2]),
+                    Field.longitude.between(bbox[1], bbox[3])]
+
+    cells = {}
+    for key, fields, area in db.session.query(cell, func.count(Field.id), func.sum(Field.total_area)).filter(
+            *filters).group_by(cell):
+        min_lat, min_lon, max_lat, max_lon = decode_bounds(key)
+        cells[key] = {
+            'cell': key,
+            'center': [round((min_lat + max_lat) / 2, 5), round((min_lon + max_lon) / 2, 5)],
+            'fields': fields,
+            'total_area': round(area or 0.0, 2),
+            'crops': {}
+        }
+
+    crop_rows = db.session.query(cell, Crop.crop_type, func.count(Crop.id), func.sum(Crop.area)).join(
+        Field, Crop.field_id == Field.id
+    ).filter(*filters, Crop.harvest_date.is_(None)).group_by(cell, Crop.crop_type)
+    for key, crop_type, crops, area in crop_rows:
+        if key in cells:
+            cells[key]['crops'][crop_type] = {'count': crops, 'area': round(area or 0.0, 2)}
+
+    return sorted(cells.values(), key=lambda item: item['cell'])
+
+
+def backfill_geohashes(batch_size=1000):
+    """Set geohash on fields whose coordinates have no (or a stale) geohash; returns rows updated"""
+    statement = update(Field.__table__).where(Field.__table__.c.id == bindparam('field_id')).values(
+        geohash=bindparam('new_geohash'),
+        updated_at=Field.__table__.c.updated_at  # not a user edit
+    )
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Field.id, Field.latitude, Field.longitude, Field.geohash).filter(
+            Field.id > last_id, Field.latitude.isnot(None), Field.longitude.isnot(None)
+        ).order_by(Field.id).limit(batch_size).all()
+        if not rows:
+            break
+        changes = []
+        for row in rows:
+            geohash = encode(float(row.latitude), float(row.longitude))
+            if row.geohash != geohash:
+                changes.append({'field_id': row.id, 'new_geohash': geohash})
+        if changes:
+            db.session.execute(statement, changes)
+            db.session.commit()
+            updated += len(changes)
+        last_id = rows[-1].id
+    return updated
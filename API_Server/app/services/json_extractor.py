@@ -0,0 +1,120 @@
+import json
+import re
+
+_COMPLETE_LITERAL = re.compile(r'true|false|null|-?\d+(\.\d+)?([eE][+-]?\d+)?')
+_TRAILING_LITERAL = re.compile(r'[A-Za-z0-9.+\-]+$')
+_CLOSERS = {'{': '}', '[': ']'}
+_decoder = json.JSONDecoder()
+
+
+def extract_json(text):
+    """
+    Extract the first JSON object or array from model output in a single pass.
+    Tolerates prose and code fences around the JSON, trailing commas and
+    truncated output (open strings, dangling keys and unclosed brackets are repaired).
+    Returns the parsed value, or None if nothing usable is found.
+    """
+    if not text:
+        return None
+
+    start = -1
+    for i, char in enumerate(text):
+        if char == '{' or char == '[':
+            start = i
+            break
+    if start < 0:
+        return None
+
+    # Fast path: well-formed JSON (structured output) decodes without the repair scan
+    try:
+        return _decoder.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
+
+    out = []
+    stack = []
+    in_string = False
+    escaped = False
+    expect_key = False   # inside an object, waiting for the next key
+    key_start = None     # output index of a key that has not seen its ':' yet
+
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            if stack and stack[-1] == '{' and expect_key:
+                key_start = len(out)
+                expect_key = False
+            in_string = True
+            out.append(char)
+        elif char == '{' or char == '[':
+            stack.append(char)
+            expect_key = char == '{'
+            out.append(char)
+        elif char == '}' or char == ']':
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(char)
+            expect_key = False
+            if not stack:
+                break
+        elif char == ',':
+            out.append(char)
+            expect_key = bool(stack) and stack[-1] == '{'
+        elif char == ':':
+            out.append(char)
+            key_start = None
+        elif char in '\n\r\t':
+            out.append(' ')
+        else:
+            out.append(char)
+
+    if stack:
+        _repair_truncation(out, in_string, escaped, key_start)
+        out.extend(_CLOSERS[opener] for opener in reversed(stack))
+
+    try:
+        return json.loads(''.join(out))
+    except json.JSONDecodeError:
+        return None
+
+
+def _drop_trailing_comma(out):
+    i = len(out) - 1
+    while i >= 0 and out[i] == ' ':
+        i -= 1
+    if i >= 0 and out[i] == ',':
+        del out[i:]
+
+
+def _repair_truncation(out, in_string, escaped, key_start):
+    """Make a truncated prefix closable: finish strings, drop dangling keys and partial literals"""
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+
+    if key_start is not None:
+        # Object key without ':' - drop it
+        del out[key_start:]
+
+    tail = ''.join(out).rstrip()
+    literal = _TRAILING_LITERAL.search(tail)
+    if literal and not _COMPLETE_LITERAL.fullmatch(literal.group(0)):
+        tail = tail[:literal.start()].rstrip()
+
+    if tail.endswith(':'):
+        tail += ' null'
+    elif tail.endswith(','):
+        tail = tail[:-1]
+
+    out[:] = [tail]
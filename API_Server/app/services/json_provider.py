@@ -0,0 +1,77 @@
+import dataclasses
+import decimal
+import os
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback, same output for the types the API returns
+    orjson = None
+
+# fast (orjson when installed) | stdlib (Flask's json-based provider with ISO dates)
+JSON_ENCODER = os.getenv('JSON_ENCODER', 'fast').lower()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson: serializes dicts several times faster than the stdlib
+    encoder and writes date/datetime/time natively as ISO 8601, so handlers can return model dates
+    as is. Falls back to the stdlib encoder (with the same ISO date handling) when orjson is not
+    installed or a value is outside what orjson supports (e.g. integers over 64 bits).
+    """
+
+    use_orjson = orjson is not None and JSON_ENCODER == 'fast'
+    ensure_ascii = False  # UTF-8 like orjson: Hindi / Kannada text is not inflated to \uXXXX escapes
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (date, datetime, time)):
+            return o.isoformat()
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return dataclasses.asdict(o)
+        if hasattr(o, '__html__'):
+            return str(o.__html__())
+        if hasattr(o, 'tolist'):  # numpy scalars and arrays
+            return o.tolist()
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=False):
+        """UTF-8 JSON bytes for obj"""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._options(indent))
+            except TypeError:
+                pass
+        return super().dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return self.dumps_bytes(obj).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # Let the stdlib raise its usual error (and accept NaN / Infinity like before)
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
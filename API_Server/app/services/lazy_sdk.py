@@ -0,0 +1,45 @@
+import threading
+import time
+
+
+class LazySDK:
+    """
+    A heavy SDK imported and initialized on first use instead of at app import. The loader runs
+    once, under a lock, from whichever request thread needs the SDK first; its return value is
+    cached, and a failure (missing package, bad credentials) is cached as unavailable.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+        self.load_ms = None
+
+    def get(self):
+        """The loader's result, or None when the SDK is unavailable"""
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                try:
+                    self._value = self._loader()
+                except Exception as e:  # ImportError, auth errors, ...
+                    print(f"⚠️ {self.name} not available: {e}")
+                    self._value = None
+                self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+                if self._value is not None:
+                    print(f"✅ {self.name} loaded in {self.load_ms:.0f} ms")
+                self._loaded = True
+        return self._value
+
+    @property
+    def available(self):
+        return self.get() is not None
+
+    @property
+    def loaded(self):
+        """Whether the loader has run (without triggering it)"""
+        return self._loaded
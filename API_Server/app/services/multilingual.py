@@ -0,0 +1,147 @@
+import json
+import os
+from functools import lru_cache
+
+from app.services.text_analysis import analyze, normalize_text
+
+AGRI_SYNONYMS_PATH = os.getenv(
+    'AGRI_SYNONYMS_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'agri_synonyms.json')
+)
+MIN_PREFIX_LENGTH = 4  # inflected words ("किसानों", "fasalon") match a dictionary word they start with
+MAX_SUFFIX_LENGTH = 4
+MIN_PHONETIC_LENGTH = 4  # shorter romanized words are too often English ("bad", "pal")
+MIN_KEY_LENGTH = 3
+
+# The Brahmic blocks (Devanagari 0x0900 ... Malayalam 0x0D00) share one 128-code-point layout,
+# so a single table of offsets from the block start romanizes all of them
+_CONSONANTS = dict(zip(range(0x15, 0x3A), [
+    'k', 'kh', 'g', 'gh', 'n', 'ch', 'chh', 'j', 'jh', 'n',
+    't', 'th', 'd', 'dh', 'n', 't', 'th', 'd', 'dh', 'n',
+    'n', 'p', 'ph', 'b', 'bh', 'm', 'y', 'r', 'r', 'l',
+    'l', 'l', 'v', 'sh', 'sh', 's', 'h',
+]))
+_CONSONANTS.update({0x58: 'k', 0x59: 'kh', 0x5A: 'g', 0x5B: 'j', 0x5C: 'r', 0x5D: 'rh', 0x5E: 'f', 0x5F: 'y'})
+_VOWEL_SIGNS = dict(zip(range(0x3E, 0x4D), [
+    'aa', 'i', 'ii', 'u', 'uu', 'ri', 'rii', 'e', 'e', 'e', 'ai', 'o', 'o', 'o', 'au',
+]))
+_VOWEL_SIGNS.update({0x62: 'li', 0x63: 'lii'})
+_VOWELS = dict(zip(range(0x04, 0x15), [
+    'a', 'a', 'aa', 'i', 'ii', 'u', 'uu', 'ri', 'li', 'e', 'e', 'e', 'ai', 'o', 'o', 'o', 'au',
+]))
+_VOWELS.update({0x01: 'n', 0x02: 'n', 0x03: 'h', 0x60: 'rii', 0x61: 'lii', 0x72: 'i', 0x73: 'u'})
+_VOWELS.update({offset: str(offset - 0x66) for offset in range(0x66, 0x70)})
+_VIRAMA = 0x4D
+# Malayalam chillus: consonants that never carry a vowel
+_CHILLUS = {0x0D54: 'm', 0x0D55: 'y', 0x0D56: 'l', 0x0D7A: 'n', 0x0D7B: 'n', 0x0D7C: 'r',
+            0x0D7D: 'l', 0x0D7E: 'l', 0x0D7F: 'k', 0x0D4E: 'r'}
+
+
+@lru_cache(maxsize=16384)
+def transliterate(word):
+    """Rough romanization of Indic-script text ('बाढ़' -> 'baadha', 'ಪ್ರವಾಹ' -> 'pravaaha')"""
+    out = []
+    pending = False  # last letter was a consonant still carrying its inherent 'a'
+    for char in word:
+        code = ord(char)
+        offset = (code - 0x0900) % 0x80
+        if code in _CHILLUS or not 0x0900 <= code < 0x0D80:
+            sound = _CHILLUS.get(code, char)
+        elif offset in _CONSONANTS:
+            if pending:
+                out.append('a')
+            out.append(_CONSONANTS[offset])
+            pending = True
+            continue
+        elif offset in _VOWEL_SIGNS:
+            out.append(_VOWEL_SIGNS[offset])
+            pending = False
+            continue
+        elif offset == _VIRAMA:
+            pending = False
+            continue
+        else:
+            sound = _VOWELS.get(offset, '')
+        if pending:
+            out.append('a')
+            pending = False
+        out.append(sound)
+    if pending:
+        out.append('a')
+    return ''.join(out)
+
+
+_PHONETIC_FOLDS = (('ee', 'i'), ('oo', 'u'), ('ph', 'f'), ('w', 'v'), ('z', 'j'), ('q', 'k'), ('x', 'ks'), ('sh', 's'))
+
+
+@lru_cache(maxsize=16384)
+def phonetic_key(word):
+    """
+    Spelling-insensitive key of a romanized word: aspiration, vowel length and doubled letters
+    are dropped, so 'baadh', 'badh' and transliterated 'बाढ़' all become 'bad'.
+    """
+    word = ''.join(char for char in word.lower() if 'a' <= char <= 'z')
+    for spelling, sound in _PHONETIC_FOLDS:
+        word = word.replace(spelling, sound)
+    key = []
+    for char in word:
+        if char == 'h' and key and key[-1] in 'bcdgjkprt':
+            continue
+        if key and key[-1] == char:
+            continue
+        key.append(char)
+    key = ''.join(key)
+    return key[:-1] if len(key) > 2 and key.endswith('a') else key
+
+
+class SynonymDictionary:
+    """
+    Agricultural concepts with their English index terms and their words in the tutorial
+    languages, native script and romanized. Query words resolve to concepts by exact form,
+    by a dictionary word they inflect, then by phonetic key (transliterated if in Indic script).
+    """
+
+    def __init__(self, concepts):
+        self.terms = {}  # concept -> English index terms
+        self.forms = {}  # normalized native/romanized word -> concepts
+        self.keys = {}  # phonetic key -> concepts
+        for concept, words in concepts.items():
+            self.terms[concept] = list(dict.fromkeys(analyze(' '.join(words['en']))))
+            for language, forms in words.items():
+                if language == 'en':
+                    continue
+                for form in forms:
+                    form = normalize_text(form)
+                    self._add(self.forms.setdefault(form, []), concept)
+                    key = phonetic_key(form if form.isascii() else transliterate(form))
+                    if len(key) >= MIN_KEY_LENGTH:
+                        self._add(self.keys.setdefault(key, []), concept)
+        # Keys shared by different concepts (ಬರ drought / barh flood) only resolve by exact form
+        for key in [key for key, found in self.keys.items() if len(found) > 1]:
+            del self.keys[key]
+
+    @staticmethod
+    def _add(concepts, concept):
+        if concept not in concepts:
+            concepts.append(concept)
+
+    @classmethod
+    def from_file(cls, path=AGRI_SYNONYMS_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['concepts'])
+
+    def concepts(self, token, fuzzy=True):
+        """Concepts a normalized query token refers to ([] when none); fuzzy adds prefix and phonetic matches"""
+        if token in self.forms:
+            return self.forms[token]
+        if not fuzzy:
+            return []
+        for length in range(len(token) - 1, max(MIN_PREFIX_LENGTH, len(token) - MAX_SUFFIX_LENGTH) - 1, -1):
+            if token[:length] in self.forms:
+                return self.forms[token[:length]]
+        if token.isascii() and len(token) < MIN_PHONETIC_LENGTH:
+            return []
+        return self.keys.get(phonetic_key(token if token.isascii() else transliterate(token)), [])
+
+
+synonyms = SynonymDictionary.from_file()
@@ -0,0 +1,281 @@
+import bisect
+import csv
+import json
+import os
+import re
+import struct
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import bindparam, or_, update
+
+from app.extensions import db
+from app.models import Field
+from app.services.geo_index import encode
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+PINCODE_SEED_PATH = os.path.join(DATA_DIR, 'pincode_seed.csv')
+PINCODE_GAZETTEER_PATH = os.getenv('PINCODE_GAZETTEER_PATH', os.path.join(DATA_DIR, 'pincode_gazetteer.bin'))
+# Coarsest match used to place a field: pincode | district
+PINCODE_MIN_PRECISION = os.getenv('PINCODE_MIN_PRECISION', 'district')
+
+# File layout: header, then keys (uint32), latitudes and longitudes (float32),
+# district and state name indexes (uint16), all sorted by key, then a JSON list of names
+MAGIC = b'PINGAZ01'
+HEADER = struct.Struct('<8sII')  # magic, entries, names length in bytes
+# A key is the PIN (prefix) zero-padded to 6 digits * 10 + level, so prefix entries sort next to their PINs
+LEVELS = {6: 0, 3: 1, 2: 2}
+PRECISIONS = {6: 'pincode', 3: 'district', 2: 'circle'}
+PRECISION_RANK = {'pincode': 0, 'district': 1, 'circle': 2}
+INDIA_BOUNDS = (6.0, 68.0, 37.5, 97.5)  # office coordinates outside these are data-entry errors
+
+PIN_PATTERN = re.compile(r'(?<!\d)([1-9]\d{2})\s?(\d{3})(?!\d)')
+CSV_COLUMNS = {
+    'pincode': ('pincode', 'pin_code', 'pin'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lon', 'lng'),
+    'district': ('district', 'districtname'),
+    'state': ('state', 'statename'),
+}
+
+
+def normalize_pin(pin_code):
+    """6-digit PIN code found in a value ('411001', '411 001', 'Pune 411001'), or None"""
+    if isinstance(pin_code, str) and len(pin_code) == 6 and pin_code.isdigit() and pin_code[0] != '0':
+        return pin_code
+    match = PIN_PATTERN.search(str(pin_code or ''))
+    return match.group(1) + match.group(2) if match else None
+
+
+def _key(digits):
+    return int(digits.ljust(6, '0')) * 10 + LEVELS[len(digits)]
+
+
+def _view(array, dtype, fmt):
+    return memoryview(np.ascontiguousarray(array, dtype=dtype)).cast('B').cast(fmt)
+
+
+class PincodeGazetteer:
+    """
+    Offline PIN code -> centroid lookup over sorted key arrays (memory-mapped when loaded from
+    the compiled file). Unknown PINs fall back to their sorting-district (first 3 digits) and
+    postal-circle (first 2 digits) centroids; results report which precision matched.
+    """
+
+    def __init__(self, keys, latitudes, longitudes, districts, states, names):
+        self.keys = keys
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.districts = districts
+        self.states = states
+        self.names = names
+        # Native-order views over the same buffers: bisect and indexing on them return plain
+        # Python numbers, avoiding numpy call overhead on the single-lookup path
+        self._keys = _view(keys, '=u4', 'I')
+        self._latitudes = _view(latitudes, '=f4', 'f')
+        self._longitudes = _view(longitudes, '=f4', 'f')
+        self._districts = _view(districts, '=u2', 'H')
+        self._states = _view(states, '=u2', 'H')
+
+    @classmethod
+    def from_file(cls, path=PINCODE_GAZETTEER_PATH):
+        with open(path, 'rb') as f:
+            magic, count, names_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a PIN code gazetteer')
+            f.seek(HEADER.size + count * 16)
+            names = json.loads(f.read(names_length).decode('utf-8'))
+
+        arrays, offset = [], HEADER.size
+        for dtype in ('<u4', '<f4', '<f4', '<u2', '<u2'):
+            arrays.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,)))
+            offset += count * np.dtype(dtype).itemsize
+        return cls(*arrays, names)
+
+    @classmethod
+    def from_csv(cls, paths):
+        return cls(*_compile(_read_csv_rows(paths)))
+
+    @classmethod
+    def load(cls, path=PINCODE_GAZETTEER_PATH):
+        """The compiled gazetteer if present, else the bundled seed (district and circle centroids)"""
+        if os.path.exists(path):
+            return cls.from_file(path)
+        return cls.from_csv([PINCODE_SEED_PATH])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, pin_code):
+        """{'pin_code', 'latitude', 'longitude', 'precision', 'district', 'state'} or None"""
+        pin = normalize_pin(pin_code)
+        if not pin:
+            return None
+        # The PIN, then its sorting district, then its circle; finest match wins
+        for digits in (6, 3, 2):
+            key = _key(pin[:digits])
+            i = bisect.bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                return {
+                    'pin_code': pin,
+                    'latitude': round(self._latitudes[i], 5),
+                    'longitude': round(self._longitudes[i], 5),
+                    'precision': PRECISIONS[digits],
+                    'district': self.names[self._districts[i]] or None,
+                    'state': self.names[self._states[i]] or None
+                }
+        return None
+
+    def coverage(self):
+        """Entries per precision"""
+        levels = np.asarray(self.keys) % 10
+        return {PRECISIONS[digits]: int((levels == level).sum()) for digits, level in LEVELS.items()}
+
+    def write(self, path=PINCODE_GAZETTEER_PATH):
+        names = json.dumps(self.names, ensure_ascii=False).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self.keys), len(names)))
+            for array, dtype in ((self.keys, '<u4'), (self.latitudes, '<f4'), (self.longitudes, '<f4'),
+                                 (self.districts, '<u2'), (self.states, '<u2')):
+                f.write(np.asarray(array, dtype=dtype).tobytes())
+            f.write(names)
+
+
+def _read_csv_rows(paths):
+    """(pin or prefix, latitude, longitude, district, state) from the seed or India Post directory CSVs"""
+    for path in paths:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            header = {name.strip().lower(): name for name in reader.fieldnames or []}
+            columns = {}
+            for column, aliases in CSV_COLUMNS.items():
+                columns[column] = next((header[alias] for alias in aliases if alias in header), None)
+            if not all(columns[column] for column in ('pincode', 'latitude', 'longitude')):
+                raise ValueError(f'{path} needs pincode, latitude and longitude columns')
+
+            for row in reader:
+                pin = (row[columns['pincode']] or '').strip()
+                try:
+                    latitude, longitude = float(row[columns['latitude']]), float(row[columns['longitude']])
+                except (TypeError, ValueError):
+                    continue
+                if len(pin) not in LEVELS or not pin.isdigit() or pin[0] == '0':
+                    continue
+                if not (INDIA_BOUNDS[0] <= latitude <= INDIA_BOUNDS[2] and INDIA_BOUNDS[1] <= longitude <= INDIA_BOUNDS[3]):
+                    continue
+                district = (row[columns['district']] or '').strip().title() if columns['district'] else ''
+                state = (row[columns['state']] or '').strip().title() if columns['state'] else ''
+                yield pin, latitude, longitude, district, state
+
+
+def _compile(rows):
+    """
+    Sorted gazetteer arrays. Post offices sharing a PIN are averaged into its centroid; district
+    and circle centroids are averaged from PIN centroids where the source has them, otherwise
+    taken from explicit prefix rows (the seed).
+    """
+    offices = {}
+    for pin, latitude, longitude, district, state in rows:
+        offices.setdefault(pin, []).append((latitude, longitude, district, state))
+
+    entries = {}
+    for pin, places in offices.items():
+        latitude = sum(place[0] for place in places) / len(places)
+        longitude = sum(place[1] for place in places) / len(places)
+        district = Counter(place[2] for place in places).most_common(1)[0][0]
+        state = Counter(place[3] for place in places).most_common(1)[0][0]
+        entries[pin] = (latitude, longitude, district, state)
+
+    pins = [pin for pin in entries if len(pin) == 6]
+    for digits in (3, 2):
+        groups = {}
+        for pin in pins:
+            groups.setdefault(pin[:digits], []).append(entries[pin])
+        for prefix, places in groups.items():
+            entries[prefix] = (
+                sum(place[0] for place in places) / len(places),
+                sum(place[1] for place in places) / len(places),
+                Counter(place[2] for place in places).most_common(1)[0][0] if digits == 3 else '',
+                Counter(place[3] for place in places).most_common(1)[0][0]
+            )
+
+    names = ['']
+    name_index = {'': 0}
+
+    def index(name):
+        if name not in name_index:
+            name_index[name] = len(names)
+            names.append(name)
+        return name_index[name]
+
+    ordered = sorted(entries.items(), key=lambda item: _key(item[0]))
+    return (
+        np.array([_key(pin) for pin, _ in ordered], dtype=np.uint32),
+        np.array([entry[0] for _, entry in ordered], dtype=np.float32),
+        np.array([entry[1] for _, entry in ordered], dtype=np.float32),
+        np.array([index(entry[2]) for _, entry in ordered], dtype=np.uint16),
+        np.array([index(entry[3]) for _, entry in ordered], dtype=np.uint16),
+        names
+    )
+
+
+def build_gazetteer(csv_paths, path=PINCODE_GAZETTEER_PATH):
+    """Compile CSVs (e.g. the India Post all-India PIN code directory) plus the seed into the gazetteer file"""
+    built = PincodeGazetteer.from_csv([PINCODE_SEED_PATH, *csv_paths])
+    built.write(path)
+    return built.coverage()
+
+
+def geocode_field(field):
+    """Place a field without coordinates at its PIN code centroid; True if coordinates were set"""
+    if field.latitude is not None and field.longitude is not None:
+        field.coordinates_source = field.coordinates_source or 'gps'
+        return False
+    place = gazetteer.lookup(field.pin_code)
+    if not place or PRECISION_RANK[place['precision']] > PRECISION_RANK[PINCODE_MIN_PRECISION]:
+        return False
+    field.latitude, field.longitude = place['latitude'], place['longitude']
+    field.coordinates_source = 'pincode'
+    return True
+
+
+def backfill_field_coordinates(batch_size=1000):
+    """
+    Geocode fields without coordinates, and refresh ones placed from a PIN code (the gazetteer may
+    have been rebuilt at a finer precision). Returns the number of fields updated.
+    """
+    table = Field.__table__
+    statement = update(table).where(table.c.id == bindparam('field_id')).values(
+        latitude=bindparam('new_latitude'),
+        longitude=bindparam('new_longitude'),
+        geohash=bindparam('new_geohash'),
+        coordinates_source='pincode',
+        updated_at=table.c.updated_at  # not a user edit
+    )
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Field.id, Field.pin_code, Field.latitude, Field.longitude).filter(
+            Field.id > last_id,
+            or_(Field.latitude.is_(None), Field.longitude.is_(None), Field.coordinates_source == 'pincode')
+        ).order_by(Field.id).limit(batch_size).all()
+        if not rows:
+            break
+        changes = []
+        for row in rows:
+            place = gazetteer.lookup(row.pin_code)
+            if not place or PRECISION_RANK[place['precision']] > PRECISION_RANK[PINCODE_MIN_PRECISION]:
+                continue
+            if (row.latitude, row.longitude) != (place['latitude'], place['longitude']):
+                changes.append({'field_id': row.id, 'new_latitude': place['latitude'],
+                                'new_longitude': place['longitude'],
+                                'new_geohash': encode(place['latitude'], place['longitude'])})
+        if changes:
+            db.session.execute(statement, changes)
+            db.session.commit()
+            updated += len(changes)
+        last_id = rows[-1].id
+    return updated
+
+
+gazetteer = PincodeGazetteer.load()
@@ -0,0 +1,261 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Router configuration (seconds unless noted)
+AI_LATENCY_BUDGET = float(os.getenv('AI_LATENCY_BUDGET_SECONDS', 30))
+AI_HEDGE_DELAY = float(os.getenv('AI_HEDGE_DELAY_SECONDS', 0))  # 0 disables hedging
+AI_ROUTER_MAX_WORKERS = int(os.getenv('AI_ROUTER_MAX_WORKERS', 16))
+
+BREAKER_WINDOW = int(os.getenv('AI_BREAKER_WINDOW', 20))
+BREAKER_MIN_CALLS = int(os.getenv('AI_BREAKER_MIN_CALLS', 5))
+BREAKER_ERROR_RATE = float(os.getenv('AI_BREAKER_ERROR_RATE', 0.5))
+BREAKER_P95_SECONDS = float(os.getenv('AI_BREAKER_P95_SECONDS', 20))
+BREAKER_COOLDOWN = float(os.getenv('AI_BREAKER_COOLDOWN_SECONDS', 30))
+
+
+class CircuitBreaker:
+    """Per-provider breaker tripping on error rate or p95 latency over a sliding window"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS,
+                 error_rate_threshold=BREAKER_ERROR_RATE, p95_threshold=BREAKER_P95_SECONDS,
+                 cooldown=BREAKER_COOLDOWN):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.p95_threshold = p95_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.trip_reason = None
+        self.total_calls = 0
+        self.total_failures = 0
+        self._outcomes = deque(maxlen=window)  # (latency_seconds, ok)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may be sent to this provider right now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency):
+        with self._lock:
+            self.total_calls += 1
+            self._outcomes.append((latency, True))
+            if self.state == self.HALF_OPEN:
+                self._close()
+            else:
+                self._evaluate()
+
+    def record_failure(self, latency):
+        with self._lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self._outcomes.append((latency, False))
+            if self.state == self.HALF_OPEN:
+                self._open('probe failed')
+            else:
+                self._evaluate()
+
+    def _evaluate(self):
+        if self.state != self.CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        error_rate = self._error_rate()
+        if error_rate >= self.error_rate_threshold:
+            self._open(f'error rate {error_rate:.0%}')
+            return
+        p95 = self._p95()
+        if self.p95_threshold and p95 >= self.p95_threshold:
+            self._open(f'p95 latency {p95:.1f}s')
+
+    def _open(self, reason):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trip_reason = reason
+        self._probe_in_flight = False
+        print(f"🔌 Circuit opened for {self.name}: {reason}")
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.trip_reason = None
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        print(f"✅ Circuit closed for {self.name}")
+
+    def _error_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def _p95(self):
+        if not self._outcomes:
+            return 0.0
+        latencies = sorted(latency for latency, _ in self._outcomes)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'trip_reason': self.trip_reason,
+                'error_rate': round(self._error_rate(), 3),
+                'p95_latency_ms': round(self._p95() * 1000, 1),
+                'window_calls': len(self._outcomes),
+                'total_calls': self.total_calls,
+                'total_failures': self.total_failures,
+            }
+
+
+class _Attempt:
+    """A single in-flight provider call; records its outcome exactly once"""
+
+    def __init__(self, name, breaker):
+        self.name = name
+        self.breaker = breaker
+        self.started = time.monotonic()
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    def _claim(self):
+        with self._lock:
+            if self._recorded:
+                return False
+            self._recorded = True
+            return True
+
+    def finish(self, future):
+        if not self._claim():
+            return
+        latency = time.monotonic() - self.started
+        if future.exception() is None:
+            self.breaker.record_success(latency)
+        else:
+            self.breaker.record_failure(latency)
+
+    def expire(self):
+        if self._claim():
+            self.breaker.record_failure(time.monotonic() - self.started)
+
+
+class ProviderRouter:
+    """Routes a call across ordered providers under a latency budget with failover and hedging"""
+
+    def __init__(self, budget=AI_LATENCY_BUDGET, hedge_delay=AI_HEDGE_DELAY, max_workers=AI_ROUTER_MAX_WORKERS):
+        self.budget = budget
+        self.hedge_delay = hedge_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-provider')
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, name):
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def _count(self, operation, key):
+        with self._lock:
+            stats = self._stats.setdefault(operation, {'calls': 0, 'served': 0, 'failovers': 0,
+                                                       'hedges': 0, 'timeouts': 0, 'fallbacks': 0})
+            stats[key] += 1
+
+    def route(self, operation, providers, fallback, args=(), budget=None):
+        """
+        Call providers (list of (name, callable)) in order until one succeeds.
+        Returns fallback() when every provider fails or the budget runs out.
+        """
+        budget = self.budget if budget is None else budget
+        deadline = time.monotonic() + budget
+        queue = list(providers)
+        pending = {}
+        last_launch = None
+        self._count(operation, 'calls')
+
+        def launch_next():
+            while queue:
+                name, func = queue.pop(0)
+                breaker = self.breaker(name)
+                if not breaker.allow():
+                    print(f"⛔ Skipping {name} for {operation}: circuit {breaker.state}")
+                    continue
+                attempt = _Attempt(name, breaker)
+                # Run in a copy of the caller's context so per-request tags (e.g. AI usage) follow the call
+                future = self._executor.submit(contextvars.copy_context().run, func, *args)
+                future.add_done_callback(attempt.finish)
+                pending[future] = attempt
+                return True
+            return False
+
+        if launch_next():
+            last_launch = time.monotonic()
+
+        while pending:
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+
+            hedge_at = last_launch + self.hedge_delay if self.hedge_delay and queue else None
+            timeout = remaining if hedge_at is None else max(0.0, min(remaining, hedge_at - now))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if hedge_at is not None and time.monotonic() >= hedge_at and launch_next():
+                    print(f"🏁 Hedging {operation} with {list(pending.values())[-1].name}")
+                    self._count(operation, 'hedges')
+                    last_launch = time.monotonic()
+                continue
+
+            for future in done:
+                attempt = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    self._count(operation, 'served')
+                    return future.result()
+                print(f"❌ {attempt.name} failed for {operation}: {error}")
+
+            if not pending:
+                if launch_next():
+                    self._count(operation, 'failovers')
+                    last_launch = time.monotonic()
+
+        if pending:
+            print(f"⏱️ Latency budget of {budget}s exhausted for {operation}")
+            self._count(operation, 'timeouts')
+            for attempt in pending.values():
+                attempt.expire()
+
+        self._count(operation, 'fallbacks')
+        return fallback()
+
+    def snapshot(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+            stats = {operation: dict(values) for operation, values in self._stats.items()}
+        return {
+            'latency_budget_seconds': self.budget,
+            'hedge_delay_seconds': self.hedge_delay,
+            'providers': {name: breaker.snapshot() for name, breaker in breakers.items()},
+            'operations': stats,
+        }
+
+
+ai_router = ProviderRouter()
@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from string import Template
+
+# Provider selection: each service reads its own env var and falls back to PROVIDER_MODE
+PROVIDER_MODE = os.getenv('PROVIDER_MODE', '').lower()
+
+REPLAY_DATA_DIR = os.getenv(
+    'REPLAY_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'replay')
+)
+REPLAY_LATENCY = os.getenv('REPLAY_LATENCY', 'fixed:0')  # fixed:ms | uniform:lo,hi | normal:mean,sd | lognormal:median,sigma
+REPLAY_ERROR_RATE = float(os.getenv('REPLAY_ERROR_RATE', 0))
+REPLAY_SEED = int(os.getenv('REPLAY_SEED', 42))
+
+
+def get_provider_mode(env_var, default):
+    """Provider selected for a service, e.g. get_provider_mode('WEATHER_PROVIDER', 'openweathermap')"""
+    return (os.getenv(env_var) or PROVIDER_MODE or default).lower()
+
+
+class ReplayError(RuntimeError):
+    """Raised by the replay provider for injected failures"""
+
+
+class ReplayProvider:
+    """
+    Offline provider returning recorded or templated responses per channel.
+    Recordings live in REPLAY_DATA_DIR/<channel>.json as a list of responses; string values may
+    use $placeholders filled from the request context. The recording is picked by a stable hash
+    of the request key, so the same request always replays the same response.
+    """
+
+    def __init__(self, data_dir=REPLAY_DATA_DIR, latency=REPLAY_LATENCY, error_rate=REPLAY_ERROR_RATE, seed=REPLAY_SEED):
+        self.data_dir = data_dir
+        self.latency_kind, self.latency_params = parse_latency_spec(latency)
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._recordings = {}
+        self._lock = threading.Lock()
+
+    def recordings(self, channel):
+        if channel not in self._recordings:
+            path = os.path.join(self.data_dir, f'{channel}.json')
+            with open(path, 'r') as f:
+                self._recordings[channel] = json.load(f)
+        return self._recordings[channel]
+
+    def sample_latency(self):
+        """Latency in seconds drawn from the configured distribution"""
+        params = self.latency_params
+        with self._lock:
+            if self.latency_kind == 'uniform':
+                ms = self._rng.uniform(params[0], params[1])
+            elif self.latency_kind == 'normal':
+                ms = self._rng.gauss(params[0], params[1])
+            elif self.latency_kind == 'lognormal':
+                ms = params[0] * self._rng.lognormvariate(0, params[1])
+            else:
+                ms = params[0]
+        return max(ms, 0) / 1000.0
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def respond(self, channel, key='', context=None):
+        """Replay a response for channel; sleeps for the sampled latency and may raise ReplayError"""
+        delay = self.sample_latency()
+        if delay:
+            time.sleep(delay)
+        if self.should_fail():
+            raise ReplayError(f'Injected replay failure for {channel}')
+
+        recordings = self.recordings(channel)
+        recording = recordings[zlib.crc32(str(key).encode('utf-8')) % len(recordings)]
+        return render_template(recording, context or {})
+
+
+def parse_latency_spec(spec):
+    """Parse 'kind:a,b' latency specs in milliseconds"""
+    kind, _, params = spec.partition(':')
+    kind = kind.strip().lower() or 'fixed'
+    values = [float(value) for value in params.split(',') if value.strip()] or [0.0]
+    if kind in ('uniform', 'normal', 'lognormal') and len(values) < 2:
+        raise ValueError(f'Latency spec {spec!r} needs two parameters')
+    return kind, values
+
+
+def render_template(value, context):
+    """Fill $placeholders in every string of a recorded response"""
+    if isinstance(value, str):
+        return Template(value).safe_substitute(context)
+    if isinstance(value, list):
+        return [render_template(item, context) for item in value]
+    if isinstance(value, dict):
+        return {k: render_template(v, context) for k, v in value.items()}
+    return value
+
+
+replay_provider = ReplayProvider()
@@ -0,0 +1,104 @@
+import re
+
+# Structured-output schemas (OpenAPI subset accepted by Gemini's response_schema)
+PLANT_ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'disease': {'type': 'string'},
+        'confidence': {'type': 'number'},
+        'recommendations': {'type': 'string'},
+        'prevention_tips': {'type': 'string'},
+        'severity': {'type': 'string', 'enum': ['none', 'mild', 'moderate', 'severe']},
+        'affected_parts': {'type': 'string'}
+    },
+    'required': ['disease', 'confidence', 'recommendations', 'prevention_tips', 'severity', 'affected_parts']
+}
+
+CROP_RECOMMENDATION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'crops': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'reason': {'type': 'string'},
+                    'expected_yield': {'type': 'string'}
+                },
+                'required': ['name']
+            }
+        },
+        'farming_tips': {'type': 'string'},
+        'best_practices': {'type': 'string'},
+        'market_insights': {'type': 'string'}
+    },
+    'required': ['crops', 'farming_tips', 'best_practices']
+}
+
+_NUMBER = re.compile(r'-?\d+(\.\d+)?')
+
+
+def as_text(value, separator='\n'):
+    """Flatten list/dict values the model sometimes returns for free-text fields"""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return separator.join(as_text(item, separator) for item in value if item is not None)
+    if isinstance(value, dict):
+        return separator.join(f'{k}: {as_text(v, separator)}' for k, v in value.items())
+    return str(value)
+
+
+def as_confidence(value):
+    """Confidence as a 0-100 float; accepts numbers, '85%' strings and 0-1 fractions"""
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        value = float(match.group(0)) if match else None
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    value = float(value)
+    if 0 < value <= 1:
+        value *= 100
+    return max(0.0, min(100.0, value))
+
+
+def normalize_plant_analysis(data):
+    """Validate a parsed plant analysis against PLANT_ANALYSIS_SCHEMA; returns None if unusable"""
+    if not isinstance(data, dict) or not data.get('disease'):
+        return None
+    severity = as_text(data.get('severity'))
+    return {
+        'disease': as_text(data.get('disease')),
+        'confidence': as_confidence(data.get('confidence')),
+        'recommendations': as_text(data.get('recommendations')),
+        'prevention_tips': as_text(data.get('prevention_tips')),
+        'severity': severity.strip().lower() if severity else None,
+        'affected_parts': as_text(data.get('affected_parts'), ', ')
+    }
+
+
+def normalize_crop_recommendations(data):
+    """Validate parsed crop recommendations against CROP_RECOMMENDATION_SCHEMA; returns None if unusable"""
+    if not isinstance(data, dict) or not isinstance(data.get('crops'), list):
+        return None
+
+    crops = []
+    for crop in data['crops']:
+        if isinstance(crop, str) and crop.strip():
+            crops.append({'name': crop.strip()})
+        elif isinstance(crop, dict) and crop.get('name'):
+            crops.append({
+                'name': as_text(crop['name']),
+                'reason': as_text(crop.get('reason')),
+                'expected_yield': as_text(crop.get('expected_yield'))
+            })
+    if not crops:
+        return None
+
+    return {
+        'crops': crops,
+        'farming_tips': as_text(data.get('farming_tips')),
+        'best_practices': as_text(data.get('best_practices')),
+        'market_insights': as_text(data.get('market_insights'))
+    }
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services.scheme_search import scheme_search
+
+# Facet name -> scheme field; listings filter the text facets by case-insensitive substring
+FACET_FIELDS = {
+    'state_central': 'state_central',
+    'category': 'scheme_category',
+    'status': 'status',
+    'launch_period': 'launch_year',
+}
+LAUNCH_PERIOD_YEARS = int(os.getenv('LAUNCH_PERIOD_YEARS', 5))
+
+
+def launch_period(year):
+    """Bucket label of a launch year ('2015-2019'), or None"""
+    if not year:
+        return None
+    start = year - year % LAUNCH_PERIOD_YEARS
+    return f'{start}-{start + LAUNCH_PERIOD_YEARS - 1}'
+
+
+class FacetIndex:
+    """
+    One bitset (a Python int, bit i = i-th scheme by id) per facet value over a catalog
+    snapshot. Filtering is AND/OR of bitsets and every facet count is a popcount, so a filtered
+    listing with counts for all facet values costs microseconds and no queries.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.all = (1 << len(rows)) - 1
+        self.values = {}  # facet -> {value: bitset}
+        for facet, field in FACET_FIELDS.items():
+            positions = {}
+            for i, row in enumerate(rows):
+                value = launch_period(row.get(field)) if facet == 'launch_period' else row.get(field)
+                if value:
+                    positions.setdefault(value, []).append(i)
+            self.values[facet] = {value: self._bitset(ids) for value, ids in positions.items()}
+        self._lowered = {facet: [(value.lower(), value) for value in values] for facet, values in self.values.items()}
+
+    def _bitset(self, ids):
+        flags = np.zeros(len(self.rows), dtype=bool)
+        flags[ids] = True
+        return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+    def __len__(self):
+        return len(self.rows)
+
+    def matching(self, facet, needle):
+        """Bitset of schemes whose facet value contains the text (the former ILIKE '%text%')"""
+        needle = needle.lower()
+        bits = 0
+        for lowered, value in self._lowered[facet]:
+            if needle in lowered:
+                bits |= self.values[facet][value]
+        return bits
+
+    def select(self, filters):
+        """{facet: bitset of matching schemes} for {facet: text} filters; a year selects its launch period"""
+        selected = {}
+        for facet, needle in filters.items():
+            if needle:
+                if facet == 'launch_period' and needle.isdigit():
+                    needle = launch_period(int(needle))
+                selected[facet] = self.matching(facet, needle)
+        return selected
+
+    def counts(self, selected, facet):
+        """
+        {value: count} for one facet under every filter except its own, so the UI can offer the
+        alternatives to the current choice; values with no schemes are left out
+        """
+        base = self.all
+        for other, bits in selected.items():
+            if other != facet:
+                base &= bits
+        counts = {value: (bits & base).bit_count() for value, bits in self.values[facet].items()}
+        return {value: count for value, count in counts.items() if count}
+
+    def listing(self, filters, limit=50, offset=0):
+        """(total, rows of the requested page, {facet: {value: count}}) for substring filters"""
+        selected = self.select(filters)
+        bits = self.all
+        for facet_bits in selected.values():
+            bits &= facet_bits
+        total = bits.bit_count()
+        page = []
+        if bits and offset < total:
+            flags = np.unpackbits(np.frombuffer(bits.to_bytes((len(self.rows) + 7) // 8, 'little'), dtype=np.uint8),
+                                  bitorder='little')
+            page = [self.rows[i] for i in np.flatnonzero(flags)[offset:offset + limit]]
+        return total, page, {facet: self.counts(selected, facet) for facet in FACET_FIELDS}
+
+    def stats(self, top_states=10):
+        """Catalog totals by category, state (top N), status and launch period"""
+        def ranked(facet):
+            return sorted(((value, bits.bit_count()) for value, bits in self.values[facet].items()),
+                          key=lambda item: (-item[1], item[0]))
+
+        periods = sorted((value, bits.bit_count()) for value, bits in self.values['launch_period'].items())
+
+        return {
+            'total_schemes': len(self.rows),
+            'by_category': [{'category': value, 'count': count} for value, count in ranked('category')],
+            'top_states': [{'state_central': value, 'count': count} for value, count in ranked('state_central')[:top_states]],
+            'by_status': [{'status': value, 'count': count} for value, count in ranked('status')],
+            'by_launch_period': [{'launch_period': value, 'count': count} for value, count in periods],
+        }
+
+
+class SchemeFacets:
+    """The FacetIndex over the scheme catalog, rebuilt whenever the scheme search index is"""
+
+    def __init__(self):
+        self._index = None
+        self._source = None
+        self._lock = threading.Lock()
+
+    def index(self):
+        """Up-to-date index (requires an app context)"""
+        source = scheme_search.index()
+        if source is not self._source:
+            with self._lock:
+                if source is not self._source:
+                    start = time.perf_counter()
+                    self._index = FacetIndex(source.rows)
+                    self._source = source
+                    print(f"🧮 Built facet bitsets over {len(source.rows)} schemes "
+                          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self._index
+
+
+scheme_facets = SchemeFacets()
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from app.services.scheme_search import scheme_search, crisis_search, expand_query
+from app.services.text_analysis import analyze
+
+# Descriptive fields embedded for "describe your situation" queries
+SEMANTIC_SCHEME_FIELDS = ('objective', 'target_beneficiaries')
+SEMANTIC_CRISIS_FIELDS = ('purpose', 'coverage')
+# Latent dimensions kept from the SVD (capped by the catalog size)
+SEMANTIC_DIMENSIONS = int(os.getenv('SEMANTIC_DIMENSIONS', 128))
+# Cosine similarity below which a scheme is not returned
+SEMANTIC_MIN_SIMILARITY = float(os.getenv('SEMANTIC_MIN_SIMILARITY', 0.2))
+SVD_OVERSAMPLING = 20
+SVD_POWER_ITERATIONS = 4  # the tail of a TF-IDF spectrum is flat; each pass sharpens it
+SPARSE_CHUNK = 1 << 12  # nonzeros per block in sparse x dense products
+
+
+def sparse_dot(indptr, indices, data, dense):
+    """
+    Compressed sparse rows (indptr, indices, data) times a dense matrix, in blocks of about
+    SPARSE_CHUNK nonzeros so the per-nonzero products stay small
+    """
+    out = np.zeros((len(indptr) - 1, dense.shape[1]), dtype=dense.dtype)
+    rows = np.flatnonzero(np.diff(indptr))
+    if not len(rows):
+        return out
+    starts = indptr[rows]
+    bounds = np.unique(np.searchsorted(starts, np.arange(0, indptr[-1], SPARSE_CHUNK)))
+    bounds = np.append(bounds[bounds < len(rows)], len(rows))
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        begin, end = starts[first], indptr[rows[last - 1] + 1]
+        products = data[begin:end, None] * dense[indices[begin:end]]
+        out[rows[first:last]] = np.add.reduceat(products, starts[first:last] - begin)
+    return out
+
+
+class SemanticIndex:
+    """
+    Latent semantic index over a catalog snapshot: sublinear TF-IDF over the analyzed text of the
+    descriptive fields, reduced by a randomized truncated SVD (NumPy only, computed locally).
+    Schemes are unit float32 vectors, so a query is folded into the same space through the term
+    matrix and ranked by cosine with one matrix-vector product. Similar wording ("worms eating
+    cotton", "pest attack on crops") lands close even without shared words.
+    """
+
+    def __init__(self, rows, fields):
+        self.rows = rows
+        self.vocabulary = {}
+        doc_ids, term_ids, counts = [], [], []
+        for i, row in enumerate(rows):
+            terms = Counter(term for field in fields for term in analyze(row.get(field)))
+            for term, count in terms.items():
+                doc_ids.append(i)
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+        doc_ids = np.array(doc_ids, dtype=np.int64)
+        term_ids = np.array(term_ids, dtype=np.int64)
+
+        frequencies = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(rows)) / (1 + frequencies)) + 1
+        weights = (1 + np.log(np.array(counts, dtype=np.float64))) * self.idf[term_ids]
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights ** 2, minlength=len(rows)))
+        if len(weights):
+            weights /= norms[doc_ids]
+        weights = weights.astype(np.float32)
+
+        # Both orientations of the sparse matrix: scheme-major rows and term-major rows
+        by_doc = (np.searchsorted(doc_ids, np.arange(len(rows) + 1)), term_ids, weights)
+        order = np.argsort(term_ids, kind='stable')
+        by_term = (np.searchsorted(term_ids[order], np.arange(len(self.vocabulary) + 1)), doc_ids[order],
+                   weights[order])
+
+        self.dimensions = min(SEMANTIC_DIMENSIONS, len(rows), len(self.vocabulary))
+        if self.dimensions:
+            vectors, self.term_vectors = self._svd(by_doc, by_term)
+            lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+            self.vectors = (vectors / np.where(lengths > 0, lengths, 1)).astype(np.float32)
+        else:
+            self.term_vectors = np.zeros((len(self.vocabulary), 0), dtype=np.float32)
+            self.vectors = np.zeros((len(rows), 0), dtype=np.float32)
+
+    def _svd(self, by_doc, by_term):
+        """(scheme vectors U*S, term vectors V) of the rank-k randomized SVD (Halko et al.)"""
+        size = min(self.dimensions + SVD_OVERSAMPLING, len(self.rows), len(self.vocabulary))
+        rng = np.random.default_rng(0)
+        basis = np.linalg.qr(sparse_dot(*by_doc, rng.standard_normal((len(self.vocabulary), size), dtype=np.float32)))[0]
+        for _ in range(SVD_POWER_ITERATIONS):
+            basis = np.linalg.qr(sparse_dot(*by_term, basis))[0]
+            basis = np.linalg.qr(sparse_dot(*by_doc, basis))[0]
+        projected = sparse_dot(*by_term, basis).T  # basis^T A, size x terms
+        u, s, vt = np.linalg.svd(projected, full_matrices=False)
+        k = self.dimensions
+        return (basis @ u[:, :k]) * s[:k], vt[:k].T
+
+    def __len__(self):
+        return len(self.rows)
+
+    def embed(self, terms):
+        """Unit vector of a query's index terms in the latent space (zeros when none are known)"""
+        ids = [self.vocabulary[term] for term in terms]
+        vector = (self.idf[ids, None] * self.term_vectors[ids]).sum(axis=0).astype(np.float32)
+        length = np.linalg.norm(vector)
+        return vector / length if length > 0 else vector
+
+    def search(self, query, limit=10, min_similarity=SEMANTIC_MIN_SIMILARITY):
+        """([(row, similarity)] best first, {query word: concepts}) for free text in any supported language"""
+        terms, expansions = expand_query(query, self.vocabulary)
+        if not terms or not self.dimensions:
+            return [], expansions
+        similarities = self.vectors @ self.embed(terms)
+        matched = np.flatnonzero(similarities >= min_similarity)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-similarities[matched], limit - 1)[:limit]]
+        top = matched[np.lexsort((matched, -similarities[matched]))]
+        return [(self.rows[i], float(similarities[i])) for i in top], expansions
+
+
+class SemanticSearch:
+    """The SemanticIndex over a catalog, rebuilt whenever its SchemeSearch index is"""
+
+    def __init__(self, source, fields):
+        self.source = source
+        self.fields = fields
+        self._index = None
+        self._source_index = None
+        self._lock = threading.Lock()
+
+    def index(self):
+        """Up-to-date index (requires an app context)"""
+        source = self.source.index()
+        if source is not self._source_index:
+            with self._lock:
+                if source is not self._source_index:
+                    start = time.perf_counter()
+                    self._index = SemanticIndex(source.rows, self.fields)
+                    self._source_index = source
+                    print(f"🧭 Embedded {len(source.rows)} {self.source.model.__tablename__} into "
+                          f"{self._index.dimensions} dimensions in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self._index
+
+    def search(self, query, limit=10):
+        """(query actually searched or None if unchanged, [(row, similarity)], {query word: concepts})"""
+        index = self.index()
+        results, expansions = index.search(query, limit)
+        if results:
+            return None, results, expansions
+        corrected = self.source.correct(query)  # "cotten" -> "cotton"
+        if not corrected:
+            return None, results, expansions
+        return (corrected,) + index.search(corrected, limit)
+
+
+scheme_semantic = SemanticSearch(scheme_search, SEMANTIC_SCHEME_FIELDS)
+crisis_semantic = SemanticSearch(crisis_search, SEMANTIC_CRISIS_FIELDS)
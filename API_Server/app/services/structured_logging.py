@@ -0,0 +1,218 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# Records below LOG_LEVEL are dropped before the message is built; route handlers log with
+# %-style arguments so a filtered call costs one level check
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()  # json (one object per line, Cloud Logging) | text
+# Share of requests whose INFO/DEBUG lines are kept; warnings and errors are always logged.
+# LOG_SAMPLE_RATES overrides it per endpoint, e.g. "farmer.get_dashboard=0.01,crops.list_crops=0.1"
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+LOG_SAMPLE_RATES = {
+    endpoint.strip(): float(rate)
+    for endpoint, rate in (item.split('=', 1) for item in os.getenv('LOG_SAMPLE_RATES', '').split(',') if '=' in item)
+}
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records waiting for the writer thread; more are dropped
+LOG_REDACT_PII = os.getenv('LOG_REDACT_PII', 'true').lower() == 'true'
+
+# Indian mobile numbers (optionally +91 / 0 prefixed) and e-mail addresses
+PHONE_PATTERN = re.compile(r'(?<![\w.])(?:\+?91[\s-]?|0)?([6-9]\d{9})(?![\w.])')
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@([\w-]+\.[\w.-]+)')
+# user:password@ in connection URIs, and password / token / secret / key values
+URI_CREDENTIALS_PATTERN = re.compile(r'(\w[\w+.-]*://)[^\s/:@]*(?::[^\s/@]*)?@')
+SECRET_PATTERN = re.compile(r'(?i)\b(password|passwd|pwd|secret|token|api_?key|appid)(["\']?\s*[:=]\s*["\']?)[^\s"\'&,;]+')
+
+# Attributes every LogRecord has; anything else was passed through extra= and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+_CONTEXT_ATTRIBUTES = ('endpoint', 'method', 'path', 'trace')
+
+
+def redact(text):
+    """
+    Mask credentials in URIs and key=value pairs, phone numbers (keeping the last two digits)
+    and the local part of e-mail addresses
+    """
+    if not LOG_REDACT_PII:
+        return text
+    text = URI_CREDENTIALS_PATTERN.sub(r'\1***@', text)
+    text = SECRET_PATTERN.sub(r'\1\2***', text)
+    text = PHONE_PATTERN.sub(lambda match: '********' + match.group(1)[-2:], text)
+    return EMAIL_PATTERN.sub(r'***@\1', text)
+
+
+def sample_rate(endpoint):
+    return LOG_SAMPLE_RATES.get(endpoint, LOG_SAMPLE_RATE)
+
+
+class LogStats:
+    """Records written, sampled out and dropped because the queue was full"""
+
+    def __init__(self):
+        self.written = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, handler=None):
+        with self._lock:
+            snapshot = {'written': self.written, 'sampled_out': self.sampled_out, 'dropped': self.dropped}
+        snapshot.update({
+            'level': LOG_LEVEL,
+            'format': LOG_FORMAT,
+            'sample_rate': LOG_SAMPLE_RATE,
+            'sample_rates': LOG_SAMPLE_RATES,
+            'redact_pii': LOG_REDACT_PII,
+            'queue_size': LOG_QUEUE_SIZE,
+            'queued': handler.queue.qsize() if handler is not None else None,
+        })
+        return snapshot
+
+
+log_stats = LogStats()
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Runs on the request thread: tags records with the route they came from and drops the
+    INFO/DEBUG records of requests outside the route's sample. The sampling decision is made
+    once per request, so a sampled request keeps all of its lines.
+    """
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        endpoint = request.endpoint
+        record.endpoint = endpoint
+        record.method = request.method
+        record.path = request.path
+        record.trace = request.headers.get('X-Cloud-Trace-Context', '').split('/', 1)[0] or None
+        if record.levelno >= logging.WARNING:
+            return True
+        sampled = g.get('log_sampled')
+        if sampled is None:
+            rate = sample_rate(endpoint)
+            sampled = g.log_sampled = rate >= 1 or random.random() < rate
+        if not sampled:
+            log_stats.count('sampled_out')
+        return sampled
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line with Cloud Logging's severity / message fields and the request context"""
+
+    def format(self, record):
+        entry = {
+            'severity': record.levelname,
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'logger': record.name,
+            'message': redact(record.getMessage()),
+        }
+        for name in _CONTEXT_ATTRIBUTES:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and name not in _CONTEXT_ATTRIBUTES:
+                entry[name] = redact(value) if isinstance(value, str) else value
+        if record.exc_info:
+            entry['exception'] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RedactingFormatter(logging.Formatter):
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hands records to a writer thread instead of writing stdout on the request thread. The
+    message is built by the writer, so pass arguments that are not modified after the call.
+    The writer thread is started once per worker process (on its first record after a fork).
+    When the queue is full the record is dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, target, maxsize=LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.target = target
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+
+    def stop(self):
+        """Write out queued records (called at exit)"""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                self._listener = None
+                self._pid = None
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        self.ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_stats.count('dropped')
+            return
+        log_stats.count('written')
+
+
+def build_handler():
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'json':
+        stream.setFormatter(StructuredFormatter())
+    else:
+        stream.setFormatter(RedactingFormatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    handler = BackgroundQueueHandler(stream)
+    handler.addFilter(RequestContextFilter())
+    return handler
+
+
+log_handler = None
+
+
+def init_logging(app):
+    """
+    Route the app's and the modules' loggers through one background handler at LOG_LEVEL.
+    Idempotent, so several apps in one process (tests, benchmarks) share the handler.
+    """
+    global log_handler
+    root = logging.getLogger()
+    if log_handler is None:
+        log_handler = build_handler()
+        root.addHandler(log_handler)
+        atexit.register(log_handler.stop)
+    root.setLevel(LOG_LEVEL)
+
+    # Records propagate to the root handler instead of Flask's synchronous stderr handler
+    from flask.logging import default_handler
+    app.logger.removeHandler(default_handler)
+    app.logger.setLevel(LOG_LEVEL)
@@ -0,0 +1,162 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# \w alone splits Indic words at every vowel sign and virama, so the Brahmic blocks (minus the
+# danda punctuation) and Arabic-script diacritics count as word characters too
+WORD_CHARS = r'\w\u0900-\u0963\u0966-\u0DFF\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED'
+TOKEN_PATTERN = re.compile(f'[{WORD_CHARS}]+')
+_WORD_CHAR = re.compile(f'[{WORD_CHARS}]')
+
+# Nuktas (ड़/ड, ज़/ज are spelled both ways), chandrabindu folded into anusvara, joiners dropped
+_NORMALIZE_TABLE = str.maketrans({
+    **{chr(0x093C + offset): None for offset in range(0, 0x400, 0x80)},
+    **{chr(0x0901 + offset): chr(0x0902 + offset) for offset in range(0, 0x400, 0x80)},
+    '\u0A70': '\u0A02', '\u0A71': None,  # Gurmukhi tippi -> bindi, addak (gemination) dropped
+    '\u200C': None, '\u200D': None,
+})
+
+STOPWORDS = frozenset('''
+a about above after all also an and any are as at be been being but by can could do does for from
+had has have he her his how i if in into is it its may more most no not of on or other our shall
+she should so such than that the their them then there these they this those through to under up
+upon us was we were what when where which while who whom will with within would you your
+'''.split())
+
+# Porter (1980) suffix rules, longest suffix first within each step
+_STEP2 = sorted([
+    ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'),
+    ('bli', 'ble'), ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous'),
+    ('ization', 'ize'), ('ation', 'ate'), ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'),
+    ('fulness', 'ful'), ('ousness', 'ous'), ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'),
+    ('logi', 'log'),
+], key=lambda rule: -len(rule[0]))
+_STEP3 = sorted([
+    ('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'), ('ical', 'ic'), ('ful', ''),
+    ('ness', ''),
+], key=lambda rule: -len(rule[0]))
+_STEP4 = sorted([
+    'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent', 'ion', 'ou',
+    'ism', 'ate', 'iti', 'ous', 'ive', 'ize',
+], key=lambda suffix: -len(suffix))
+
+
+def _consonant(word, i):
+    char = word[i]
+    if char in 'aeiou':
+        return False
+    if char == 'y':
+        return i == 0 or not _consonant(word, i - 1)
+    return True
+
+
+def _measure(stem):
+    """Number of vowel-consonant sequences in a stem ([C](VC)^m[V])"""
+    count, i, length = 0, 0, len(stem)
+    while i < length and _consonant(stem, i):
+        i += 1
+    while i < length:
+        while i < length and not _consonant(stem, i):
+            i += 1
+        if i >= length:
+            break
+        while i < length and _consonant(stem, i):
+            i += 1
+        count += 1
+    return count
+
+
+def _has_vowel(stem):
+    return any(not _consonant(stem, i) for i in range(len(stem)))
+
+
+def _double_consonant(word):
+    return len(word) >= 2 and word[-1] == word[-2] and _consonant(word, len(word) - 1)
+
+
+def _cvc(word):
+    """Ends consonant-vowel-consonant, the last not w, x or y (e.g. -hop, -fil)"""
+    i = len(word) - 1
+    return (i >= 2 and _consonant(word, i - 2) and not _consonant(word, i - 1) and _consonant(word, i)
+            and word[i] not in 'wxy')
+
+
+def _replace_suffix(word, rules, min_measure):
+    for suffix, replacement in rules:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + replacement if _measure(stem) > min_measure else word
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Porter stem of a lowercase English word ('irrigation' -> 'irrig', 'subsidies' -> 'subsidi')"""
+    if len(word) <= 2 or not word.isascii() or not word.isalpha():
+        return word
+
+    # Step 1a: plurals
+    if word.endswith('sses') or word.endswith('ies'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+
+    # Step 1b: -eed, -ed, -ing
+    if word.endswith('eed'):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif _double_consonant(word) and word[-1] not in 'lsz':
+                    word = word[:-1]
+                elif _measure(word) == 1 and _cvc(word):
+                    word += 'e'
+                break
+
+    # Step 1c: y -> i
+    if word.endswith('y') and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+
+    word = _replace_suffix(word, _STEP2, 0)
+    word = _replace_suffix(word, _STEP3, 0)
+
+    # Step 4: drop suffixes from stems with m > 1
+    for suffix in _STEP4:
+        if word.endswith(suffix):
+            stem_ = word[:-len(suffix)]
+            if _measure(stem_) > 1 and (suffix != 'ion' or stem_.endswith(('s', 't'))):
+                word = stem_
+            break
+
+    # Step 5: trailing -e and -ll
+    if word.endswith('e'):
+        stem_ = word[:-1]
+        measure = _measure(stem_)
+        if measure > 1 or (measure == 1 and not _cvc(stem_)):
+            word = stem_
+    if word.endswith('ll') and _measure(word) > 1:
+        word = word[:-1]
+    return word
+
+
+def is_word_char(char):
+    return bool(_WORD_CHAR.match(char))
+
+
+def normalize_text(text):
+    """Lowercase, NFC text with spelling variants of Indic scripts folded together"""
+    return unicodedata.normalize('NFC', text).translate(_NORMALIZE_TABLE).lower()
+
+
+def tokenize(text):
+    """Normalized word tokens of a text"""
+    return TOKEN_PATTERN.findall(normalize_text(text)) if text else []
+
+
+def analyze(text):
+    """Index terms of a text: lowercase tokens, stopwords removed, English words stemmed"""
+    return [stem(token) for token in tokenize(text) if token not in STOPWORDS]
@@ -0,0 +1,264 @@
+import json
+import os
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from app.extensions import db
+from app.models import Field, Crop, WeatherAlert
+from app.services.weather_service import field_forecast_key, forecasts_for_keys, weather_available
+
+WEATHER_ALERT_RULES_PATH = os.getenv(
+    'WEATHER_ALERT_RULES_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'weather_alert_rules.json')
+)
+WEATHER_ALERT_DAYS = int(os.getenv('WEATHER_ALERT_DAYS', 3))  # forecast days evaluated per run
+WEATHER_ALERT_BATCH_SIZE = int(os.getenv('WEATHER_ALERT_BATCH_SIZE', 5000))  # rows per insert
+
+HAZARDS = ('frost', 'heatwave', 'heavy_rain', 'high_wind')
+HAZARD_METRICS = ('temperature_min', 'temperature_max', 'precipitation_mm', 'wind_speed_max')
+# +1 alerts when the forecast is at or above the threshold, -1 at or below it
+DIRECTIONS = np.array([-1.0, 1.0, 1.0, 1.0])
+HAZARD_MESSAGES = {
+    'frost': 'Frost risk: minimum {value:.1f}°C (threshold {threshold:.1f}°C)',
+    'heatwave': 'Heat stress: maximum {value:.1f}°C (threshold {threshold:.1f}°C)',
+    'heavy_rain': 'Heavy rain: {value:.1f} mm expected (threshold {threshold:.1f} mm)',
+    'high_wind': 'High wind: {value:.1f} m/s (threshold {threshold:.1f} m/s)',
+}
+
+# Free-text growth stages -> rule stages (checked in order, first match wins)
+STAGE_ALIASES = [
+    ('germinat', 'seedling'), ('seedling', 'seedling'), ('nursery', 'seedling'), ('sowing', 'seedling'),
+    ('tiller', 'vegetative'), ('vegetative', 'vegetative'),
+    ('flower', 'flowering'), ('heading', 'flowering'), ('anthesis', 'flowering'), ('boot', 'flowering'),
+    ('fruit', 'fruiting'), ('grain', 'fruiting'), ('pod', 'fruiting'), ('boll', 'fruiting'),
+    ('matur', 'maturity'), ('ripen', 'maturity'), ('harvest', 'maturity'),
+]
+
+
+def normalize_stage(growth_stage):
+    stage = (growth_stage or '').strip().lower()
+    for alias, name in STAGE_ALIASES:
+        if alias in stage:
+            return name
+    return None
+
+
+class AlertRules:
+    """
+    Hazard thresholds per crop type and growth stage. Later layers override earlier ones:
+    default, then stage, then crop, then crop:stage. Each distinct (crop, stage) resolves to
+    one row of a threshold matrix so fields can be compared against forecasts in bulk.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.severe_margin = np.array([rules['severe_margin'][hazard] for hazard in HAZARDS])
+        self._rows = {}
+        self._raw_rows = {}
+        self._thresholds = []
+        self._matrix = None
+
+    @classmethod
+    def from_file(cls, path=WEATHER_ALERT_RULES_PATH):
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def thresholds(self, crop_type=None, growth_stage=None):
+        """Resolved {hazard: threshold} for a crop type and growth stage"""
+        crop = (crop_type or '').strip().lower()
+        stage = normalize_stage(growth_stage)
+        resolved = dict(self.rules['default'])
+        resolved.update(self.rules['stages'].get(stage, {}))
+        resolved.update(self.rules['crops'].get(crop, {}))
+        resolved.update(self.rules['crop_stages'].get(f'{crop}:{stage}', {}))
+        return resolved
+
+    def row(self, crop_type=None, growth_stage=None):
+        """Threshold matrix row for a crop type and growth stage (memoized on the raw strings)"""
+        row = self._raw_rows.get((crop_type, growth_stage))
+        if row is not None:
+            return row
+        key = ((crop_type or '').strip().lower(), normalize_stage(growth_stage))
+        if key not in self._rows:
+            resolved = self.thresholds(*key)
+            self._rows[key] = len(self._thresholds)
+            self._thresholds.append([resolved.get(hazard, np.nan) for hazard in HAZARDS])
+            self._matrix = None
+        self._raw_rows[(crop_type, growth_stage)] = self._rows[key]
+        return self._rows[key]
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = np.array(self._thresholds, dtype=float).reshape(-1, len(HAZARDS))
+        return self._matrix
+
+
+def evaluate_alerts(targets, forecasts, days=WEATHER_ALERT_DAYS, rules=None):
+    """
+    Compare every target against its location's daily forecast in one vectorized pass.
+    targets: dicts with field_id, user_id, crop_id, crop_type, growth_stage and location
+    (a forecast key); forecasts: {location: [daily forecast, ...]}.
+    Returns one alert dict per (target, day, hazard) that crosses its threshold.
+    """
+    rules = rules or alert_rules
+    locations = list(dict.fromkeys(t['location'] for t in targets if forecasts.get(t['location'])))
+    if not locations:
+        return []
+    location_index = {location: i for i, location in enumerate(locations)}
+
+    values = np.full((len(locations), days, len(HAZARDS)), np.nan)
+    dates = np.empty((len(locations), days), dtype=object)
+    for i, location in enumerate(locations):
+        for d, day in enumerate(forecasts[location][:days]):
+            dates[i, d] = date.fromisoformat(day['date'])
+            values[i, d] = [np.nan if day.get(metric) is None else day[metric] for metric in HAZARD_METRICS]
+
+    targets = [t for t in targets if t['location'] in location_index]
+    cells = np.fromiter((location_index[t['location']] for t in targets), dtype=np.intp, count=len(targets))
+    rows = np.fromiter((rules.row(t.get('crop_type'), t.get('growth_stage')) for t in targets),
+                       dtype=np.intp, count=len(targets))
+    thresholds = rules.matrix[rows]
+
+    # margin >= 0 means at or past the threshold in the hazard's direction; NaN never alerts
+    margin = DIRECTIONS * (values[cells] - thresholds[:, None, :])
+    with np.errstate(invalid='ignore'):
+        target_i, day_i, hazard_i = np.nonzero(margin >= 0)
+    hit_cells = cells[target_i]
+    hit_values = values[hit_cells, day_i, hazard_i]
+    hit_thresholds = thresholds[target_i, hazard_i]
+    severe = margin[target_i, day_i, hazard_i] >= rules.severe_margin[hazard_i]
+
+    alerts = []
+    for t, hazard_index, value, threshold, forecast_date, is_severe in zip(
+            target_i.tolist(), hazard_i.tolist(), hit_values.tolist(), hit_thresholds.tolist(),
+            dates[hit_cells, day_i].tolist(), severe.tolist()):
+        target = targets[t]
+        hazard = HAZARDS[hazard_index]
+        alerts.append({
+            'user_id': target['user_id'],
+            'field_id': target['field_id'],
+            'crop_id': target.get('crop_id'),
+            'crop_type': target.get('crop_type'),
+            'growth_stage': target.get('growth_stage'),
+            'hazard': hazard,
+            'severity': 'severe' if is_severe else 'warning',
+            'forecast_date': forecast_date,
+            'value': round(value, 1),
+            'threshold': threshold,
+            'message': HAZARD_MESSAGES[hazard].format(value=value, threshold=threshold)
+        })
+    return alerts
+
+
+def load_targets():
+    """One target per active (unharvested) crop on every field with coordinates, or one per bare field"""
+    fields = db.session.query(Field.id, Field.user_id, Field.latitude, Field.longitude).filter(
+        Field.latitude.isnot(None), Field.longitude.isnot(None)
+    ).all()
+    crops = {}
+    for crop in db.session.query(Crop.id, Crop.field_id, Crop.crop_type, Crop.growth_stage).filter(
+            Crop.harvest_date.is_(None)):
+        crops.setdefault(crop.field_id, []).append(crop)
+
+    targets = []
+    for field in fields:
+        location = field_forecast_key(field)
+        for crop in crops.get(field.id) or [None]:
+            targets.append({
+                'field_id': field.id,
+                'user_id': field.user_id,
+                'crop_id': crop.id if crop else None,
+                'crop_type': crop.crop_type if crop else None,
+                'growth_stage': crop.growth_stage if crop else None,
+                'location': location
+            })
+    return targets, len(fields)
+
+
+def store_alerts(alerts):
+    """
+    Insert alerts not already recorded for the same field, crop, hazard and date. A stored alert
+    whose severity changed is updated in place (with the new value and message), and goes back
+    to pending if it escalated to severe. Returns (new, updated).
+    """
+    if not alerts:
+        return 0, 0
+    since = min(alert['forecast_date'] for alert in alerts)
+    existing = {
+        (field_id, crop_id, hazard, forecast_date): (alert_id, severity)
+        for alert_id, field_id, crop_id, hazard, forecast_date, severity in db.session.query(
+            WeatherAlert.id, WeatherAlert.field_id, WeatherAlert.crop_id, WeatherAlert.hazard,
+            WeatherAlert.forecast_date, WeatherAlert.severity
+        ).filter(WeatherAlert.forecast_date >= since)
+    }
+
+    new_alerts, changed, escalated = [], [], []
+    for alert in alerts:
+        stored = existing.get((alert['field_id'], alert['crop_id'], alert['hazard'], alert['forecast_date']))
+        if stored is None:
+            new_alerts.append(alert)
+        elif stored[1] != alert['severity']:
+            update = {'id': stored[0], 'severity': alert['severity'], 'value': alert['value'],
+                      'threshold': alert['threshold'], 'message': alert['message']}
+            (escalated if alert['severity'] == 'severe' else changed).append(update)
+
+    created_at = datetime.utcnow()
+    for start in range(0, len(new_alerts), WEATHER_ALERT_BATCH_SIZE):
+        db.session.bulk_insert_mappings(WeatherAlert, [
+            {**alert, 'status': 'pending', 'created_at': created_at}
+            for alert in new_alerts[start:start + WEATHER_ALERT_BATCH_SIZE]
+        ])
+    escalated = [{**update, 'status': 'pending', 'delivered_at': None} for update in escalated]
+    for updates in (changed, escalated):
+        for start in range(0, len(updates), WEATHER_ALERT_BATCH_SIZE):
+            db.session.bulk_update_mappings(WeatherAlert, updates[start:start + WEATHER_ALERT_BATCH_SIZE])
+    db.session.commit()
+    return len(new_alerts), len(changed) + len(escalated)
+
+
+def run_weather_alerts(days=WEATHER_ALERT_DAYS, forecast_source=None):
+    """
+    Evaluate the alert rules for every field with coordinates and store new alerts.
+    forecast_source(keys, days) -> ({key: forecast}, upstream requests) defaults to the cached,
+    grid-deduplicated weather service path; pass a stub to run without the weather provider.
+    """
+    start = time.perf_counter()
+    if forecast_source is None:
+        if not weather_available():
+            print("Weather API key not set, skipping weather alerts")
+            return {'skipped': 'weather provider unavailable'}
+        forecast_source = forecasts_for_keys
+
+    targets, field_count = load_targets()
+    loaded = time.perf_counter()
+    forecasts, upstream_requests = forecast_source([t['location'] for t in targets], days)
+    fetched = time.perf_counter()
+    alerts = evaluate_alerts(targets, forecasts, days)
+    evaluated = time.perf_counter()
+    new_alerts, updated_alerts = store_alerts(alerts)
+
+    summary = {
+        'fields': field_count,
+        'targets': len(targets),
+        'locations': len(forecasts),
+        'locations_without_forecast': sum(1 for forecast in forecasts.values() if not forecast),
+        'upstream_requests': upstream_requests,
+        'alerts': len(alerts),
+        'new_alerts': new_alerts,
+        'updated_alerts': updated_alerts,
+        'timings_ms': {
+            'load': round((loaded - start) * 1000, 1),
+            'forecasts': round((fetched - loaded) * 1000, 1),
+            'evaluate': round((evaluated - fetched) * 1000, 1),
+            'store': round((time.perf_counter() - evaluated) * 1000, 1)
+        }
+    }
+    print(f"✅ Weather alerts: {new_alerts} new, {updated_alerts} updated of {len(alerts)} for {field_count} fields "
+          f"({upstream_requests} upstream requests)")
+    return summary
+
+
+alert_rules = AlertRules.from_file()
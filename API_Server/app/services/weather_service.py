@@ -1,18 +1,102 @@
-import requests
+import asyncio
+import functools
 import os
+import math
+import threading
+import weakref
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from app.services.replay_provider import replay_provider, get_provider_mode
+from agri_common.http_client import http_client
+from app.services.async_io import run_blocking
+from app.services.forecast_aggregation import aggregate_daily
+from app.services.weather_store import record_observation, record_forecast
+from app.services.pincode_gazetteer import gazetteer, PRECISION_RANK
 
 load_dotenv()
 
 WEATHER_API_KEY = os.getenv('WEATHER_API_KEY')
 #WEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
 WEATHER_BASE_URL = os.getenv('WEATHER_BASE_URL', 'http://api.openweathermap.org/data/2.5')
+WEATHER_PROVIDER = get_provider_mode('WEATHER_PROVIDER', 'openweathermap')  # openweathermap | replay
+WEATHER_GRID_DEGREES = float(os.getenv('WEATHER_GRID_DEGREES', 0.1))  # ~11 km cells shared by nearby fields
+WEATHER_FETCH_WORKERS = int(os.getenv('WEATHER_FETCH_WORKERS', 8))  # concurrent upstream requests
+WEATHER_FORECAST_CACHE_SECONDS = int(os.getenv('WEATHER_FORECAST_CACHE_SECONDS', 1800))
+WEATHER_FORECAST_CACHE_SIZE = int(os.getenv('WEATHER_FORECAST_CACHE_SIZE', 20000))  # locations
+
+_fetch_executor = ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS, thread_name_prefix='weather')
+_fetch_semaphores = weakref.WeakKeyDictionary()  # event loop -> semaphore bounding its in-flight requests
+_forecast_cache = {}  # (kind, value) -> (expires, days, daily forecast)
+_forecast_cache_lock = threading.Lock()
+
+def fetch_weather(endpoint, params):
+    """
+    Fetch an OpenWeatherMap payload ('weather' or 'forecast') from the selected provider.
+    Raises on an HTTP error status or an error body (e.g. {'cod': '404'}), so callers fall back
+    instead of treating it as an empty forecast.
+    """
+    if WEATHER_PROVIDER == 'replay':
+        today = datetime.utcnow().date()
+        location = params.get('q') or f"{params.get('lat')},{params.get('lon')}"
+        context = {'location': location}
+        context.update({f'day{i}': (today + timedelta(days=i)).isoformat() for i in range(7)})
+        if endpoint == 'weather':
+            # Replayed observations are stamped as current
+            payload = {**replay_provider.respond('weather_current', location, context), 'dt': int(time.time())}
+        else:
+            payload = replay_provider.respond('weather_forecast', location, context)
+    else:
+        response = http_client.get(f"{WEATHER_BASE_URL}/{endpoint}", params=params)
+        if not response.ok:
+            # Not raise_for_status(): its message carries the URL, and with it the API key
+            raise requests.HTTPError(f"OpenWeatherMap {endpoint} returned HTTP {response.status_code}", response=response)
+        payload = response.json()
+
+    required = 'list' if endpoint == 'forecast' else 'main'
+    if not isinstance(payload, dict) or required not in payload:
+        message = payload.get('message') if isinstance(payload, dict) else None
+        raise ValueError(f"OpenWeatherMap {endpoint} returned no '{required}': {message or payload}")
+    return payload
+
+async def fetch_weather_async(endpoint, params):
+    """
+    fetch_weather without blocking the event loop: the pooled HTTP client runs on the weather worker
+    threads, with at most WEATHER_FETCH_WORKERS requests in flight per event loop
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _fetch_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _fetch_semaphores.setdefault(loop, asyncio.Semaphore(WEATHER_FETCH_WORKERS))
+    async with semaphore:
+        return await loop.run_in_executor(_fetch_executor, functools.partial(fetch_weather, endpoint, params))
+
+def run_sync(coroutine):
+    """
+    Run a weather coroutine for a sync caller (CLI commands, sync views). asyncio.run cannot nest
+    in a running event loop, so async code gets a clear error pointing at the *_async function.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    coroutine.close()
+    raise RuntimeError(f"Sync weather call from a running event loop; await {coroutine.__name__}() instead")
+
+def weather_available():
+    """True when weather can be fetched from the selected provider"""
+    return WEATHER_PROVIDER == 'replay' or bool(WEATHER_API_KEY)
 
 def get_current_weather(location):
+    """Get current weather data for a location (sync callers only)"""
+    return run_sync(get_current_weather_async(location))
+
+async def get_current_weather_async(location):
     """Get current weather data for a location"""
     try:
-        if not WEATHER_API_KEY:
+        if not weather_available():
             print("Weather API key not set, returning mock data")
             # Return mock data if no API key
             return {
@@ -24,15 +108,15 @@ def get_current_weather(location):
                 'source': 'mock_data'
             }
         
-        url = f"{WEATHER_BASE_URL}/weather"
+        query = location_query(location)
         params = {
-            'q': location,
+            **query,
             'appid': WEATHER_API_KEY,
             'units': 'metric'
         }
         
-        response = requests.get(url, params=params)
-        data = response.json()
+        data = await fetch_weather_async('weather', params)
+        await run_blocking('db', record_observation, location_key(query), location, data, WEATHER_PROVIDER)
         
         return {
             'location': location,
@@ -40,7 +124,7 @@ def get_current_weather(location):
             'humidity': data['main']['humidity'],
             'wind_speed': data['wind']['speed'],
             'description': data['weather'][0]['description'],
-            'source': 'openweathermap'
+            'source': WEATHER_PROVIDER
         }
         
     except Exception as e:
@@ -55,58 +139,221 @@ def get_current_weather(location):
         }
 
 def get_weather_forecast(location, days=7):
+    """Get weather forecast for a location (sync callers only)"""
+    return run_sync(get_weather_forecast_async(location, days))
+
+async def get_weather_forecast_async(location, days=7):
     """Get weather forecast for a location"""
+    return await fetch_forecast_async(location_query(location), days)
+
+def get_weather_forecast_at(latitude, longitude, days=7):
+    """Get weather forecast for coordinates (sync callers only)"""
+    return run_sync(fetch_forecast_async({'lat': latitude, 'lon': longitude}, days))
+
+def get_weather_overview(location, days=7):
+    """Current weather and daily forecast for a location, fetched concurrently (sync callers only)"""
+    return run_sync(get_weather_overview_async(location, days))
+
+async def get_weather_overview_async(location, days=7):
+    """Current weather and daily forecast for a location, fetched concurrently"""
+    current, forecast = await asyncio.gather(get_current_weather_async(location),
+                                             get_weather_forecast_async(location, days))
+    return {'location': location, 'current': current, 'forecast_days': days, 'forecast': forecast}
+
+async def get_weather_batch_async(locations, days=7):
+    """Overviews for many locations ({location: overview}); duplicates are fetched once"""
+    unique = list(dict.fromkeys(locations))
+    overviews = await asyncio.gather(*(get_weather_overview_async(location, days) for location in unique))
+    return dict(zip(unique, overviews))
+
+async def fetch_forecast_async(query, days=7):
+    """Daily forecast for an OpenWeatherMap location query ({'q': ...} or {'lat': ..., 'lon': ...})"""
     try:
-        if not WEATHER_API_KEY:
+        if not weather_available():
             # Return mock forecast data with current date
             print("Weather API key not set, returning mock forecast data")
-            current_date = datetime.now()
-            return [
-                {
-                    'date': (current_date + timedelta(days=i)).strftime('%Y-%m-%d'),
-                    'temperature_max': 25 + i,
-                    'temperature_min': 15 + i,
-                    'humidity': 60 + i,
-                    'description': 'Partly cloudy'
-                }
-                for i in range(days)
-            ]
-        
-        url = f"{WEATHER_BASE_URL}/forecast"
-        params = {
-            'q': location,
-            'appid': WEATHER_API_KEY,
-            'units': 'metric',
-            'cnt': days * 8  # 8 forecasts per day (3-hour intervals)
-        }
-        
-        response = requests.get(url, params=params)
-        data = response.json()
+            return mock_forecast(days)
         
-        # Process forecast data (simplified)
-        forecast = []
-        for item in data['list'][::8]:  # Take one forecast per day
-            forecast.append({
-                'date': item['dt_txt'].split(' ')[0],
-                'temperature_max': item['main']['temp_max'],
-                'temperature_min': item['main']['temp_min'],
-                'humidity': item['main']['humidity'],
-                'description': item['weather'][0]['description']
-            })
-        
-        return forecast[:days]
+        data = await fetch_weather_async('forecast', forecast_params(query, days))
+        await run_blocking('db', record_forecast, location_key(query), query.get('q') or f"{query['lat']},{query['lon']}",
+                           data, WEATHER_PROVIDER)
+        return aggregate_daily([data], days)[0]
         
     except Exception as e:
         print(f"Weather forecast failed: {e}")
-        # Return fallback data with current dates
-        current_date = datetime.now()
-        return [
-            {
-                'date': (current_date + timedelta(days=i)).strftime('%Y-%m-%d'),
-                'temperature_max': 20 + i,
-                'temperature_min': 10 + i,
-                'humidity': 65,
-                'description': 'Weather data unavailable'
-            }
-            for i in range(days)
-        ]
+        return fallback_forecast(days)
+
+def forecast_params(query, days=7):
+    """OpenWeatherMap parameters for the raw 3-hourly forecast of a location query"""
+    return {
+        **query,
+        'appid': WEATHER_API_KEY,
+        'units': 'metric',
+        'cnt': days * 8  # 8 forecasts per day (3-hour intervals)
+    }
+
+def mock_forecast(days):
+    """Mock forecast data starting today"""
+    current_date = datetime.now()
+    return [
+        {
+            'date': (current_date + timedelta(days=i)).strftime('%Y-%m-%d'),
+            'temperature_max': 25 + i,
+            'temperature_min': 15 + i,
+            'humidity': 60 + i,
+            'description': 'Partly cloudy'
+        }
+        for i in range(days)
+    ]
+
+def fallback_forecast(days):
+    """Placeholder forecast when the upstream request fails"""
+    current_date = datetime.now()
+    return [
+        {
+            'date': (current_date + timedelta(days=i)).strftime('%Y-%m-%d'),
+            'temperature_max': 20 + i,
+            'temperature_min': 10 + i,
+            'humidity': 65,
+            'description': 'Weather data unavailable'
+        }
+        for i in range(days)
+    ]
+
+def normalize_city(city):
+    """Cache key form of a free-text place name: lowercased with whitespace collapsed"""
+    return ' '.join((city or '').split()).lower()
+
+def pin_cell(pin_code):
+    """Grid cell of a PIN code's centroid from the offline gazetteer, or None"""
+    place = gazetteer.lookup(pin_code)
+    if not place or PRECISION_RANK[place['precision']] > PRECISION_RANK['district']:
+        return None
+    return snap_to_grid(place['latitude'], place['longitude'])
+
+def location_query(location):
+    """OpenWeatherMap query for a free-text location; a PIN code resolves offline to its grid cell"""
+    cell = pin_cell(location)
+    if cell:
+        return {'lat': cell[0], 'lon': cell[1]}
+    return {'q': normalize_city(location)}
+
+def location_key(query):
+    """Time-series store key for a location query: normalized city name or snapped grid cell"""
+    if query.get('q'):
+        return normalize_city(query['q'])[:64]
+    latitude, longitude = snap_to_grid(float(query['lat']), float(query['lon']))
+    return f'{latitude:.4f},{longitude:.4f}'
+
+def field_location_keys(field):
+    """Store keys for a field, most specific first: its grid cell, then its city"""
+    keys = []
+    kind, value = field_forecast_key(field)
+    if kind == 'cell':
+        keys.append(location_key({'lat': value[0], 'lon': value[1]}))
+    keys.append(location_key({'q': field.city}))
+    return keys
+
+def snap_to_grid(latitude, longitude, grid=WEATHER_GRID_DEGREES):
+    """Centre of the grid cell containing a coordinate, so nearby points share one forecast"""
+    return (
+        round((math.floor(latitude / grid) + 0.5) * grid, 4),
+        round((math.floor(longitude / grid) + 0.5) * grid, 4)
+    )
+
+def field_forecast_key(field, grid=WEATHER_GRID_DEGREES):
+    """
+    Forecast location of a field: ('cell', snapped coordinates) from its coordinates or PIN code
+    centroid, or ('city', normalized name) when neither is known
+    """
+    if field.latitude is not None and field.longitude is not None:
+        return ('cell', snap_to_grid(field.latitude, field.longitude, grid))
+    place = gazetteer.lookup(field.pin_code)
+    if place and PRECISION_RANK[place['precision']] <= PRECISION_RANK['district']:
+        return ('cell', snap_to_grid(place['latitude'], place['longitude'], grid))
+    return ('city', normalize_city(field.city))
+
+def _cached_forecast(key, days):
+    with _forecast_cache_lock:
+        entry = _forecast_cache.get(key)
+    if entry and entry[0] > time.monotonic() and entry[1] >= days:
+        return entry[2][:days]
+    return None
+
+def _cache_forecast(key, days, forecast):
+    now = time.monotonic()
+    with _forecast_cache_lock:
+        if len(_forecast_cache) >= WEATHER_FORECAST_CACHE_SIZE:
+            for stale in [k for k, entry in _forecast_cache.items() if entry[0] <= now]:
+                del _forecast_cache[stale]
+            while len(_forecast_cache) >= WEATHER_FORECAST_CACHE_SIZE:
+                del _forecast_cache[next(iter(_forecast_cache))]
+        _forecast_cache[key] = (now + WEATHER_FORECAST_CACHE_SECONDS, days, forecast)
+
+def forecasts_for_keys(keys, days=7):
+    """Daily forecasts for forecast location keys; see forecasts_for_keys_async (sync callers only)"""
+    return run_sync(forecasts_for_keys_async(keys, days))
+
+async def forecasts_for_keys_async(keys, days=7):
+    """
+    Daily forecasts for forecast location keys (see field_forecast_key), deduplicated and cached
+    for WEATHER_FORECAST_CACHE_SECONDS. Cache misses are fetched concurrently and aggregated in one
+    pass. Returns ({key: forecast, or None when unavailable}, upstream request count).
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    forecasts = {key: _cached_forecast(key, days) for key in unique_keys}
+    missing = [key for key in unique_keys if forecasts[key] is None]
+    if not missing or not weather_available():
+        return forecasts, 0
+
+    async def fetch(key):
+        kind, value = key
+        query = {'lat': value[0], 'lon': value[1]} if kind == 'cell' else {'q': value}
+        try:
+            return await fetch_weather_async('forecast', forecast_params(query, days))
+        except Exception as e:
+            print(f"Weather forecast failed for {value}: {e}")
+            return None
+
+    payloads = dict(zip(missing, await asyncio.gather(*(fetch(key) for key in missing))))
+    fetched = [key for key in missing if payloads[key] is not None]
+    for kind, value in fetched:
+        query = {'lat': value[0], 'lon': value[1]} if kind == 'cell' else {'q': value}
+        await run_blocking('db', record_forecast, location_key(query),
+                           f'{value[0]},{value[1]}' if kind == 'cell' else value, payloads[(kind, value)], WEATHER_PROVIDER)
+    try:
+        for key, forecast in zip(fetched, aggregate_daily([payloads[key] for key in fetched], days)):
+            forecasts[key] = forecast
+            _cache_forecast(key, days, forecast)
+    except Exception as e:
+        print(f"Weather forecast aggregation failed: {e}")
+    return forecasts, len(missing)
+
+def get_field_forecasts(fields, days=7, grid=WEATHER_GRID_DEGREES):
+    """Forecasts for many fields; see get_field_forecasts_async (sync callers only)"""
+    return run_sync(get_field_forecasts_async(fields, days, grid))
+
+async def get_field_forecasts_async(fields, days=7, grid=WEATHER_GRID_DEGREES):
+    """
+    Forecasts for many fields with at most one upstream request per grid cell.
+    Fields without coordinates share a request per city; recently fetched locations are served
+    from the forecast cache.
+    Returns ([{'field': field, 'grid_cell': ..., 'forecast': [...]}, ...], upstream request count)
+    """
+    keys = [field_forecast_key(field, grid) for field in fields]
+
+    if not weather_available():
+        print("Weather API key not set, returning mock forecast data")
+        forecasts, upstream_requests = {key: mock_forecast(days) for key in keys}, 0
+    else:
+        forecasts, upstream_requests = await forecasts_for_keys_async(keys, days)
+
+    results = [
+        {
+            'field': field,
+            'grid_cell': list(key[1]) if key[0] == 'cell' else None,
+            'forecast': forecasts[key] if forecasts[key] is not None else fallback_forecast(days)
+        }
+        for field, key in zip(fields, keys)
+    ]
+    return results, upstream_requests
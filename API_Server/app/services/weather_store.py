@@ -0,0 +1,264 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import has_app_context
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import WeatherData, WeatherHourly, WeatherDaily
+
+# Time-series store configuration
+WEATHER_STORE_ENABLED = os.getenv('WEATHER_STORE_ENABLED', 'true').lower() == 'true'
+WEATHER_OBSERVATION_INTERVAL = int(os.getenv('WEATHER_OBSERVATION_INTERVAL_SECONDS', 600))  # per location
+WEATHER_FORECAST_INTERVAL = int(os.getenv('WEATHER_FORECAST_INTERVAL_SECONDS', 10800))  # per location
+WEATHER_RAW_RETENTION_DAYS = int(os.getenv('WEATHER_RAW_RETENTION_DAYS', 14))
+WEATHER_FORECAST_RETENTION_HOURS = int(os.getenv('WEATHER_FORECAST_RETENTION_HOURS', 48))
+WEATHER_HOURLY_RETENTION_DAYS = int(os.getenv('WEATHER_HOURLY_RETENTION_DAYS', 90))
+WEATHER_DAILY_RETENTION_DAYS = int(os.getenv('WEATHER_DAILY_RETENTION_DAYS', 1095))
+WEATHER_STORE_TRACKED_LOCATIONS = int(os.getenv('WEATHER_STORE_TRACKED_LOCATIONS', 40000))  # (kind, location) per worker
+
+_last_recorded = {}
+_lock = threading.Lock()
+
+
+def _due(kind, location_key, interval):
+    """True (and marks it recorded) if location_key has not been recorded for kind within interval"""
+    now = time.monotonic()
+    key = (kind, location_key)
+    with _lock:
+        last = _last_recorded.get(key)
+        if last is not None and now - last < interval:
+            return False
+        if last is None and len(_last_recorded) >= WEATHER_STORE_TRACKED_LOCATIONS:
+            # Entries are in recording order: drop the expired ones, then the oldest
+            longest = max(WEATHER_OBSERVATION_INTERVAL, WEATHER_FORECAST_INTERVAL)
+            for stale in [k for k, recorded in _last_recorded.items() if now - recorded >= longest]:
+                del _last_recorded[stale]
+            while len(_last_recorded) >= WEATHER_STORE_TRACKED_LOCATIONS:
+                del _last_recorded[next(iter(_last_recorded))]
+        _last_recorded.pop(key, None)
+        _last_recorded[key] = now
+        return True
+
+
+def _can_write():
+    return WEATHER_STORE_ENABLED and has_app_context()
+
+
+def record_observation(location_key, location, data, source):
+    """Append a current-weather payload and fold it into the hourly and daily rollups"""
+    if not _can_write() or not _due('observation', location_key, WEATHER_OBSERVATION_INTERVAL):
+        return
+    try:
+        observed = data.get('dt') or int(time.time())
+        offset = int(data.get('timezone') or 0)  # Daily rollups use the location's local date
+        rain = data.get('rain') or {}
+        sample = {
+            'temperature': data['main'].get('temp'),
+            'humidity': data['main'].get('humidity'),
+            'rainfall': rain.get('1h', rain.get('3h', 0.0) / 3),
+            'wind_speed': (data.get('wind') or {}).get('speed')
+        }
+        recorded_at = datetime.fromtimestamp(observed, timezone.utc).replace(tzinfo=None)
+        local_day = datetime.fromtimestamp(observed + offset, timezone.utc).date()
+
+        with Session(db.engine) as session:
+            session.add(WeatherData(
+                location_key=location_key,
+                location=location,
+                kind='observation',
+                source=source,
+                temperature=sample['temperature'],
+                temperature_min=data['main'].get('temp_min'),
+                temperature_max=data['main'].get('temp_max'),
+                humidity=sample['humidity'],
+                rainfall=sample['rainfall'],
+                wind_speed=sample['wind_speed'],
+                description=(data.get('weather') or [{}])[0].get('description'),
+                recorded_at=recorded_at
+            ))
+            _update_rollups(session, location_key, recorded_at, local_day, offset, sample)
+            session.commit()
+    except Exception as e:
+        print(f"Weather store failed to record observation for {location}: {e}")
+
+
+def record_forecast(location_key, location, payload, source):
+    """Append the 3-hourly slots of a forecast payload (forecasts are not rolled up)"""
+    if not _can_write() or not _due('forecast', location_key, WEATHER_FORECAST_INTERVAL):
+        return
+    try:
+        recorded_at = datetime.utcnow()
+        with Session(db.engine) as session:
+            for item in payload.get('list', []):
+                main = item.get('main', {})
+                slot = item.get('dt')
+                forecast_for = (datetime.fromtimestamp(slot, timezone.utc).replace(tzinfo=None) if slot
+                                else datetime.strptime(item['dt_txt'], '%Y-%m-%d %H:%M:%S'))
+                session.add(WeatherData(
+                    location_key=location_key,
+                    location=location,
+                    kind='forecast',
+                    source=source,
+                    temperature=main.get('temp'),
+                    temperature_min=main.get('temp_min'),
+                    temperature_max=main.get('temp_max'),
+                    humidity=main.get('humidity'),
+                    rainfall=(item.get('rain') or {}).get('3h', 0.0),
+                    wind_speed=(item.get('wind') or {}).get('speed'),
+                    description=(item.get('weather') or [{}])[0].get('description'),
+                    forecast_for=forecast_for,
+                    recorded_at=recorded_at
+                ))
+            session.commit()
+    except Exception as e:
+        print(f"Weather store failed to record forecast for {location}: {e}")
+
+
+def _update_rollups(session, location_key, recorded_at, local_day, utc_offset, sample):
+    """
+    Fold a sample into its UTC hour and its local-date day. Workers record the same location
+    concurrently, so buckets are changed with UPDATE ... SET col = col + :value rather than
+    read-modify-write in Python.
+    """
+    hour = recorded_at.replace(minute=0, second=0, microsecond=0)
+    hourly_key = {'location_key': location_key, 'hour': hour}
+    daily_key = {'location_key': location_key, 'day': local_day}
+    _create_bucket(session, WeatherHourly, hourly_key)
+    _create_bucket(session, WeatherDaily, daily_key)
+
+    # Rain is a trailing 1h accumulation: an hour's rainfall is the largest value seen in it,
+    # and a day's rainfall is the sum of its hours. The hour row stays locked until commit, so
+    # samples of the same hour take turns and each adds only its increase to the day.
+    previous_rain = session.query(WeatherHourly.rainfall).filter_by(**hourly_key).with_for_update().scalar()
+    rainfall = max(previous_rain, sample['rainfall'] or 0.0)
+
+    _fold_sample(session, WeatherHourly, hourly_key, sample, {WeatherHourly.rainfall: rainfall})
+    _fold_sample(session, WeatherDaily, daily_key, sample, {
+        WeatherDaily.rainfall: WeatherDaily.rainfall + (rainfall - previous_rain),
+        WeatherDaily.utc_offset: utc_offset
+    })
+
+
+def _create_bucket(session, model, key):
+    """Insert an empty rollup bucket unless it exists; losing the race to another worker is fine"""
+    if session.query(model.id).filter_by(**key).first() is not None:
+        return
+    try:
+        with session.begin_nested():
+            session.add(model(**key, samples=0, temperature_sum=0.0, humidity_sum=0.0, rainfall=0.0))
+    except IntegrityError:
+        pass
+
+
+def _fold_sample(session, model, key, sample, values):
+    """Add a sample to a rollup bucket in one UPDATE statement"""
+    values = {model.samples: model.samples + 1, **values}
+    if sample['temperature'] is not None:
+        values[model.temperature_sum] = model.temperature_sum + sample['temperature']
+        values[model.temperature_min] = _least(model.temperature_min, sample['temperature'])
+        values[model.temperature_max] = _greatest(model.temperature_max, sample['temperature'])
+    if sample['humidity'] is not None:
+        values[model.humidity_sum] = model.humidity_sum + sample['humidity']
+    if sample['wind_speed'] is not None:
+        values[model.wind_speed_max] = _greatest(model.wind_speed_max, sample['wind_speed'])
+    session.query(model).filter_by(**key).update(values, synchronize_session=False)
+
+
+def _least(column, value):
+    """LEAST(column, value) that treats NULL as no value yet (and works on SQLite)"""
+    return case((column.is_(None) | (column > value), value), else_=column)
+
+
+def _greatest(column, value):
+    return case((column.is_(None) | (column < value), value), else_=column)
+
+
+def apply_retention():
+    """
+    Delete raw rows and rollups past their retention. Scheduled (flask weather-retention), not run
+    on the request path; each delete is a range scan on a (kind, recorded_at), hour or day index.
+    """
+    utc_now = datetime.utcnow()
+    with Session(db.engine) as session:
+        deleted = {
+            'observations': session.query(WeatherData).filter(
+                WeatherData.kind == 'observation',
+                WeatherData.recorded_at < utc_now - timedelta(days=WEATHER_RAW_RETENTION_DAYS)
+            ).delete(synchronize_session=False),
+            'forecasts': session.query(WeatherData).filter(
+                WeatherData.kind == 'forecast',
+                WeatherData.recorded_at < utc_now - timedelta(hours=WEATHER_FORECAST_RETENTION_HOURS)
+            ).delete(synchronize_session=False),
+            'hourly': session.query(WeatherHourly).filter(
+                WeatherHourly.hour < utc_now - timedelta(days=WEATHER_HOURLY_RETENTION_DAYS)
+            ).delete(synchronize_session=False),
+            'daily': session.query(WeatherDaily).filter(
+                WeatherDaily.day < (utc_now - timedelta(days=WEATHER_DAILY_RETENTION_DAYS)).date()
+            ).delete(synchronize_session=False)
+        }
+        session.commit()
+    return deleted
+
+
+def daily_history(location_key, days=30):
+    """Totals and per-day series for the last `days` days, answered from the daily rollup"""
+    # Days are the location's local dates, so the window ends on its local today
+    utc_offset = db.session.query(WeatherDaily.utc_offset).filter(
+        WeatherDaily.location_key == location_key
+    ).order_by(WeatherDaily.day.desc()).limit(1).scalar() or 0
+    since = (datetime.utcnow() + timedelta(seconds=utc_offset, days=-(days - 1))).date()
+    window = (WeatherDaily.location_key == location_key, WeatherDaily.day >= since)
+
+    totals = db.session.query(
+        func.count(WeatherDaily.id),
+        func.sum(WeatherDaily.rainfall),
+        func.sum(WeatherDaily.temperature_sum),
+        func.sum(WeatherDaily.humidity_sum),
+        func.sum(WeatherDaily.samples),
+        func.min(WeatherDaily.temperature_min),
+        func.max(WeatherDaily.temperature_max)
+    ).filter(*window).one()
+    days_with_data, rainfall, temperature_sum, humidity_sum, samples, temperature_min, temperature_max = totals
+
+    return {
+        'location_key': location_key,
+        'days': days,
+        'days_with_data': days_with_data,
+        'rainfall_mm': round(rainfall or 0.0, 1),
+        'temperature_mean': round(temperature_sum / samples, 1) if samples else None,
+        'temperature_min': temperature_min,
+        'temperature_max': temperature_max,
+        'humidity_mean': round(humidity_sum / samples, 1) if samples else None,
+        'daily': [row.to_dict() for row in WeatherDaily.query.filter(*window).order_by(WeatherDaily.day).all()]
+    }
+
+
+def hourly_history(location_key, hours=48):
+    """Per-hour series for the last `hours` hours (UTC hours), answered from the hourly rollup"""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    rows = WeatherHourly.query.filter(
+        WeatherHourly.location_key == location_key,
+        WeatherHourly.hour >= since
+    ).order_by(WeatherHourly.hour).all()
+    return [row.to_dict() for row in rows]
+
+
+def upcoming_forecast(location_key):
+    """Latest recorded forecast slots from now on, without an upstream call"""
+    latest = db.session.query(func.max(WeatherData.recorded_at)).filter(
+        WeatherData.location_key == location_key,
+        WeatherData.kind == 'forecast'
+    ).scalar()
+    if latest is None:
+        return []
+    return WeatherData.query.filter(
+        WeatherData.location_key == location_key,
+        WeatherData.kind == 'forecast',
+        WeatherData.recorded_at == latest,
+        WeatherData.forecast_for >= datetime.utcnow() - timedelta(hours=3)
+    ).order_by(WeatherData.forecast_for).all()
@@ -0,0 +1,12 @@
+import os
+
+from app.asgi import FlaskASGI, ASGI_MAX_REQUESTS
+
+# Size each worker's database pool for its request threads (app/services/db_pool.py)
+os.environ.setdefault('SERVER_THREADS', str(ASGI_MAX_REQUESTS))
+
+from main import app as flask_app  # noqa: E402
+
+# ASGI entry point (`uvicorn asgi:app`): async views such as weather, plant analysis, crop
+# recommendations and tutorials run as coroutines; the rest of the API is served as under gunicorn
+app = FlaskASGI(flask_app)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start of each deployment profile built by app.factory.create_app.
+
+For every profile (full, catalog, ai) starts fresh interpreters that import the
+factory, create the app and serve a first request to `/` through the test
+client, and reports the fastest run: time to a ready app, time to the first
+response, modules imported, routes registered and peak RSS.
+
+Usage:
+    python benchmarks/bench_app_profiles.py [--runs 5] [--profiles full,catalog,ai]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+API_SERVER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of measurements
+COLD_START = '''
+import json, resource, sys, time
+start = time.perf_counter()
+from app.factory import create_app
+app = create_app(blueprints=sys.argv[1])
+ready = time.perf_counter()
+status = app.test_client().get('/').status_code
+first = time.perf_counter()
+print(json.dumps({
+    'ready_ms': (ready - start) * 1000,
+    'first_response_ms': (first - start) * 1000,
+    'status': status,
+    'modules': len(sys.modules),
+    'routes': len(list(app.url_map.iter_rules())),
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+'''
+
+
+def cold_start(profile, env):
+    result = subprocess.run([sys.executable, '-c', COLD_START, profile], cwd=API_SERVER, env=env,
+                            capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"profile {profile} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--profiles', default='full,catalog,ai')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DB_TYPE='sqlite', DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'profiles.db')}",
+                   PYTHONPATH=API_SERVER, PYTHONDONTWRITEBYTECODE='1')
+        print(f"{'profile':10} {'ready':>9} {'1st response':>13} {'modules':>8} {'routes':>7} {'peak RSS':>9}")
+        for profile in args.profiles.split(','):
+            best = min((cold_start(profile, env) for _ in range(args.runs)), key=lambda run: run['ready_ms'])
+            print(f"{profile:10} {best['ready_ms']:7.0f}ms {best['first_response_ms']:11.0f}ms {best['modules']:8} "
+                  f"{best['routes']:7} {best['rss_mb']:7.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
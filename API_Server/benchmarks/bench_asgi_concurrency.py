@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: sync gunicorn workers vs the ASGI serving mode (app/asgi.py).
+
+Starts each server on a local port with the replay providers as a stubbed
+upstream (every OpenWeatherMap, Gemini and YouTube call sleeps REPLAY_LATENCY,
+no network) and drives one endpoint with an asyncio HTTP client at increasing
+concurrency. A sync worker holds one request while it waits on the upstream,
+so gunicorn -w 4 plateaus at 4 in-flight requests; one uvicorn worker keeps
+scaling until its event loop runs out of CPU.
+
+The weather endpoints ask for a new location per request, with the weather
+store disabled so the run measures serving, not SQLite writes. The AI
+endpoints are authenticated as a seeded farmer and read and write the database
+around the AI call: crop-recommend loads the user and a field, awaits the
+field's forecast and a narrative recommendation, then stores it;
+plant-analyze uploads an image. The database pool is limited to
+--db-connections per instance, so more AI requests are in flight than there
+are connections.
+
+Usage:
+    python benchmarks/bench_asgi_concurrency.py [--latency-ms 200] [--concurrency 4,16,64,256]
+    python benchmarks/bench_asgi_concurrency.py --endpoint overview --servers uvicorn --uvicorn-workers 2
+    python benchmarks/bench_asgi_concurrency.py --endpoint crop-recommend --db-connections 5
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+API_SERVER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_SERVER)
+
+BOUNDARY = 'bench-boundary'
+ENDPOINTS = {
+    'current': ('GET', '/api/weather/current?location=Town{}'),
+    'overview': ('GET', '/api/weather/overview?days=5&location=Town{}'),  # two upstream calls + forecast aggregation
+    'crop-recommend': ('POST', '/api/crops/recommend'),  # DB, forecast, Gemini, DB
+    'plant-analyze': ('POST', '/api/plants/analyze'),  # DB, Gemini with an image, DB
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server, port, args):
+    if server == 'gunicorn':
+        # Sync workers, the pre-ASGI serving model
+        return [sys.executable, '-m', 'gunicorn', '--workers', str(args.gunicorn_workers), '--timeout', '120',
+                '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'main:app']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(args.uvicorn_workers),
+            '--port', str(port), '--log-level', 'warning', '--no-access-log']
+
+
+def seed(database_url):
+    """Create the schema with one farmer and field (as the servers will see it); returns a JWT for the farmer"""
+    from app.config import Config
+    from app.extensions import db
+    from app.factory import create_app
+    from app.models import Field, User
+    from app.routes.auth import generate_jwt
+
+    app = create_app(Config, ['auth'])
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == database_url
+    with app.app_context():
+        db.create_all()
+        user = User(name='Bench Farmer', phone='9000000001', password_hash='x', gender='male',
+                    state='Karnataka', city='Dharwad', age=40)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Field(user_id=user.id, name='Bench field', address='Survey No. 1', city='Dharwad',
+                             state='Karnataka', pin_code='580001', soil_type='black', soil_ph=7.2, total_area=2.0,
+                             irrigation_type='drip', water_source='borewell', latitude=15.46, longitude=75.01))
+        db.session.commit()
+        return generate_jwt(user.id)
+
+
+def request_body(endpoint):
+    """(content type, body) of the POST endpoints"""
+    if endpoint == 'crop-recommend':
+        return 'application/json', json.dumps({'field_id': 1, 'season': 'kharif', 'climate_zone': 'tropical',
+                                               'narrative': True}).encode()
+    from PIL import Image
+    image = io.BytesIO()
+    Image.new('RGB', (64, 64), (60, 140, 40)).save(image, format='JPEG')
+    body = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="image"; filename="leaf.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n').encode() + image.getvalue() + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    return f'multipart/form-data; boundary={BOUNDARY}', body
+
+
+async def get(port, path, method='GET', headers=None, body=b''):
+    """One request on a fresh connection; returns the status code"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+        for name, value in (headers or {}).items():
+            head += f'{name}: {value}\r\n'
+        if body:
+            head += f'Content-Length: {len(body)}\r\n'
+        writer.write(head.encode() + b'\r\n' + body)
+        await writer.drain()
+        response = await reader.read()
+        return int(response.split(b' ', 2)[1])
+    finally:
+        writer.close()
+
+
+async def wait_ready(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"server exited with code {process.returncode}")
+        try:
+            await get(port, '/')
+            return
+        except (OSError, IndexError, ValueError):
+            await asyncio.sleep(0.2)
+    sys.exit('server did not start')
+
+
+async def run_level(port, request, concurrency, total, offset):
+    """
+    total requests with at most `concurrency` in flight; every weather request asks for a new
+    location. request: (method, path, headers, body)
+    """
+    method, path, headers, body = request
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status = await get(port, path.format(offset + i), method, headers, body)
+            except (OSError, IndexError, ValueError):
+                status = None
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'errors': errors,
+    }
+
+
+async def bench_server(server, args, env, request):
+    port = free_port()
+    # Workers split the instance's database connections between them (app/services/db_pool.py)
+    workers = args.gunicorn_workers if server == 'gunicorn' else args.uvicorn_workers
+    env = dict(env, WEB_CONCURRENCY=str(workers))
+    process = subprocess.Popen(server_command(server, port, args), cwd=API_SERVER, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await wait_ready(port, process)
+        offset = 0
+        for concurrency in args.concurrency:
+            total = max(args.min_requests, concurrency * args.rounds)
+            result = await run_level(port, request, concurrency, total, offset)
+            offset += total
+            # Little's law: requests in flight = throughput x time per request
+            in_flight = result['rps'] * args.latency_ms / 1000
+            print(f"{server:9} {concurrency:11} {result['rps']:9.1f} {in_flight:12.1f} "
+                  f"{result['p50_ms']:8.0f}ms {result['p99_ms']:8.0f}ms {result['errors']:7}")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=int, default=200, help='Stubbed upstream latency per call')
+    parser.add_argument('--concurrency', default='4,16,64,256')
+    parser.add_argument('--endpoint', choices=ENDPOINTS, default='current')
+    parser.add_argument('--servers', default='gunicorn,uvicorn')
+    parser.add_argument('--gunicorn-workers', type=int, default=4)
+    parser.add_argument('--uvicorn-workers', type=int, default=1)
+    parser.add_argument('--rounds', type=int, default=2, help='Requests per level as a multiple of the concurrency')
+    parser.add_argument('--min-requests', type=int, default=100)
+    parser.add_argument('--db-connections', type=int, default=5,
+                        help='DB_MAX_CONNECTIONS: database connections per instance, across its workers')
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(',')]
+
+    # Headroom on every pool so the serving model, not a pool size, is what limits concurrency
+    threads = str(max(args.concurrency) * 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DB_TYPE='sqlite', DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'asgi.db')}",
+                   PROVIDER_MODE='replay', REPLAY_LATENCY=f'fixed:{args.latency_ms}', REPLAY_ERROR_RATE='0',
+                   WEATHER_STORE_ENABLED='false', WEATHER_FETCH_WORKERS=threads,
+                   HTTP_MAX_CONCURRENCY_PER_HOST=threads, ASYNC_HTTP_WORKERS=threads, ASYNC_AI_WORKERS=threads,
+                   ASGI_MAX_REQUESTS=threads, DB_MAX_CONNECTIONS=str(args.db_connections), DB_LIVENESS_INTERVAL='0',
+                   SECRET_KEY='bench', PYTHONPATH=API_SERVER, PYTHONDONTWRITEBYTECODE='1')
+        method, path = ENDPOINTS[args.endpoint]
+        headers, body = {}, b''
+        if method == 'POST':
+            # Read by app.config at import time
+            os.environ.update({name: env[name] for name in ('DB_TYPE', 'DATABASE_URL', 'DB_LIVENESS_INTERVAL', 'SECRET_KEY')})
+            content_type, body = request_body(args.endpoint)
+            headers = {'Authorization': f'Bearer {seed(env["DATABASE_URL"])}', 'Content-Type': content_type}
+        print(f"{method} {path.split('?')[0]}, upstream latency {args.latency_ms} ms per call, "
+              f"{args.db_connections} database connections\n")
+        print(f"{'server':9} {'concurrency':>11} {'req/s':>9} {'in flight':>12} {'p50':>10} {'p99':>10} {'errors':>7}")
+        for server in args.servers.split(','):
+            asyncio.run(bench_server(server, args, env, (method, path, headers, body)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local crop-suitability engine.
+
+Scores the full crop knowledge table against randomly drawn field conditions
+(soil, pH, irrigation, season, climate zone and temperature) and reports the
+per-call latency of scoring alone and of a full top-5 recommendation.
+
+Usage:
+    python benchmarks/bench_crop_engine.py [--calls 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.crop_engine import crop_engine, SOILS, SEASONS, CLIMATE_ZONES, IRRIGATION_WATER_MM  # noqa: E402
+
+
+def random_conditions(rng):
+    return {
+        'soil_type': rng.choice(SOILS + ['sandy loam', 'clay loam', None]),
+        'soil_ph': rng.choice([None, round(rng.uniform(4.5, 8.5), 1)]),
+        'irrigation_type': rng.choice(list(IRRIGATION_WATER_MM) + [None]),
+        'season': rng.choice(SEASONS + ['current']),
+        'climate_zone': rng.choice(list(CLIMATE_ZONES) + [None]),
+        'weather': rng.choice([None, {'temperature': round(rng.uniform(5, 40), 1)}]),
+    }
+
+
+def time_calls(func, conditions):
+    latencies = []
+    for kwargs in conditions:
+        start = time.perf_counter()
+        func(**kwargs)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'mean_us': sum(latencies) / len(latencies) * 1e6,
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p99_us': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    conditions = [random_conditions(rng) for _ in range(args.calls)]
+
+    print(f"{len(crop_engine.crops)} crops, {args.calls} calls")
+    print(f"{'operation':12} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+    for name, func in (('score', crop_engine.score), ('recommend', crop_engine.recommend)):
+        result = time_calls(func, conditions)
+        print(f"{name:12} {result['mean_us']:9.1f} {result['p50_us']:9.1f} {result['p99_us']:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark daily forecast aggregation over many locations.
+
+Builds 5-day / 3-hourly OpenWeatherMap payloads from the replay recording for
+N locations with different timezone offsets, then times aggregating all of
+them in one vectorized pass against aggregating them one payload at a time.
+
+Usage:
+    python benchmarks/bench_forecast_aggregation.py [--locations 300]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.forecast_aggregation import aggregate_daily  # noqa: E402
+
+REPLAY_FORECAST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'app', 'data', 'replay', 'weather_forecast.json')
+
+
+def build_payloads(count):
+    with open(REPLAY_FORECAST, 'r') as f:
+        recordings = json.load(f)
+    payloads = []
+    for i in range(count):
+        payload = copy.deepcopy(recordings[i % len(recordings)])
+        payload['city']['timezone'] = 19800 if i % 3 else 20700
+        for slot, item in enumerate(payload['list']):
+            item.pop('dt_txt', None)
+            item['dt'] = 1760000000 + slot * 10800
+        payloads.append(payload)
+    return payloads
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--locations', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.locations)
+    batched = timed(lambda: aggregate_daily(payloads, 5), args.repeat)
+    single = timed(lambda: [aggregate_daily([payload], 5) for payload in payloads], args.repeat)
+
+    print(f"{args.locations} locations x {len(payloads[0]['list'])} slots")
+    print(f"one pass:      {batched:8.2f} ms")
+    print(f"per location:  {single:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the geohash spatial index over Field coordinates.
+
+Loads synthetic fields clustered around Indian district centres into a temporary
+SQLite database, then times radius, nearest-N and bounding-box queries through
+the index against a full-table scan, checking both return the same fields.
+
+Usage:
+    python benchmarks/bench_geo_index.py [--fields 200000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import User, Field  # noqa: E402
+from app.services.geo_index import (encode, fields_within_radius, nearest_fields, fields_in_bbox,  # noqa: E402
+                                    haversine_km)
+
+
+def build_app(path):
+    app = Flask('bench_geo_index')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    return app
+
+
+def load_fields(count, rng):
+    db.session.add(User(password_hash='x', gender='x', state='x', city='x', age=1, phone='0', name='bench'))
+    db.session.flush()
+    centres = [(rng.uniform(8, 32), rng.uniform(70, 92)) for _ in range(600)]
+    rows = []
+    for i in range(count):
+        lat, lon = rng.choice(centres)
+        lat, lon = lat + rng.gauss(0, 0.15), lon + rng.gauss(0, 0.15)
+        rows.append({'user_id': 1, 'name': f'f{i}', 'address': '-', 'city': '-', 'state': '-', 'pin_code': '-',
+                     'soil_type': 'loam', 'total_area': 1.0, 'latitude': lat, 'longitude': lon,
+                     'geohash': encode(lat, lon)})
+    db.session.bulk_insert_mappings(Field, rows)
+    db.session.commit()
+    return centres
+
+
+def scan(latitude, longitude):
+    rows = db.session.query(Field.id, Field.latitude, Field.longitude).all()
+    ids = np.array([row.id for row in rows])
+    distances = haversine_km(latitude, longitude, np.array([row.latitude for row in rows]),
+                             np.array([row.longitude for row in rows]))
+    return ids, distances
+
+
+def timed(func, args_list):
+    start = time.perf_counter()
+    results = [func(*args) for args in args_list]
+    return (time.perf_counter() - start) / len(args_list) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--radius-km', type=float, default=10.0)
+    parser.add_argument('--nearest', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'geo.db'))
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            centres = load_fields(args.fields, rng)
+            print(f"loaded {args.fields} fields in {time.perf_counter() - start:.1f}s")
+
+            points = []
+            for _ in range(args.queries):
+                lat, lon = rng.choice(centres)
+                points.append((lat + rng.gauss(0, 0.2), lon + rng.gauss(0, 0.2)))
+
+            radius_ms, radius_results = timed(lambda lat, lon: fields_within_radius(lat, lon, args.radius_km), points)
+            nearest_ms, nearest_results = timed(lambda lat, lon: nearest_fields(lat, lon, args.nearest), points)
+            bbox_ms, _ = timed(lambda lat, lon: fields_in_bbox(lat - 0.1, lon - 0.1, lat + 0.1, lon + 0.1), points)
+            checks = points[:min(20, len(points))]
+            scan_ms, scans = timed(scan, checks)
+
+            for (ids, distances), radius, nearest in zip(scans, radius_results, nearest_results):
+                assert sorted(ids[distances <= args.radius_km].tolist()) == sorted(r['field_id'] for r in radius)
+                expected = np.sort(distances)[:args.nearest]
+                assert np.allclose(expected, [r['distance_km'] for r in nearest], atol=1e-3)
+
+            print(f"{'query':24} {'ms/query':>9}")
+            print(f"{'radius ' + str(args.radius_km) + ' km':24} {radius_ms:9.2f}")
+            print(f"{'nearest ' + str(args.nearest):24} {nearest_ms:9.2f}")
+            print(f"{'bbox 0.2 deg':24} {bbox_ms:9.2f}")
+            print(f"{'full scan':24} {scan_ms:9.2f}")
+            print(f"results match full scan for {len(checks)} points")
+
+
+if __name__ == '__main__':
+    main()
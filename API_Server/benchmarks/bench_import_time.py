@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark worker startup: import time of `main` measured with `python -X importtime`.
+
+Imports `main` in fresh interpreters (SQLite config, no network), keeps the
+fastest run, prints the slowest modules by cumulative time and exits non-zero
+when `main` takes longer than the budget or when an SDK that is meant to load
+lazily (Vertex AI, Google Generative AI, Firebase Admin) is imported at startup.
+Use it as a CI gate against cold-start regressions.
+
+Usage:
+    python benchmarks/bench_import_time.py [--budget-ms 1500] [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+API_SERVER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that must only be imported on first use (see app/services/lazy_sdk.py)
+LAZY_MODULES = ('vertexai', 'google.cloud.aiplatform', 'google.generativeai', 'firebase_admin')
+
+
+def import_times(env):
+    """{module: (self us, cumulative us)} for one `import main`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=API_SERVER, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode:
+        sys.exit(f"import main failed:\n{result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_TIME_BUDGET_MS', 1500)))
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DB_TYPE='sqlite', DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'import.db')}",
+                   PYTHONDONTWRITEBYTECODE='1')
+        runs = [import_times(env) for _ in range(args.runs)]
+    best = min(runs, key=lambda times: times['main'][1])
+    total_ms = best['main'][1] / 1000
+
+    print(f"{'module':48} {'self':>9} {'cumulative':>11}")
+    for name, (own, cumulative) in sorted(best.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:48} {own / 1000:8.1f}ms {cumulative / 1000:10.1f}ms")
+    print(f"\nimport main: {total_ms:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    eager = [name for name in best if name.startswith(LAZY_MODULES)]
+    if eager:
+        failures.append(f"lazily loaded SDKs imported at startup: {', '.join(sorted(eager)[:5])}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding and response compression on the list endpoints.
+
+Seeds a temporary SQLite database with one farmer's fields and crops plus a scheme
+catalog, calls each list endpoint once to capture the exact payload it serializes,
+then reports per endpoint:
+
+1. Encode time with Flask's stock json provider vs FastJSONProvider (orjson)
+2. Bytes on the wire raw, gzip and brotli, with the time to compress
+3. Estimated transfer time of each body over a slow rural link
+
+Usage:
+    python benchmarks/bench_json_compression.py [--fields 20] [--crops 200] [--schemes 500] [--limit 200]
+    python benchmarks/bench_json_compression.py --link-kbps 50 --link-kbps 384
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from benchmarks.bench_scheme_search import CROPS, STATES, percentiles, synthetic_scheme  # noqa: E402
+
+
+class CapturingJSONProvider:
+    """Mixin recording the object each jsonify() call serializes"""
+
+    captured = []
+
+    def _prepare_response_obj(self, args, kwargs):
+        obj = super()._prepare_response_obj(args, kwargs)
+        self.captured.append(obj)
+        return obj
+
+
+def seed(args):
+    from app.extensions import db
+    from app.models import Crop, FarmerScheme, Field, User
+
+    rng = random.Random(args.seed)
+    user = User(name='Ramesh Kumar', phone='9000000001', password_hash='x', gender='male',
+                state='Karnataka', city='Dharwad', age=42)
+    db.session.add(user)
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(Field, [{
+        'id': i + 1, 'user_id': user.id, 'name': f"Field {i + 1} / खेत {i + 1}",
+        'address': f"Survey No. {rng.randint(1, 999)}, Near Panchayat Office", 'city': 'Dharwad',
+        'state': rng.choice(STATES), 'pin_code': f"580{rng.randint(0, 999):03d}",
+        'soil_type': rng.choice(['black', 'red', 'alluvial', 'laterite']), 'soil_ph': round(rng.uniform(5.5, 8.5), 1),
+        'total_area': round(rng.uniform(0.5, 10), 2), 'irrigation_type': rng.choice(['drip', 'sprinkler', 'flood']),
+        'water_source': rng.choice(['borewell', 'canal', 'rain-fed']), 'latitude': 15.45 + rng.random() / 10,
+        'longitude': 75.0 + rng.random() / 10, 'coordinates_source': 'gps', 'created_at': now, 'updated_at': now,
+    } for i in range(args.fields)])
+    db.session.bulk_insert_mappings(Crop, [{
+        'field_id': rng.randint(1, args.fields), 'crop_type': rng.choice(CROPS), 'variety': f"Var-{rng.randint(1, 50)}",
+        'sowing_date': date(2026, 6, 1) + timedelta(days=rng.randint(0, 90)),
+        'expected_harvest_date': date(2026, 10, 1) + timedelta(days=rng.randint(0, 90)),
+        'area': round(rng.uniform(0.2, 3), 2), 'subsidy_eligible': rng.random() < 0.3, 'growth_stage': 'vegetative',
+        'expected_yield': round(rng.uniform(5, 40), 1), 'notes': 'Applied urea after first irrigation',
+        'created_at': now, 'updated_at': now,
+    } for _ in range(args.crops)])
+    db.session.bulk_insert_mappings(FarmerScheme, [synthetic_scheme(rng) for _ in range(args.schemes)])
+    db.session.commit()
+    return user.id
+
+
+def timed(func, obj, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(obj)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=20)
+    parser.add_argument('--crops', type=int, default=200)
+    parser.add_argument('--schemes', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=200, help='Schemes per page')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--link-kbps', type=int, action='append', help='Link speeds to estimate (default 50, 384)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    # Read by app.config at import time
+    os.environ.update(DB_TYPE='sqlite', DATABASE_URL=f"sqlite:///{os.path.join(tmp.name, 'bench.db')}",
+                      DB_LIVENESS_INTERVAL='0', COMPRESS_ENABLED='false')
+
+    from app.config import Config
+    from app.extensions import db
+    from app.factory import create_app
+    from app.routes.auth import generate_jwt
+    from app.services import compression
+    from app.services.json_provider import FastJSONProvider, orjson
+
+    app = create_app(Config, ['crops', 'fields', 'help_farmer'])
+    app.json = type('CapturingFastJSONProvider', (CapturingJSONProvider, FastJSONProvider), {})(app)
+    with app.app_context():
+        db.create_all()
+        token = generate_jwt(seed(args))
+
+    endpoints = ['/api/crops/list', '/api/fields/list', f"/api/farmer_schemes/schemes?limit={args.limit}"]
+    client = app.test_client()
+    payloads = {}
+    for endpoint in endpoints:
+        app.json.captured.clear()
+        response = client.get(endpoint, headers={'Authorization': f"Bearer {token}"})
+        assert response.status_code == 200, (endpoint, response.status_code, response.get_data(as_text=True))
+        payloads[endpoint] = app.json.captured[-1]
+
+    stock, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+    links = args.link_kbps or [50, 384]
+    encodings = compression.ENCODINGS[::-1]
+    print(f"orjson: {'yes' if orjson is not None else 'not installed'}, "
+          f"encodings: {', '.join(encodings)} (gzip level {compression.COMPRESS_GZIP_LEVEL}, "
+          f"brotli quality {compression.COMPRESS_BROTLI_QUALITY})\n")
+    for endpoint, obj in payloads.items():
+        # Flask's stock provider cannot encode date objects; give it the pre-change ISO strings
+        stock_obj = stock.loads(fast.dumps(obj))
+        stock_dumps = lambda o: stock.dumps(o, separators=(',', ':')).encode('utf-8')  # as in stock jsonify()
+        stock_ms = timed(stock_dumps, stock_obj, args.repeat)
+        fast_ms = timed(fast.dumps_bytes, obj, args.repeat)
+        stock_bytes = len(stock_dumps(stock_obj))
+        body = fast.dumps_bytes(obj)
+        print(endpoint)
+        print(f"  encode   stdlib {stock_ms:7.3f} ms   fast {fast_ms:7.3f} ms   ({stock_ms / fast_ms:.1f}x)")
+        sizes = [('stdlib', stock_bytes, None), ('fast', len(body), None)]
+        for encoding in encodings:
+            compress_ms = timed(lambda data: compression.compress(data, encoding), body, max(1, args.repeat // 10))
+            sizes.append((encoding, len(compression.compress(body, encoding)), compress_ms))
+        for name, size, compress_ms in sizes:
+            transfer = '   '.join(f"{size * 8 / kbps:7.0f} ms @ {kbps} kbps" for kbps in links)
+            cost = f"+{compress_ms:.2f} ms" if compress_ms is not None else ''
+            print(f"  {name:<7}{size:>9,} B  {cost:<10}  {transfer}")
+        print()
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark the logging overhead of the hot read endpoints.
+
+Seeds a temporary SQLite database with one farmer's fields and crops, then times each
+endpoint with logging switched off entirely (the baseline) and under each logging mode:
+
+    warning      LOG_LEVEL=WARNING: INFO calls are dropped at the level check
+    info-1%      LOG_LEVEL=INFO with LOG_SAMPLE_RATE=0.01
+    info         LOG_LEVEL=INFO, every line through the background queue handler
+    info-sync    LOG_LEVEL=INFO written on the request thread (the previous setup)
+
+Output goes to /dev/null, so the numbers are the cost on the request thread. Also times a
+single filtered call written as an f-string vs with %-style arguments.
+
+Usage:
+    python benchmarks/bench_logging.py [--fields 20] [--crops 200] [--requests 100] [--rounds 5]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_json_compression import seed  # noqa: E402
+from benchmarks.bench_scheme_search import percentiles  # noqa: E402
+
+MODES = ('warning', 'info-1%', 'info', 'info-sync')
+
+
+def configure(mode, structured_logging, devnull):
+    """Set levels, sample rate and handler for one of MODES (or off)"""
+    logging.disable(logging.CRITICAL if mode == 'off' else logging.NOTSET)
+    level = logging.WARNING if mode == 'warning' else logging.INFO
+    root = logging.getLogger()
+    for logger in (root, logging.getLogger('app.factory')):
+        logger.setLevel(level)
+    structured_logging.LOG_SAMPLE_RATE = 0.01 if mode == 'info-1%' else 1.0
+
+    handler = structured_logging.log_handler
+    root.handlers = [handler]
+    if mode == 'info-sync':
+        # The stream handler itself on the request thread
+        sync = logging.StreamHandler(devnull)
+        sync.setFormatter(handler.target.formatter)
+        sync.addFilter(structured_logging.RequestContextFilter())
+        root.handlers = [sync]
+
+
+def time_requests(client, endpoint, headers, requests):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(endpoint, headers=headers)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200, (endpoint, response.status_code)
+    return percentiles(samples)
+
+
+def filtered_call_cost(calls):
+    """Microseconds per INFO call on a WARNING logger, eager f-string vs lazy arguments"""
+    logger = logging.getLogger('bench.filtered')
+    logger.setLevel(logging.WARNING)
+    crop = {'id': 42, 'crop_type': 'paddy', 'sowing_date': '2026-06-15', 'area': 1.5}
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info(f"📊 Processing crop {i + 1}: ID={crop['id']}, type={crop['crop_type']}, data={crop}")
+    eager = (time.perf_counter() - start) / calls * 1e6
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info("📊 Processing crop %s: ID=%s, type=%s, data=%s", i + 1, crop['id'], crop['crop_type'], crop)
+    lazy = (time.perf_counter() - start) / calls * 1e6
+    return eager, lazy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=20)
+    parser.add_argument('--crops', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=100, help='Requests per mode and round')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    args.schemes = 0
+
+    tmp = tempfile.TemporaryDirectory()
+    # Read by app.config at import time
+    os.environ.update(DB_TYPE='sqlite', DATABASE_URL=f"sqlite:///{os.path.join(tmp.name, 'bench.db')}",
+                      DB_LIVENESS_INTERVAL='0', COMPRESS_ENABLED='false', LOG_FORMAT='json')
+
+    from app.config import Config
+    from app.extensions import db
+    from app.factory import create_app
+    from app.routes.auth import generate_jwt
+    from app.services import structured_logging
+
+    app = create_app(Config, ['crops', 'fields', 'farmer'])
+    with app.app_context():
+        db.create_all()
+        headers = {'Authorization': f"Bearer {generate_jwt(seed(args))}"}
+
+    devnull = open(os.devnull, 'w')
+    structured_logging.log_handler.target.setStream(devnull)
+    client = app.test_client()
+    endpoints = ['/api/farmer/dashboard', '/api/crops/list', '/api/fields/list']
+
+    print(f"{args.fields} fields, {args.crops} crops; best median ms per request over {args.rounds} rounds, "
+          f"overhead vs logging off\n")
+    print(f"{'endpoint':<24}{'off':>8}" + ''.join(f"{mode:>18}" for mode in MODES))
+    for endpoint in endpoints:
+        configure('off', structured_logging, devnull)
+        time_requests(client, endpoint, headers, 20)
+        # Modes are interleaved so drift on the machine affects all of them alike
+        best = {}
+        for _ in range(args.rounds):
+            for mode in ('off',) + MODES:
+                configure(mode, structured_logging, devnull)
+                median, _ = time_requests(client, endpoint, headers, args.requests)
+                best[mode] = min(best.get(mode, median), median)
+        base = best['off']
+        row = f"{endpoint:<24}{base:>8.2f}"
+        for mode in MODES:
+            row += f"{f'{best[mode]:.2f} {best[mode] - base:+.2f}':>18}"
+        print(row)
+
+    configure('warning', structured_logging, devnull)
+    eager, lazy = filtered_call_cost(args.calls)
+    print(f"\nfiltered INFO call at WARNING: f-string {eager:.2f} us, %-style {lazy:.2f} us")
+    stats = structured_logging.log_stats.snapshot()
+    print(f"records written {stats['written']}, sampled out {stats['sampled_out']}, dropped {stats['dropped']}")
+    structured_logging.log_handler.stop()
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline PIN code lookups.
+
+Compiles a synthetic all-India directory (one PIN per post office sorting area,
+several offices each) into a memory-mapped gazetteer in a temporary directory,
+then times single lookups for known PINs, PINs that fall back to their district
+centroid, and malformed input.
+
+Usage:
+    python benchmarks/bench_pincode_gazetteer.py [--pins 19000] [--lookups 200000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pincode_gazetteer import PincodeGazetteer, build_gazetteer  # noqa: E402
+
+
+def write_directory(path, pins, rng):
+    """India Post style CSV: several offices per PIN, scattered around a district centre"""
+    districts = {}
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['officename', 'pincode', 'districtname', 'statename', 'latitude', 'longitude'])
+        for pin in pins:
+            centre = districts.setdefault(pin[:3], (rng.uniform(8, 32), rng.uniform(70, 92)))
+            for office in range(rng.randint(1, 6)):
+                writer.writerow([f'Office {office}', pin, f'District {pin[:3]}', 'State',
+                                 round(centre[0] + rng.gauss(0, 0.2), 6), round(centre[1] + rng.gauss(0, 0.2), 6)])
+
+
+def timed(func, values):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    return (time.perf_counter() - start) / len(values) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pins', type=int, default=19000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    prefixes = rng.sample(range(110, 860), 400)
+    pins = rng.sample(sorted({f'{rng.choice(prefixes)}{rng.randint(0, 999):03d}' for _ in range(args.pins * 2)}), args.pins)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, compiled = os.path.join(tmp, 'directory.csv'), os.path.join(tmp, 'gazetteer.bin')
+        write_directory(source, pins, rng)
+        start = time.perf_counter()
+        coverage = build_gazetteer([source], compiled)
+        print(f"built {coverage} in {time.perf_counter() - start:.2f}s, {os.path.getsize(compiled) / 1024:.0f} KiB")
+
+        start = time.perf_counter()
+        gazetteer = PincodeGazetteer.from_file(compiled)
+        print(f"opened in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        known = [rng.choice(pins) for _ in range(args.lookups)]
+        known_set = set(pins)
+        fallback = [pin for pin in (f'{rng.choice(prefixes)}{rng.randint(0, 999):03d}' for _ in range(args.lookups * 2))
+                    if pin not in known_set][:args.lookups]
+        malformed = [rng.choice(['', 'N/A', 'Pune', '41100', None]) for _ in range(args.lookups)]
+
+        assert all(gazetteer.lookup(pin)['precision'] == 'pincode' for pin in known[:1000])
+        assert all(gazetteer.lookup(pin)['precision'] == 'district' for pin in fallback[:1000])
+
+        print(f"{'lookup':24} {'us/lookup':>9}")
+        print(f"{'known PIN':24} {timed(gazetteer.lookup, known):9.2f}")
+        print(f"{'district fallback':24} {timed(gazetteer.lookup, fallback):9.2f}")
+        print(f"{'malformed':24} {timed(gazetteer.lookup, malformed):9.2f}")
+        print(f"{'PIN in free text':24} {timed(gazetteer.lookup, ['Baramati ' + pin for pin in known]):9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Offline load benchmark for the AgriAssist API using the replay providers.
+No network, Vertex AI or API keys are needed - every AI, weather and tutorial
+call is served from app/data/replay.
+
+Usage:
+    python benchmarks/bench_replay_load.py --requests 2000 --concurrency 16
+    REPLAY_LATENCY=lognormal:40,0.5 REPLAY_ERROR_RATE=0.02 python benchmarks/bench_replay_load.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PROVIDER_MODE', 'replay')
+os.environ.setdefault('DB_TYPE', 'sqlite')
+
+from main import app  # noqa: E402
+
+ENDPOINTS = [
+    '/api/crops/suitable?location=Pune&season=kharif',
+    '/api/weather/current?location=Pune',
+    '/api/weather/forecast?location=Nashik&days=5',
+    '/api/weather/overview?location=Nashik&days=5',
+    '/api/farmer_schemes/tutorials/popular?language=hindi',
+]
+
+
+def run_endpoint(path, total, concurrency):
+    def worker(count):
+        client = app.test_client()
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f'{path} returned {response.status_code}')
+        return latencies
+
+    per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(l for batch in pool.map(worker, per_worker) for l in batch)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'rps': total / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':55} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for path in ENDPOINTS:
+        result = run_endpoint(path, args.requests, args.concurrency)
+        print(f"{path:55} {result['rps']:9.0f} {result['p50_ms']:8.2f} {result['p99_ms']:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
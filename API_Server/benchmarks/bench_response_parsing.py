@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark AI response parsing on a corpus of recorded model responses.
+
+Compares the previous parser (first '{' to last '}' + json.loads) with the
+tolerant single-pass extractor and schema validation, reporting parse time
+and fallback rate. The corpus is built from app/data/replay recordings plus
+the distortions seen in production: prose and code fences around the JSON,
+trailing commas and output truncated at arbitrary points.
+
+Usage:
+    python benchmarks/bench_response_parsing.py [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.json_extractor import extract_json  # noqa: E402
+from app.services.response_schemas import normalize_plant_analysis, normalize_crop_recommendations  # noqa: E402
+
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'data', 'replay')
+
+
+def legacy_parse(text):
+    """Previous behaviour: returns None when the canned fallback would have been used"""
+    if '{' not in text or '}' not in text:
+        return None
+    try:
+        return json.loads(text[text.find('{'):text.rfind('}') + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def build_corpus(seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for channel, normalize in [('plant_analysis', normalize_plant_analysis),
+                               ('crop_recommendations', normalize_crop_recommendations)]:
+        with open(os.path.join(REPLAY_DIR, f'{channel}.json')) as f:
+            recordings = json.load(f)
+        for text in recordings:
+            raw = extract_json(text)
+            compact = json.dumps(raw, ensure_ascii=False)
+            pretty = json.dumps(raw, indent=2, ensure_ascii=False)
+            variants = [
+                text,
+                compact,
+                f'```json\n{pretty}\n```',
+                f'Here is the analysis you asked for:\n{pretty}\nLet me know if you need more detail.',
+                pretty.replace('\n}', ',\n}'),
+                compact.replace(']', ',]'),
+            ]
+            # Truncated outputs (token limit hit mid-response), kept only past the first key
+            for _ in range(6):
+                cut = rng.randint(len(compact) // 3, len(compact) - 2)
+                variants.append(compact[:cut])
+            corpus.extend((variant, normalize) for variant in variants)
+    return corpus
+
+
+def run(parser, corpus, repeat):
+    fallbacks = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fallbacks = 0
+        for text, normalize in corpus:
+            if normalize(parser(text)) is None:
+                fallbacks += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(corpus)) * 1e6, fallbacks / len(corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    print(f"Corpus: {len(corpus)} responses")
+    print(f"{'parser':22} {'us/response':>12} {'fallback rate':>14}")
+    for name, func in [('legacy first/last', legacy_parse), ('tolerant extractor', extract_json)]:
+        per_call_us, fallback_rate = run(func, corpus, args.repeat)
+        print(f"{name:22} {per_call_us:12.1f} {fallback_rate:14.1%}")
+
+
+if __name__ == '__main__':
+    main()
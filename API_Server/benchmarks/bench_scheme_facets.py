@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark faceted scheme listings: in-memory bitsets vs SQL filters and GROUP BY.
+
+Generates a synthetic scheme catalog in a temporary SQLite database, then times a
+filtered listing page together with counts for every facet (state, category,
+status, launch period), answered from the facet bitsets and by the equivalent
+ILIKE filters plus one GROUP BY per facet.
+
+Usage:
+    python benchmarks/bench_scheme_facets.py [--schemes 10000] [--repeat 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import FarmerScheme  # noqa: E402
+from app.services.scheme_facets import scheme_facets  # noqa: E402
+from benchmarks.bench_scheme_search import synthetic_scheme  # noqa: E402
+
+FILTERS = [
+    {},
+    {'state_central': 'Karnataka'},
+    {'category': 'insurance'},
+    {'state_central': 'Pradesh', 'status': 'Active'},
+    {'category': 'Irrigation', 'status': 'Active', 'launch_period': '2015'},
+]
+COLUMNS = {'state_central': FarmerScheme.state_central, 'category': FarmerScheme.scheme_category,
+           'status': FarmerScheme.status}
+
+
+def sql_listing(filters, limit):
+    """The former per-request queries: filtered page, total, and a GROUP BY per facet"""
+    def filtered(query, skip=None):
+        for facet, needle in filters.items():
+            if facet == skip:
+                continue
+            if facet == 'launch_period':
+                start = int(needle) - int(needle) % 5
+                query = query.filter(FarmerScheme.launch_year.between(start, start + 4))
+            else:
+                query = query.filter(COLUMNS[facet].ilike(f'%{needle}%'))
+        return query
+
+    page = [scheme.to_dict() for scheme in filtered(FarmerScheme.query).order_by(FarmerScheme.id).limit(limit)]
+    total = filtered(FarmerScheme.query).count()
+    facets = {}
+    for facet, column in list(COLUMNS.items()) + [('launch_period', FarmerScheme.launch_year)]:
+        facets[facet] = filtered(db.session.query(column, db.func.count(FarmerScheme.id)), facet).group_by(column).all()
+    return total, page, facets
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schemes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask('bench_scheme_facets')
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'schemes.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.bulk_insert_mappings(FarmerScheme, [synthetic_scheme(rng) for _ in range(args.schemes)])
+            db.session.commit()
+
+            start = time.perf_counter()
+            index = scheme_facets.index()
+            print(f"warm-up (catalog load, search index and facet bitsets) {time.perf_counter() - start:.2f}s")
+
+            print(f"{'filters':58} {'bitset p50':>10} {'p99':>8} {'total':>6}   {'SQL p50':>9} {'total':>6}")
+            for filters in FILTERS:
+                bitset_times, sql_times = [], []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    total, _, _ = index.listing(filters, args.limit)
+                    bitset_times.append(time.perf_counter() - start)
+                for _ in range(max(1, args.repeat // 10)):
+                    start = time.perf_counter()
+                    sql_total, _, _ = sql_listing(filters, args.limit)
+                    sql_times.append(time.perf_counter() - start)
+                p50, p99 = percentiles(bitset_times)
+                label = ', '.join(f'{k}={v}' for k, v in filters.items()) or '(none)'
+                print(f"{label:58} {p50:9.3f}ms {p99:7.3f}ms {total:6}   {percentiles(sql_times)[0]:8.2f}ms {sql_total:6}")
+
+
+if __name__ == '__main__':
+    main()
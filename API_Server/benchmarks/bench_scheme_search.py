@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark scheme search: BM25 inverted index vs the ILIKE scan it replaced.
+
+Generates a synthetic scheme catalog in a temporary SQLite database, builds the
+in-memory index, then times the same queries through the index (ranked, with
+highlights) and through the former three-column ILIKE '%term%' query.
+
+Usage:
+    python benchmarks/bench_scheme_search.py [--schemes 10000] [--repeat 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import FarmerScheme  # noqa: E402
+from app.services.scheme_search import scheme_search  # noqa: E402
+
+STATES = ['Central', 'Bihar', 'Karnataka', 'Maharashtra', 'Punjab', 'Odisha', 'Tamil Nadu', 'Uttar Pradesh',
+          'Rajasthan', 'Gujarat', 'Assam', 'Kerala', 'Telangana', 'Madhya Pradesh', 'West Bengal']
+CATEGORIES = ['Crop Insurance', 'Credit', 'Irrigation', 'Market Support', 'Mechanization', 'Organic Farming',
+              'Soil Health', 'Horticulture', 'Livestock', 'Fisheries', 'Income Support', 'Storage']
+CROPS = ['paddy', 'wheat', 'pulses', 'cotton', 'sugarcane', 'millets', 'oilseeds', 'maize', 'vegetables',
+         'fruits', 'spices', 'jute', 'tea', 'coffee', 'coconut']
+TOPICS = ['drip irrigation', 'sprinkler irrigation', 'crop insurance', 'interest subvention', 'soil testing',
+          'farm machinery', 'cold storage', 'organic certification', 'seed distribution', 'solar pumps',
+          'warehouse receipts', 'dairy development', 'fish ponds', 'micro irrigation', 'crop loans',
+          'price support', 'custom hiring centres', 'watershed development', 'polyhouse cultivation']
+BENEFICIARIES = ['small and marginal farmers', 'women farmers', 'tenant farmers', 'landless labourers',
+                 'farmer producer organisations', 'self help groups', 'SC/ST farmers', 'all farmers',
+                 'young agri-entrepreneurs', 'fishermen', 'dairy farmers']
+NAME_WORDS = ['Pradhan Mantri', 'Mukhyamantri', 'Rashtriya', 'Krishi', 'Kisan', 'Samman', 'Vikas', 'Sinchai',
+              'Bima', 'Samriddhi', 'Unnati', 'Shakti', 'Mission', 'Yojana', 'Abhiyan', 'Scheme']
+
+QUERIES = ['drip irrigation', 'crop insurance for paddy', 'subsidy', 'women farmers', 'solar pump subsidy',
+           'loans', 'organic', 'cold storage for fruits', 'machinery', 'kisan samman', 'फसल बीमा', 'sinchai yojana']
+
+
+def synthetic_scheme(rng):
+    crop, topic = rng.choice(CROPS), rng.choice(TOPICS)
+    sentences = [
+        f"Provides financial assistance for {topic} to {rng.choice(BENEFICIARIES)} growing {crop}.",
+        f"Subsidy of {rng.choice([25, 40, 50, 75, 90])}% on {rng.choice(TOPICS)} with support for {rng.choice(CROPS)}.",
+        f"Aims to increase farm income and productivity through {rng.choice(TOPICS)} and {rng.choice(TOPICS)}.",
+        f"Beneficiaries apply through the district agriculture office or the online portal.",
+    ]
+    rng.shuffle(sentences)
+    return {
+        'scheme_category': rng.choice(CATEGORIES),
+        'state_central': rng.choice(STATES),
+        'scheme_name': ' '.join(rng.sample(NAME_WORDS, 3)) + f' {topic.title()}',
+        'implementing_agency': f"Department of {rng.choice(['Agriculture', 'Horticulture', 'Animal Husbandry', 'Fisheries'])}",
+        'objective': ' '.join(sentences[:rng.randint(2, 4)]),
+        'budget_benefits': f"Rs {rng.randint(1, 500)} crore",
+        'target_beneficiaries': rng.choice(BENEFICIARIES).capitalize(),
+        'official_website': 'https://example.gov.in',
+        'launch_year': rng.randint(1995, 2024),
+        'status': rng.choice(['Active', 'Active', 'Active', 'Closed']),
+    }
+
+
+def ilike_search(term):
+    schemes = FarmerScheme.query.filter(
+        db.or_(
+            FarmerScheme.scheme_name.ilike(f'%{term}%'),
+            FarmerScheme.objective.ilike(f'%{term}%'),
+            FarmerScheme.target_beneficiaries.ilike(f'%{term}%')
+        )
+    ).order_by(FarmerScheme.scheme_name).all()
+    return [scheme.to_dict() for scheme in schemes]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schemes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask('bench_scheme_search')
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'schemes.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.bulk_insert_mappings(FarmerScheme, [synthetic_scheme(rng) for _ in range(args.schemes)])
+            db.session.commit()
+
+            start = time.perf_counter()
+            index = scheme_search.index()
+            print(f"built index over {len(index)} schemes in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+            print(f"{'query':26} {'index p50':>10} {'p99':>8} {'hits':>6}   {'ILIKE p50':>10} {'hits':>6}")
+            for query in QUERIES:
+                index_times, ilike_times = [], []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    total, _ = scheme_search.search(query, args.limit)
+                    index_times.append(time.perf_counter() - start)
+                for _ in range(max(1, args.repeat // 10)):
+                    start = time.perf_counter()
+                    ilike_hits = len(ilike_search(query))
+                    ilike_times.append(time.perf_counter() - start)
+                index_p50, index_p99 = percentiles(index_times)
+                print(f"{query:26} {index_p50:9.3f}ms {index_p99:7.3f}ms {total:6}   "
+                      f"{percentiles(ilike_times)[0]:9.2f}ms {ilike_hits:6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark semantic scheme retrieval: TF-IDF + truncated SVD embeddings.
+
+Generates a synthetic scheme catalog in a temporary SQLite database, times the
+embedding build (TF-IDF, randomized SVD), then times situation-style queries
+answered by one float32 matrix-vector product.
+
+Usage:
+    python benchmarks/bench_semantic_search.py [--schemes 10000] [--repeat 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import FarmerScheme  # noqa: E402
+from app.services.semantic_search import scheme_semantic  # noqa: E402
+from benchmarks.bench_scheme_search import synthetic_scheme, percentiles  # noqa: E402
+
+QUERIES = ['my cotton was eaten by worms and I need money for seeds', 'need water for my fields in summer',
+           'loan to buy a tractor', 'I am a woman farmer with two acres', 'want to start fish farming',
+           'खेत की सिंचाई के लिए मदद', 'beej aur khaad chahiye']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schemes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask('bench_semantic_search')
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'schemes.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.bulk_insert_mappings(FarmerScheme, [synthetic_scheme(rng) for _ in range(args.schemes)])
+            db.session.commit()
+
+            start = time.perf_counter()
+            index = scheme_semantic.index()
+            print(f"embedded {len(index)} schemes ({len(index.vocabulary)} terms) into {index.dimensions} "
+                  f"dimensions in {(time.perf_counter() - start) * 1000:.0f} ms "
+                  f"({index.vectors.nbytes / 1e6:.1f} MB of float32 vectors)")
+
+            print(f"{'query':56} {'p50':>9} {'p99':>9} {'hits':>5} {'best':>6}")
+            for query in QUERIES:
+                times = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    _, results, _ = scheme_semantic.search(query, args.limit)
+                    times.append(time.perf_counter() - start)
+                p50, p99 = percentiles(times)
+                best = results[0][1] if results else 0.0
+                print(f"{query[:56]:56} {p50:8.3f}ms {p99:8.3f}ms {len(results):5} {best:6.3f}")
+
+
+if __name__ == '__main__':
+    main()
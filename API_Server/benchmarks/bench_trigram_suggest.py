@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark trigram suggestions over a large vocabulary.
+
+Builds the suggestion index over a synthetic vocabulary of crop types, varieties
+and scheme names (plus the real crop list), then times autocomplete on typed
+prefixes and best-match lookups on misspelled names, and checks how often the
+intended name comes back first.
+
+Usage:
+    python benchmarks/bench_trigram_suggest.py [--terms 100000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.crop_engine import crop_engine  # noqa: E402
+from app.services.fuzzy_search import SuggestionIndex, normalize_term  # noqa: E402
+
+SYLLABLES = ['ka', 'ri', 'mo', 'sa', 'na', 'pu', 'la', 'ta', 'vi', 'ro', 'shi', 'ga', 'dha', 'ni', 'ma',
+             'ya', 'ba', 'ju', 'ke', 'po', 'ra', 'su', 'de', 'li', 'chi', 'an', 'ar', 'ku', 'me', 'ti']
+SCHEME_WORDS = ['Pradhan Mantri', 'Mukhyamantri', 'Rashtriya', 'Krishi', 'Kisan', 'Samman', 'Vikas', 'Sinchai',
+                'Bima', 'Samriddhi', 'Unnati', 'Yojana', 'Mission', 'Scheme', 'Nidhi', 'Abhiyan']
+
+
+def word(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def vocabulary(size, rng):
+    entries = {}
+    for name in crop_engine.names:
+        entries.setdefault(('crop', normalize_term(name)), Counter())[name] += 1
+    while len(entries) < size:
+        kind = rng.choices(['crop', 'variety', 'scheme'], [1, 6, 3])[0]
+        if kind == 'crop':
+            name = word(rng)
+        elif kind == 'variety':
+            name = f"{rng.choice(['Pusa', 'Arka', 'HD', 'Co', 'GW', 'Swarna', 'Kashi', word(rng)])} {word(rng)} {rng.randint(1, 999)}"
+        else:
+            name = f"{' '.join(rng.sample(SCHEME_WORDS, 2))} {word(rng)} {rng.choice(SCHEME_WORDS)}"
+        entries.setdefault((kind, normalize_term(name)), Counter())[name] += rng.randint(1, 50)
+    return entries
+
+
+def misspell(name, rng):
+    """One substitution, deletion, insertion or transposition in a random word"""
+    chars = list(name)
+    positions = [i for i, char in enumerate(chars) if char.isalpha()]
+    i = rng.choice(positions[1:] or positions)
+    edit = rng.choice(['sub', 'del', 'ins', 'swap'])
+    if edit == 'sub':
+        chars[i] = rng.choice('aeioumnrst')
+    elif edit == 'del':
+        del chars[i]
+    elif edit == 'ins':
+        chars.insert(i, rng.choice('aeiouh'))
+    elif i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return ''.join(chars)
+
+
+def timed(func, values):
+    samples, results = [], []
+    for value in values:
+        start = time.perf_counter()
+        results.append(func(value))
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, samples[int(len(samples) * 0.99)] * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--terms', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    entries = vocabulary(args.terms, rng)
+    start = time.perf_counter()
+    index = SuggestionIndex(entries)
+    print(f"built index over {len(index)} names ({len(index.trigrams.gram_ids)} trigrams) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    targets = rng.sample(index.names, args.queries)
+    prefixes = [name[:rng.randint(3, max(3, min(len(name), 12)))] for name in targets]
+    typos = [misspell(name, rng) for name in targets]
+
+    print(f"{'lookup':30} {'p50 ms':>8} {'p99 ms':>8} {'hit':>6}")
+    p50, p99, results = timed(lambda text: index.suggest(text, limit=10), prefixes)
+    hit = sum(any(s['text'] == name for s in found) for name, found in zip(targets, results)) / len(targets)
+    print(f"{'suggest, typed prefix':30} {p50:8.3f} {p99:8.3f} {hit:6.1%}")
+    p50, p99, results = timed(lambda text: index.suggest(text, limit=10), typos)
+    hit = sum(any(s['text'] == name for s in found) for name, found in zip(targets, results)) / len(targets)
+    print(f"{'suggest, misspelled':30} {p50:8.3f} {p99:8.3f} {hit:6.1%}")
+    p50, p99, results = timed(index.best_match, typos)
+    hit = sum(found == name for name, found in zip(targets, results)) / len(targets)
+    print(f"{'best match, misspelled':30} {p50:8.3f} {p99:8.3f} {hit:6.1%}")
+    p50, p99, _ = timed(lambda text: index.suggest(text, ['crop']), prefixes)
+    print(f"{'suggest, crops only':30} {p50:8.3f} {p99:8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch weather-alert evaluation.
+
+Builds synthetic field/crop targets spread over a grid of forecast cells, serves
+forecasts from a local stub (no weather provider or database) and times the
+vectorized rule evaluation that the scheduled alert run performs.
+
+Usage:
+    python benchmarks/bench_weather_alerts.py [--fields 100000] [--cells 5000] [--days 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.weather_alerts import evaluate_alerts, alert_rules  # noqa: E402
+
+CROPS = ['rice', 'wheat', 'maize', 'cotton', 'sugarcane', 'chickpea', 'mustard', 'potato',
+         'tomato', 'onion', 'soybean', 'groundnut', 'banana', 'mango', 'grapes', 'millet', None]
+STAGES = ['seedling', 'vegetative', 'tillering', 'flowering', 'grain filling', 'maturity', None]
+
+
+def stub_forecasts(cells, days, rng):
+    today = date.today()
+    return {
+        cell: [
+            {
+                'date': (today + timedelta(days=d)).isoformat(),
+                'temperature_min': round(rng.gauss(18, 6), 1),
+                'temperature_max': round(rng.gauss(32, 4), 1),
+                'precipitation_mm': round(rng.expovariate(1 / 8), 1),
+                'wind_speed_max': round(rng.gauss(6, 3), 1),
+            }
+            for d in range(days)
+        ]
+        for cell in cells
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=100000)
+    parser.add_argument('--cells', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cells = [('cell', (round(8 + i // 100 * 0.1, 4), round(70 + i % 100 * 0.1, 4))) for i in range(args.cells)]
+    forecasts = stub_forecasts(cells, args.days, rng)
+    targets = [
+        {
+            'field_id': i,
+            'user_id': i // 3,
+            'crop_id': i,
+            'crop_type': rng.choice(CROPS),
+            'growth_stage': rng.choice(STAGES),
+            'location': rng.choice(cells),
+        }
+        for i in range(args.fields)
+    ]
+
+    print(f"{args.fields} targets, {args.cells} cells, {args.days} days")
+    for run in range(args.runs):
+        start = time.perf_counter()
+        alerts = evaluate_alerts(targets, forecasts, args.days)
+        elapsed = time.perf_counter() - start
+        print(f"run {run + 1}: {elapsed * 1000:8.1f} ms, {len(alerts)} alerts, "
+              f"{args.fields / elapsed:,.0f} targets/s, {len(alert_rules.matrix)} rule rows")
+
+
+if __name__ == '__main__':
+    main()
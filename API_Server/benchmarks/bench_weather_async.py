@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the async weather service against sequential calls.
+
+Serves weather from the replay provider with injected upstream latency (no
+network or API key), then times current weather plus forecast for one location
+sequentially and concurrently, a batch of locations one at a time and through
+asyncio.gather, and how long the event loop stalls while the batch is in flight.
+
+Usage:
+    python benchmarks/bench_weather_async.py [--locations 40] [--latency-ms 80]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--locations', type=int, default=40)
+    parser.add_argument('--latency-ms', type=int, default=80)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ['WEATHER_PROVIDER'] = 'replay'
+os.environ['REPLAY_LATENCY'] = f'fixed:{args.latency_ms}'
+
+from app.services.weather_service import (get_current_weather, get_weather_forecast,  # noqa: E402
+                                          get_weather_overview, get_weather_batch_async,
+                                          WEATHER_FETCH_WORKERS)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def batch_with_loop_lag(locations):
+    """Run the batch while a ticker measures the event loop's worst scheduling delay"""
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.perf_counter() - start - 0.005)
+
+    task = asyncio.create_task(ticker())
+    results = await get_weather_batch_async(locations)
+    done.set()
+    await task
+    return results, lag * 1000
+
+
+def main():
+    locations = [f'Town {i}' for i in range(args.locations)]
+
+    sequential_ms, _ = timed(lambda: (get_current_weather('Pune'), get_weather_forecast('Pune', 5)))
+    overview_ms, overview = timed(lambda: get_weather_overview('Pune', 5))
+    assert overview['current']['source'] == 'replay' and len(overview['forecast']) == 5
+
+    loop_ms, _ = timed(lambda: [get_weather_overview(location, 5) for location in locations])
+    batch_ms, (results, lag_ms) = timed(lambda: asyncio.run(batch_with_loop_lag(locations)))
+    assert len(results) == len(locations) and all(r['current']['source'] == 'replay' for r in results.values())
+
+    print(f"upstream latency {args.latency_ms} ms, {WEATHER_FETCH_WORKERS} requests in flight per loop")
+    print(f"{'case':36} {'ms':>9}")
+    print(f"{'current + forecast, sequential':36} {sequential_ms:9.1f}")
+    print(f"{'current + forecast, concurrent':36} {overview_ms:9.1f}")
+    print(f"{str(args.locations) + ' locations, one at a time':36} {loop_ms:9.1f}")
+    print(f"{str(args.locations) + ' locations, gathered':36} {batch_ms:9.1f}")
+    print(f"{'worst event loop stall in batch':36} {lag_ms:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
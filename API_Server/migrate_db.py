@@ -0,0 +1,201 @@
+"""
+Database Migration Script for AgriAssist Backend
+create_all() creates missing tables but never alters existing ones. This script also adds the
+columns and indexes models gained since a table was created, backfills them, and tightens
+constraints once the data allows it. Every step checks the live schema first, so it is safe to
+rerun after each deploy.
+
+Usage: python migrate_db.py [migrate|status]
+"""
+
+import sys
+
+from main import app
+from app.extensions import db
+from app.models import WeatherData
+from app.services.weather_service import normalize_city
+
+# Columns added to existing tables, in order: (table, column, DDL per dialect or None to derive
+# it from the model). weather_data.location_key is added nullable and made NOT NULL after the backfill.
+ADDED_COLUMNS = [
+    ('weather_data', 'location_key', {'*': 'VARCHAR(64)'}),
+    ('weather_data', 'kind', {'*': "VARCHAR(20) NOT NULL DEFAULT 'observation'"}),
+    ('weather_data', 'source', None),
+    ('weather_data', 'temperature_min', None),
+    ('weather_data', 'temperature_max', None),
+    ('weather_data', 'description', None),
+    ('weather_data', 'forecast_for', None),
+    ('weather_daily', 'utc_offset', None),
+    ('field', 'coordinates_source', None),
+    ('field', 'geohash', None),
+    # The database bumps updated_at on MySQL, so catalog edits made outside the app
+    # (admin scripts, SQL consoles) still change the search index fingerprint
+    ('farmer_schemes', 'updated_at',
+     {'mysql': 'DATETIME(6) NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)'}),
+    ('farmer_crisis_schemes', 'updated_at',
+     {'mysql': 'DATETIME(6) NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)'}),
+]
+
+# Columns made NOT NULL once backfilled (SQLite cannot alter a column; the app always sets them)
+NOT_NULL_COLUMNS = {
+    'mysql': ['ALTER TABLE weather_data MODIFY location_key VARCHAR(64) NOT NULL'],
+    'postgresql': ['ALTER TABLE weather_data ALTER COLUMN location_key SET NOT NULL'],
+}
+
+
+def get_existing_tables():
+    """Get list of existing tables in the database"""
+    return db.inspect(db.engine).get_table_names()
+
+
+def get_existing_columns(table_name):
+    return {column['name'] for column in db.inspect(db.engine).get_columns(table_name)}
+
+
+def column_ddl(table_name, column_name, ddl):
+    """Column definition for ALTER TABLE ... ADD COLUMN on the connected dialect"""
+    dialect = db.engine.dialect
+    if ddl and (dialect.name in ddl or '*' in ddl):
+        return ddl.get(dialect.name, ddl.get('*'))
+    column = db.metadata.tables[table_name].c[column_name]
+    return column.type.compile(dialect=dialect)
+
+
+def create_missing_tables():
+    """Create only the missing tables that are defined in models but not in database"""
+    existing_tables = get_existing_tables()
+    missing_tables = [table for table in db.metadata.sorted_tables if table.name not in existing_tables]
+    for table in missing_tables:
+        table.create(db.engine)
+        print(f"✅ Created table: {table.name}")
+    if not missing_tables:
+        print("✅ All model tables already exist in the database")
+
+
+def add_missing_columns():
+    """Add the columns of ADDED_COLUMNS that existing tables lack; returns the ones added"""
+    existing_tables = get_existing_tables()
+    added = []
+    for table_name, column_name, ddl in ADDED_COLUMNS:
+        if table_name not in existing_tables or column_name in get_existing_columns(table_name):
+            continue
+        definition = column_ddl(table_name, column_name, ddl)
+        with db.engine.begin() as conn:
+            conn.execute(db.text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}"))
+        added.append((table_name, column_name))
+        print(f"✅ Added column: {table_name}.{column_name} {definition}")
+    if not added:
+        print("✅ All model columns already exist in the database")
+    return added
+
+
+def create_missing_indexes():
+    """Create every model index the database does not have yet (including unique constraints on new tables)"""
+    inspector = db.inspect(db.engine)
+    created = 0
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created += 1
+                print(f"✅ Created index: {index.name} on {table.name}")
+    if not created:
+        print("✅ All model indexes already exist in the database")
+
+
+def backfill():
+    """Fill the added columns of existing rows"""
+    # Store keys of rows recorded before location_key: the normalized city name, as the weather service writes it
+    locations = [row[0] for row in db.session.query(WeatherData.location).filter(
+        WeatherData.location_key.is_(None)).distinct()]
+    for location in locations:
+        WeatherData.query.filter(WeatherData.location_key.is_(None), WeatherData.location == location).update(
+            {'location_key': normalize_city(location)[:64]}, synchronize_session=False)
+    if locations:
+        print(f"✅ Set location_key on weather_data rows of {len(locations)} locations")
+
+    # Coordinates entered before coordinates_source came from the app's GPS / map picker
+    updated = db.session.execute(db.text(
+        "UPDATE field SET coordinates_source = 'gps' "
+        "WHERE coordinates_source IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL"
+    )).rowcount
+    if updated:
+        print(f"✅ Set coordinates_source on {updated} fields")
+
+    for table_name in ('farmer_schemes', 'farmer_crisis_schemes'):
+        updated = db.session.execute(db.text(
+            f"UPDATE {table_name} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"
+        )).rowcount
+        if updated:
+            print(f"✅ Set updated_at on {updated} {table_name} rows")
+    db.session.commit()
+
+    from app.services.geo_index import backfill_geohashes
+    updated = backfill_geohashes()
+    if updated:
+        print(f"✅ Updated geohash on {updated} fields")
+
+
+def tighten_constraints():
+    for statement in NOT_NULL_COLUMNS.get(db.engine.dialect.name, []):
+        with db.engine.begin() as conn:
+            conn.execute(db.text(statement))
+        print(f"✅ {statement}")
+
+
+def migrate():
+    """Bring an existing database up to the current models"""
+    with app.app_context():
+        try:
+            create_missing_tables()
+            add_missing_columns()
+            backfill()
+            tighten_constraints()
+            create_missing_indexes()
+            print("\n🎉 Migration completed")
+            print("📍 Place fields without coordinates at their PIN code centroid with: flask --app main geocode-fields")
+        except Exception as e:
+            print(f"❌ Migration failed: {str(e)}")
+            sys.exit(1)
+
+
+def check_database_status():
+    """Report the tables, columns and indexes the database is missing"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            existing_tables = get_existing_tables()
+            missing = []
+            for table in db.metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    missing.append(f"table {table.name}")
+                    continue
+                columns = get_existing_columns(table.name)
+                missing += [f"column {table.name}.{column.name}" for column in table.columns if column.name not in columns]
+                indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+                missing += [f"index {index.name}" for index in table.indexes if index.name not in indexes]
+
+            print("📋 Database Status Report:")
+            print(f"  Existing tables: {len(existing_tables)}")
+            print(f"  Model tables: {len(db.metadata.tables)}")
+            if missing:
+                print("\n⚠️  Missing (run: python migrate_db.py):")
+                for item in missing:
+                    print(f"    - {item}")
+            else:
+                print("\n✅ Database matches the models")
+        except Exception as e:
+            print(f"❌ Error checking database status: {str(e)}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'migrate'
+    if command == 'migrate':
+        migrate()
+    elif command == 'status':
+        check_database_status()
+    else:
+        print("Usage: python migrate_db.py [migrate|status]")
+        print("  migrate - Create missing tables, add missing columns and indexes, backfill them (default)")
+        print("  status  - List what the database is missing")
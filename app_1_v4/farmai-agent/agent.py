@@ -7,7 +7,8 @@ from .sub_agents.crop_recommendation.agent import crop_recommendation
 from .sub_agents.farmer_google.agent import farmer_google
 from .tools.e_learning import fetch_tutorials
 from .tools.farmer_crisis_relief import get_crisis_schemes
-from .tools.government_schemes import get_government_schemes
+from .tools.government_schemes import get_government_schemes, find_schemes_for_situation
+from .tools.weather import get_weather
 
 
 root_agent = LlmAgent(
@@ -48,17 +49,21 @@ CROP MANAGEMENT & ADVISORY → Use: `crop_recommendation` agent
 **MARKET(MANDI PRICES) INTELLIGENCE** → Primary: `get_agriculture_data` | Fallback: `farmer_google`
 - Real-time mandi prices across any state and districts
 
-**GOVERNMENT SUPPORT** → Use: `get_government_schemes` or `get_crisis_schemes`
+**GOVERNMENT SUPPORT** → Use: `get_government_schemes`, `find_schemes_for_situation` or `get_crisis_schemes`
 - Agricultural subsidies and financial assistance
+- Schemes matching a need the farmer describes (pass their description as they said it)
 - Government program eligibility and application process
-- Crisis support during natural disasters or market crashes
+- Crisis support during natural disasters or market crashes (pass the crisis word as the farmer said it, any language)
 
 **EDUCATIONAL/YOUTUBE RESOURCES** → Use: `fetch_tutorials`
 - Video tutorials on farming techniques
 - Skill development recommendations
 
+**WEATHER** → Use: `get_weather` (farmer's city or PIN code from the profile)
+- Current conditions and the next days' forecast
+- Weather-related farming advice (spraying, irrigation, sowing and harvest timing)
+
 **GENERAL AGRICULTURAL QUERIES** → Use: `farmer_google`
-- Weather-related farming advice
 - Agricultural news and innovations
 - Technical questions not covered by specialized tools
 - Emergency agricultural problem-solving
@@ -106,6 +111,8 @@ Remember: You are the farmer's most trusted agricultural advisor. Every response
       get_farmer_info,
       fetch_tutorials,
       get_government_schemes,
-      get_crisis_schemes
+      find_schemes_for_situation,
+      get_crisis_schemes,
+      get_weather
    ],
 )
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
 
-import requests
+from agri_common.http_client import http_client
 
 def fetch_tutorials(topic:str, language:str) -> dict:
     """
@@ -58,7 +58,7 @@ def fetch_tutorials(topic:str, language:str) -> dict:
             'order': 'relevance'
         }
 
-        response = requests.get(youtube_search_url, params=params, timeout=10)
+        response = http_client.get(youtube_search_url, params=params)
         response.raise_for_status()
 
         data = response.json()
@@ -1,30 +1,23 @@
 import requests
 
+from agri_common.http_client import http_client
+
 def get_crisis_schemes(keyword:str) -> dict:
     """
     Retrieves the government crisis time schemes available for the farmers.
     Args:
-        keyword (str): the key type of crisis the farmers are facing e.g floods, drought
+        keyword (str): the crisis the farmers are facing, in the farmer's own words and language
+            e.g floods, baadh, बाढ़, ಪ್ರವಾಹ, drought, sookha
     """
-    url = "https://gah-backend-2-675840910180.europe-west1.run.app/api/farmer_schemes/crisis/schemes"
+    url = "https://gah-backend-2-675840910180.europe-west1.run.app/api/farmer_schemes/crisis/schemes/match"
 
     try:
-        response = requests.get(url, timeout=10)
+        # The server maps the keyword (any language or script) to hazards and returns only the best schemes
+        response = http_client.get(url, params={'keyword': keyword, 'limit': 5})
         response.raise_for_status()
         data = response.json()
-        data = data["data"]
-
-        keyword_lower = keyword.lower()
-        matched = []
-
-        for scheme in data:
-            purpose = scheme.get("purpose", "").lower()
-            benefit = scheme.get("relief_benefit", "").lower()
-
-            if keyword_lower in purpose or keyword_lower in benefit:
-                matched.append(scheme)
 
-        return {"data":matched}
+        return {"data": data["data"], "hazards": data.get("hazards", [])}
 
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
@@ -1,4 +1,5 @@
 import requests
+from agri_common.http_client import http_client
 def get_farmer_info(userid:str) -> dict:
     """
     Retrieves the farmer information from the data store.
@@ -14,7 +15,7 @@ def get_farmer_info(userid:str) -> dict:
     params = {'phone': userid}
 
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params)
         response.raise_for_status()
         res = response.json()
         filtered_user = {key: res['user'][key] for key in ['city', 'language', 'name', 'phone', 'state']}
@@ -1,5 +1,7 @@
 import requests
 
+from agri_common.http_client import http_client
+
 def get_government_schemes(state_name: str) -> dict:
     """
     Retrieves the government schemes available for the farmer, state-wise.
@@ -11,7 +13,7 @@ def get_government_schemes(state_name: str) -> dict:
     url = "https://gah-backend-2-675840910180.europe-west1.run.app/api/farmer_schemes/schemes"
 
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url)
         response.raise_for_status()
         data = response.json()
 
@@ -40,5 +42,32 @@ def get_government_schemes(state_name: str) -> dict:
         return {}
 
 
+def find_schemes_for_situation(situation: str) -> dict:
+    """
+    Finds the government schemes that fit the farmer's situation as they describe it.
+    Use when the farmer explains a need rather than naming a scheme or state.
+
+    Args:
+        situation (str): the farmer's situation in their own words and language
+            e.g. my cotton was eaten by worms and I need money for seeds
+    """
+    url = "https://gah-backend-2-675840910180.europe-west1.run.app/api/farmer_schemes/schemes/semantic"
+
+    try:
+        # The server embeds the description locally and returns only the closest schemes
+        response = http_client.get(url, params={'q': situation, 'limit': 5})
+        response.raise_for_status()
+        data = response.json()
+
+        return {"data": [
+            {k: v for k, v in scheme.items() if k not in ["id", "budget_benefits"]}
+            for scheme in data["data"]
+        ]}
+
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return {}
+
+
 # print(get_farmer_schemes_for_bihar("Karnataka"))
 
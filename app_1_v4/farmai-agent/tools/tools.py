@@ -1,4 +1,5 @@
 import requests
+from agri_common.http_client import http_client
 def get_agriculture_data(state:str) -> dict:
     """
     Retrieves the current mandi price for a given state.
@@ -19,7 +20,7 @@ def get_agriculture_data(state:str) -> dict:
     }
 
     try:
-        response = requests.get(base_url, params=params)
+        response = http_client.get(base_url, params=params)
         response.raise_for_status()  # Raise HTTPError for bad responses (4xx, 5xx)
 
         data = response.json()
@@ -0,0 +1,31 @@
+import asyncio
+
+import requests
+
+from agri_common.http_client import http_client
+
+async def get_weather(location: str, days: int) -> dict:
+    """
+    Retrieves the current weather and the daily forecast for a location.
+
+    Args:
+        location (str): city name or 6-digit PIN code e.g. Pune, 411001
+        days (int): number of forecast days, 1 to 5
+
+    Returns:
+        dict: current conditions and the daily forecast.
+    """
+    url = "https://gah-backend-2-675840910180.europe-west1.run.app/api/weather/overview"
+    params = {'location': location, 'days': max(1, min(days, 5))}
+
+    try:
+        # /overview is the API server's async weather path (current + forecast fetched concurrently).
+        # The agent reaches it through the shared pooled client for its retries, per-host limits and
+        # metrics; that client blocks, so it runs on a worker thread and the agent's loop keeps
+        # serving other sessions
+        response = await asyncio.to_thread(http_client.get, url, params=params)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return {}
@@ -25,11 +25,15 @@ from google.adk.agents.run_config import RunConfig
 
 from fastapi import FastAPI, WebSocket, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from starlette.websockets import WebSocketDisconnect
 from websockets.exceptions import ConnectionClosedError
 
 from google_search_agent.agent import root_agent
+from agri_common.ai_usage import ai_usage, start_call, tracked_call, AIBudgetExceeded
+
+import hmac
+import jwt
 
 import contextvars
 from typing import Optional
@@ -204,6 +208,10 @@ app.add_middleware(
 
 user_sessions = {}
 RESOURCE_ID = os.getenv("RESOURCE_ID")
+# SECRET_KEY of the API server, to recognise its users' JWTs for per-user AI budgets
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+# Shared secret for /metrics/ai; the endpoint is disabled when unset
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 
 class MessageRequest(BaseModel):
@@ -221,6 +229,21 @@ async def root():
     # return FileResponse(os.path.join(STATIC_DIR, "index.html"))
 
 
+def budget_key(request: Request) -> str:
+    """
+    Budget subject for a request: the user from a valid API server JWT (Authorization: Bearer),
+    else the client address. Never a client-supplied user id, which could be rotated freely.
+    """
+    header = request.headers.get("authorization", "")
+    if JWT_SECRET_KEY and header.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(header[7:], JWT_SECRET_KEY, algorithms=["HS256"])
+            return f"user:{payload['user_id']}"
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
 @app.post("/analyze-image/")
 async def analyze_image(request: Request):
     body = await request.json()
@@ -229,7 +252,12 @@ async def analyze_image(request: Request):
     if not base64image:
             return {"error": "Missing 'base64image' field in JSON body"}
 
-    response = client1.models.generate_content(
+    try:
+        start_call("/analyze-image/", "image_analysis", budget_key(request))
+    except AIBudgetExceeded as e:
+        return JSONResponse(status_code=429, content={"error": str(e)})
+
+    response = tracked_call("gemini-2.5-flash", "vertex_ai", lambda: client1.models.generate_content(
         model="gemini-2.5-flash",
         contents=[
             types.Part.from_bytes(data=base64image, mime_type="image/png"),
@@ -250,9 +278,21 @@ async def analyze_image(request: Request):
                - Any precautions or treatments?
                - Any tools or resources that could help?"""
         ]
-    )
+    ))
     return response.text
 
+@app.get("/metrics/ai")
+async def ai_metrics(request: Request, limit: int = 50):
+    """Recent model calls, per-route/model aggregates and today's budget usage (X-Metrics-Token)"""
+    token = request.headers.get("x-metrics-token", "")
+    if not METRICS_TOKEN or not hmac.compare_digest(token, METRICS_TOKEN):
+        return JSONResponse(status_code=403, content={"error": "Forbidden"})
+    return {
+        "recent": ai_usage.recent(limit),
+        "aggregate": ai_usage.aggregate(),
+        "daily": ai_usage.daily()
+    }
+
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int, is_audio: str):
     """Enhanced WebSocket endpoint with working memory integration"""
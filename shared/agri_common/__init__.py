@@ -0,0 +1 @@
+"""Modules shared by the API server and the FarmAI agent service"""
@@ -0,0 +1,373 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Accounting configuration - budgets of 0 are unlimited
+AI_USAGE_BUFFER_SIZE = int(os.getenv('AI_USAGE_BUFFER_SIZE', 1000))
+AI_DAILY_TOKEN_BUDGET = int(os.getenv('AI_DAILY_TOKEN_BUDGET', 0))
+AI_DAILY_CALL_BUDGET = int(os.getenv('AI_DAILY_CALL_BUDGET', 0))
+AI_USER_DAILY_TOKEN_BUDGET = int(os.getenv('AI_USER_DAILY_TOKEN_BUDGET', 0))
+AI_USER_DAILY_CALL_BUDGET = int(os.getenv('AI_USER_DAILY_CALL_BUDGET', 0))
+# Database holding the daily budget totals shared by all workers and services (SQLAlchemy URL);
+# the API server uses its own database when this is unset
+AI_USAGE_DATABASE_URL = os.getenv('AI_USAGE_DATABASE_URL')
+
+# USD per 1M (prompt, response) tokens; override with AI_MODEL_PRICES='{"model": [in, out]}'
+MODEL_PRICES = {
+    'gemini-1.5-pro': (1.25, 5.00),
+    'gemini-1.5-pro-vision-001': (1.25, 5.00),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-pro': (0.50, 1.50),
+}
+MODEL_PRICES.update({model: tuple(prices) for model, prices in json.loads(os.getenv('AI_MODEL_PRICES', '{}')).items()})
+
+# Who/what triggered the current model call; copied into provider threads by the router
+call_context = contextvars.ContextVar('ai_call_context', default={})
+
+GLOBAL_KEY = '*'  # Budget store subject holding the totals across all users
+
+
+class AIBudgetExceeded(RuntimeError):
+    """Raised before a model call when a daily AI budget is used up"""
+
+
+class MemoryBudgetStore:
+    """
+    Daily totals in this process only: each worker enforces the budgets separately and they
+    reset on restart. Used when no shared store is configured (local runs, tests).
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def _row(self, day, key):
+        if day not in self._totals:
+            self._totals = {day: {}}
+        return self._totals[day].setdefault(key, {'calls': 0, 'tokens': 0, 'cost_usd': 0.0})
+
+    def reserve(self, day, key, call_limit=0, token_limit=0):
+        """Count one call against key unless a limit is reached; returns None or 'calls' / 'tokens'"""
+        with self._lock:
+            row = self._row(day, key)
+            if call_limit and row['calls'] >= call_limit:
+                return 'calls'
+            if token_limit and row['tokens'] >= token_limit:
+                return 'tokens'
+            row['calls'] += 1
+            return None
+
+    def release(self, day, key):
+        with self._lock:
+            row = self._row(day, key)
+            row['calls'] = max(0, row['calls'] - 1)
+
+    def add(self, day, key, tokens, cost_usd):
+        with self._lock:
+            row = self._row(day, key)
+            row['tokens'] += tokens
+            row['cost_usd'] += cost_usd
+
+    def totals(self, day, key):
+        with self._lock:
+            return dict(self._row(day, key))
+
+    def top(self, day, limit):
+        with self._lock:
+            rows = [(key, dict(row)) for key, row in self._totals.get(day, {}).items() if key != GLOBAL_KEY]
+        return sorted(rows, key=lambda item: item[1]['tokens'], reverse=True)[:limit]
+
+
+class SQLBudgetStore:
+    """
+    Daily totals in a database table shared by every worker and service. A reservation is a
+    single conditional UPDATE (calls + 1 where still under the limits), so concurrent
+    requests cannot overshoot a budget.
+    """
+
+    shared = True
+
+    def __init__(self, engine):
+        from sqlalchemy import BigInteger, Column, Date, Float, Integer, MetaData, String, Table
+
+        self.engine = engine
+        self.table = Table(
+            'ai_budget_usage', MetaData(),
+            Column('day', Date, primary_key=True),
+            Column('subject', String(120), primary_key=True),  # '*' for the global totals, else the user key
+            Column('calls', Integer, nullable=False, default=0),
+            Column('tokens', BigInteger, nullable=False, default=0),
+            Column('cost_usd', Float, nullable=False, default=0.0),
+        )
+        self._created = False
+        self._known_rows = set()
+        self._lock = threading.Lock()
+
+    def _ensure_row(self, day, key):
+        from sqlalchemy import exc, insert
+
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self.table.create(self.engine, checkfirst=True)
+                    self._created = True
+        if (day, key) in self._known_rows:
+            return
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(insert(self.table).values(day=day, subject=key, calls=0, tokens=0, cost_usd=0.0))
+        except exc.IntegrityError:
+            pass  # Created by another worker
+        with self._lock:
+            if len(self._known_rows) >= 10000:
+                self._known_rows.clear()
+            self._known_rows.add((day, key))
+
+    def _where(self, day, key):
+        return (self.table.c.day == day) & (self.table.c.subject == key)
+
+    def reserve(self, day, key, call_limit=0, token_limit=0):
+        from sqlalchemy import update
+
+        self._ensure_row(day, key)
+        where = self._where(day, key)
+        if call_limit:
+            where &= self.table.c.calls < call_limit
+        if token_limit:
+            where &= self.table.c.tokens < token_limit
+        with self.engine.begin() as connection:
+            reserved = connection.execute(update(self.table).where(where).values(calls=self.table.c.calls + 1))
+        if reserved.rowcount == 1:
+            return None
+        return 'calls' if call_limit and self.totals(day, key)['calls'] >= call_limit else 'tokens'
+
+    def release(self, day, key):
+        from sqlalchemy import update
+
+        with self.engine.begin() as connection:
+            connection.execute(update(self.table).where(self._where(day, key) & (self.table.c.calls > 0))
+                               .values(calls=self.table.c.calls - 1))
+
+    def add(self, day, key, tokens, cost_usd):
+        from sqlalchemy import update
+
+        self._ensure_row(day, key)
+        with self.engine.begin() as connection:
+            connection.execute(update(self.table).where(self._where(day, key)).values(
+                tokens=self.table.c.tokens + tokens, cost_usd=self.table.c.cost_usd + cost_usd))
+
+    def totals(self, day, key):
+        from sqlalchemy import select
+
+        self._ensure_row(day, key)
+        with self.engine.connect() as connection:
+            row = connection.execute(select(self.table.c.calls, self.table.c.tokens, self.table.c.cost_usd)
+                                     .where(self._where(day, key))).one()
+        return {'calls': row.calls, 'tokens': row.tokens, 'cost_usd': row.cost_usd}
+
+    def top(self, day, limit):
+        from sqlalchemy import select
+
+        self._ensure_row(day, GLOBAL_KEY)
+        table = self.table
+        with self.engine.connect() as connection:
+            rows = connection.execute(select(table).where((table.c.day == day) & (table.c.subject != GLOBAL_KEY))
+                                      .order_by(table.c.tokens.desc()).limit(limit)).all()
+        return [(row.subject, {'calls': row.calls, 'tokens': row.tokens, 'cost_usd': row.cost_usd}) for row in rows]
+
+
+def default_store():
+    """SQLBudgetStore on AI_USAGE_DATABASE_URL when set, else per-process totals"""
+    if AI_USAGE_DATABASE_URL:
+        from sqlalchemy import create_engine
+        return SQLBudgetStore(create_engine(AI_USAGE_DATABASE_URL, pool_pre_ping=True))
+    return MemoryBudgetStore()
+
+
+class AIUsageTracker:
+    """
+    Ring buffer of recent model calls with rolling aggregates over it (per process), and daily
+    budget totals in a budget store (shared across workers when it is a SQLBudgetStore)
+    """
+
+    def __init__(self, buffer_size=AI_USAGE_BUFFER_SIZE, store=None):
+        self._records = deque(maxlen=buffer_size)
+        self.store = store or default_store()
+        self._lock = threading.Lock()
+
+    def use_store(self, store):
+        self.store = store
+
+    @staticmethod
+    def _today():
+        return datetime.utcnow().date()
+
+    def reserve(self, user_key):
+        """
+        Count one AI request against today's global and per-user budgets, or raise
+        AIBudgetExceeded without counting it when either is used up
+        """
+        day = self._today()
+        exceeded = self.store.reserve(day, GLOBAL_KEY, AI_DAILY_CALL_BUDGET, AI_DAILY_TOKEN_BUDGET)
+        if exceeded == 'calls':
+            raise AIBudgetExceeded('Daily AI call budget exhausted, please try again tomorrow')
+        if exceeded == 'tokens':
+            raise AIBudgetExceeded('Daily AI token budget exhausted, please try again tomorrow')
+
+        exceeded = self.store.reserve(day, user_key, AI_USER_DAILY_CALL_BUDGET, AI_USER_DAILY_TOKEN_BUDGET)
+        if exceeded:
+            self.store.release(day, GLOBAL_KEY)
+            if exceeded == 'calls':
+                raise AIBudgetExceeded('Daily AI request limit reached for this user')
+            raise AIBudgetExceeded('Daily AI token limit reached for this user')
+
+    def release(self, user_key):
+        """Give back a reservation whose request was served without a model call"""
+        day = self._today()
+        self.store.release(day, GLOBAL_KEY)
+        self.store.release(day, user_key)
+
+    def record(self, **record):
+        record.setdefault('timestamp', datetime.utcnow().isoformat())
+        with self._lock:
+            self._records.append(record)
+        tokens = (record.get('prompt_tokens') or 0) + (record.get('response_tokens') or 0)
+        if record.get('model') is None or not (tokens or record.get('cost_usd')):
+            # Fallback tiers do not spend quota; calls were counted when reserved
+            return
+        day = self._today()
+        for key in (GLOBAL_KEY, record.get('user_key')):
+            self.store.add(day, key, tokens, record.get('cost_usd') or 0.0)
+
+    def recent(self, limit=50):
+        with self._lock:
+            return list(self._records)[-limit:]
+
+    def aggregate(self):
+        """Rolling aggregate over the ring buffer, grouped by route, operation, provider tier and model"""
+        with self._lock:
+            records = list(self._records)
+
+        groups = {}
+        for record in records:
+            key = (record.get('route'), record.get('operation'), record.get('provider'), record.get('model'))
+            groups.setdefault(key, []).append(record)
+
+        aggregate = []
+        for (route, operation, provider, model), group in groups.items():
+            latencies = sorted(r['latency_ms'] for r in group if r.get('latency_ms') is not None)
+            aggregate.append({
+                'route': route,
+                'operation': operation,
+                'provider': provider,
+                'model': model,
+                'calls': len(group),
+                'errors': sum(1 for r in group if not r.get('ok', True)),
+                'cache_hits': sum(1 for r in group if r.get('cache_hit')),
+                'prompt_tokens': sum(r.get('prompt_tokens') or 0 for r in group),
+                'response_tokens': sum(r.get('response_tokens') or 0 for r in group),
+                'cost_usd': round(sum(r.get('cost_usd') or 0.0 for r in group), 6),
+                'p50_latency_ms': latencies[len(latencies) // 2] if latencies else None,
+                'p95_latency_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            })
+        return aggregate
+
+    def daily(self):
+        day = self._today()
+        return {
+            'date': day.isoformat(),
+            'shared': self.store.shared,
+            'global': self.store.totals(day, GLOBAL_KEY),
+            'top_users': [{'user': user, **totals} for user, totals in self.store.top(day, 10)],
+            'budgets': {
+                'daily_calls': AI_DAILY_CALL_BUDGET,
+                'daily_tokens': AI_DAILY_TOKEN_BUDGET,
+                'user_daily_calls': AI_USER_DAILY_CALL_BUDGET,
+                'user_daily_tokens': AI_USER_DAILY_TOKEN_BUDGET,
+            }
+        }
+
+
+def estimate_cost(model, prompt_tokens, response_tokens):
+    prices = MODEL_PRICES.get(model)
+    if not prices:
+        return None
+    return ((prompt_tokens or 0) * prices[0] + (response_tokens or 0) * prices[1]) / 1_000_000
+
+
+def token_counts(response):
+    """(prompt, response, estimated) token counts from an SDK response's usage_metadata"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        return getattr(usage, 'prompt_token_count', None), getattr(usage, 'candidates_token_count', None), False
+    text = getattr(response, 'text', response)
+    return None, (len(text) // 4 if isinstance(text, str) else None), True
+
+
+def start_call(route, operation, user_key):
+    """
+    Reserve one request against the daily budgets (raises AIBudgetExceeded) and tag the
+    request's model calls for accounting
+    """
+    ai_usage.reserve(user_key)
+    call_context.set({'route': route, 'operation': operation, 'user_key': user_key, 'reserved': True})
+
+
+def tracked_call(model, provider, invoke, cache_hit=False):
+    """Invoke a model call, recording model, route, tokens, latency, cost and outcome"""
+    context = call_context.get()
+    if context:
+        context['model_called'] = True
+    start = time.perf_counter()
+    base = {
+        'route': context.get('route'),
+        'operation': context.get('operation'),
+        'user_key': context.get('user_key'),
+        'provider': provider,
+        'model': model,
+        'cache_hit': cache_hit,
+    }
+    try:
+        response = invoke()
+    except Exception as e:
+        ai_usage.record(**base, latency_ms=round((time.perf_counter() - start) * 1000, 1), ok=False, error=str(e)[:200])
+        raise
+
+    prompt_tokens, response_tokens, estimated = token_counts(response)
+    ai_usage.record(
+        **base,
+        latency_ms=round((time.perf_counter() - start) * 1000, 1),
+        prompt_tokens=prompt_tokens,
+        response_tokens=response_tokens,
+        tokens_estimated=estimated,
+        cost_usd=estimate_cost(model, prompt_tokens, response_tokens),
+        ok=True
+    )
+    return response
+
+
+def record_fallback(tier):
+    """Record that a request was served by a non-model fallback tier (mock, basic recommendations)"""
+    context = call_context.get()
+    if context.pop('reserved', False) and not context.get('model_called'):
+        # No model was called, so the request does not count against the budgets
+        ai_usage.release(context.get('user_key'))
+    ai_usage.record(
+        route=context.get('route'),
+        operation=context.get('operation'),
+        user_key=context.get('user_key'),
+        provider=tier,
+        model=None,
+        latency_ms=None,
+        ok=True
+    )
+
+
+ai_usage = AIUsageTracker()
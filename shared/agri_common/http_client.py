@@ -0,0 +1,274 @@
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+
+# Outbound HTTP configuration (seconds unless noted)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 0.2))
+HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 2.0))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))  # kept-alive connections per host
+HTTP_MAX_CONCURRENCY_PER_HOST = int(os.getenv('HTTP_MAX_CONCURRENCY_PER_HOST', 10))
+HTTP_QUEUE_TIMEOUT = float(os.getenv('HTTP_QUEUE_TIMEOUT', 5))  # wait for a per-host slot
+HTTP_DNS_TTL = float(os.getenv('HTTP_DNS_TTL_SECONDS', 60))
+HTTP_METRICS_WINDOW = int(os.getenv('HTTP_METRICS_WINDOW', 500))
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'total')
+
+# Connection setup timings of the current thread's last new connection
+_local = threading.local()
+
+
+class HostBusyError(requests.exceptions.ConnectionError):
+    """Raised when no per-host concurrency slot frees up within HTTP_QUEUE_TIMEOUT"""
+
+
+class _DNSCache:
+    """Short-TTL resolver cache so DNS time is measured once per host, not per connection"""
+
+    def __init__(self, ttl=HTTP_DNS_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """Return (addresses, seconds spent resolving - 0 on a cache hit)"""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] < self.ttl:
+                return entry[0], 0.0
+        start = time.perf_counter()
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        elapsed = time.perf_counter() - start
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[key] = (addresses, now)
+        return addresses, elapsed
+
+    def forget(self, host, port):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+
+_dns_cache = _DNSCache()
+
+
+class _TimedConnectionMixin:
+    """urllib3 connection recording DNS, TCP connect and TLS handshake time for new connections"""
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses, dns_seconds = _dns_cache.resolve(host, self.port)
+        except socket.gaierror:
+            # Let urllib3 raise its usual NameResolutionError
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            else:
+                _dns_cache.forget(host, self.port)
+                raise error
+        finally:
+            self._dns_host = host
+
+        _local.phases = {'dns': dns_seconds, 'connect': time.perf_counter() - start, 'tls': 0.0}
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        phases = getattr(_local, 'phases', None)
+        if phases is not None and isinstance(self, HTTPSConnection):
+            phases['tls'] = max(0.0, time.perf_counter() - start - phases['dns'] - phases['connect'])
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+class _HostStats:
+    def __init__(self, window=HTTP_METRICS_WINDOW):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.new_connections = 0
+        self.busy_rejections = 0
+        self.statuses = {}
+        self.phases = {phase: deque(maxlen=window) for phase in PHASES}
+
+    def snapshot(self):
+        completed = self.requests - self.errors
+        snapshot = {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'new_connections': self.new_connections,
+            'connection_reuse_rate': round(1 - self.new_connections / completed, 3) if completed else None,
+            'busy_rejections': self.busy_rejections,
+            'statuses': dict(self.statuses),
+        }
+        for phase, samples in self.phases.items():
+            ordered = sorted(samples)
+            snapshot[f'{phase}_p50_ms'] = round(ordered[len(ordered) // 2] * 1000, 1) if ordered else None
+            snapshot[f'{phase}_p95_ms'] = round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1) if ordered else None
+        return snapshot
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP client: a kept-alive connection pool per host, connect/read timeouts,
+    bounded retries with jittered exponential backoff, a per-host concurrency limit and
+    per-host timing metrics for DNS, connect, TLS, time-to-first-byte and total time.
+    """
+
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 max_retries=HTTP_MAX_RETRIES, max_concurrency=HTTP_MAX_CONCURRENCY_PER_HOST):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._sessions = {}
+        self._slots = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = _TimedAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+                self._slots[host] = threading.BoundedSemaphore(self.max_concurrency)
+                self._stats[host] = _HostStats()
+            return self._sessions[host], self._slots[host], self._stats[host]
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """Send a request through the host's pool; raises requests exceptions like requests.request"""
+        method = method.upper()
+        host = urlsplit(url).netloc
+        session, slots, stats = self._host_state(host)
+        timeout = timeout or self.timeout
+        retries = self.max_retries if retries is None else retries
+
+        attempt = 0
+        while True:
+            if not slots.acquire(timeout=HTTP_QUEUE_TIMEOUT):
+                with self._lock:
+                    stats.busy_rejections += 1
+                raise HostBusyError(f'Too many concurrent requests to {host}')
+
+            _local.phases = None
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self._record(stats, start, None, error=True)
+                retryable = isinstance(e, requests.exceptions.ConnectTimeout) or (
+                    method in IDEMPOTENT_METHODS
+                    and isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                )
+                if not retryable or attempt >= retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self._record(stats, start, response)
+                if response.status_code not in RETRY_STATUSES or method not in IDEMPOTENT_METHODS or attempt >= retries:
+                    return response
+                delay = self._backoff(attempt, response.headers.get('Retry-After'))
+                response.close()
+            finally:
+                slots.release()
+
+            attempt += 1
+            with self._lock:
+                stats.retries += 1
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring a short Retry-After"""
+        if retry_after and retry_after.isdigit() and float(retry_after) <= HTTP_BACKOFF_MAX:
+            return float(retry_after)
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+    def _record(self, stats, start, response, error=False):
+        total = time.perf_counter() - start
+        phases = getattr(_local, 'phases', None)
+        with self._lock:
+            stats.requests += 1
+            stats.phases['total'].append(total)
+            if phases is not None:
+                stats.new_connections += 1
+                for phase in ('dns', 'connect', 'tls'):
+                    stats.phases[phase].append(phases[phase])
+            if error:
+                stats.errors += 1
+                return
+            stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+            setup = sum(phases.values()) if phases else 0.0
+            stats.phases['ttfb'].append(max(0.0, response.elapsed.total_seconds() - setup))
+
+    def snapshot(self):
+        with self._lock:
+            hosts = dict(self._stats)
+            return {
+                'connect_timeout_seconds': self.timeout[0],
+                'read_timeout_seconds': self.timeout[1],
+                'max_retries': self.max_retries,
+                'max_concurrency_per_host': self.max_concurrency,
+                'hosts': {host: stats.snapshot() for host, stats in hosts.items()}
+            }
+
+
+http_client = HttpClient()